@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Scenario × variant batch: every merger variant on every link scenario.
+
+Each cell of the cross-product (sweep.VARIANTS × scenario XML files) runs in
+its own directory `results/sweeps/<name>/<variant>/<scenario>/` from an
+overlay ini that sets the variant's merger flags and points
+`*.scenarioManager.script` at the scenario, so cells never share files and
+run in parallel. With `--backend model` the cells run on merger_model.py
+with the arrivals compiled from the scenario (scenario_compiler.py) instead
+of FRER.
+
+Per cell the OoO/Dup ratios, historyLength/reorderBuffLength maxima and the
+packetJitter interval metrics (replicate.interval_metrics) are collected into
+one `batch.csv` with `scenario` and `variant` columns, printed as a
+scenario × variant table, and plotted as grouped bars (one group per
+scenario, one bar per variant) in `batch_ratios.pdf`, `batch_buffers.pdf`
+and `batch_jitter.pdf`.
+
+EX: `python3 batch.py --scenarios scenario_1.xml scenario_2.xml scenario_3.xml --name scenarios`
+    `python3 batch.py --variants baseline,shaping --backend model --set jitter=5ms`
+"""
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+import run_cache
+import scenario_compiler
+from colors import COMNETS_BLUE, COMNETS_MAGENTA, GREEN, TUD_BLUE
+from merger_model import MergerConfig, simulate, write_results
+from replicate import interval_metrics
+from result_cache import cached_vector
+from run_sim import build_frer, simulation_args
+from stream_metrics import StreamingRatios, parse_seconds
+from sweep import INI_PATH, SCRIPT_DIR, SIM_DIR, SWEEPS_DIR, VARIANTS, run_point, write_summary
+
+COLORS = {"baseline": TUD_BLUE, "dynamicHL": COMNETS_BLUE, "sorting": COMNETS_MAGENTA, "shaping": GREEN}
+LABELS = {"baseline": "Baseline", "dynamicHL": "DHL", "sorting": "Sorting", "shaping": "Sorting+Shaping"}
+VECTORS = ("seqNum", "historyLength", "reorderBuffLength", "packetJitter")
+FIGURES = {
+    "ratios":  (("ooo", "OoO (%)"), ("dup", "Dup (%)")),
+    "buffers": (("hl_max", "Max historyLength"), ("buf_max", "Max reorderBuffLength")),
+    "jitter":  (("iqr_ms", "IQR (ms)"), ("p95_ms", "P95 (ms)"), ("p99_ms", "P99 (ms)")),
+}
+
+
+def resolve_scenario(name: str) -> Path:
+    """A scenario given as a path, or by file name relative to simulations/."""
+    path = Path(name)
+    for candidate in (path, SIM_DIR / path):
+        if candidate.is_file():
+            return candidate.resolve()
+    raise ValueError(f"Scenario not found: {name}")
+
+
+def cell_point(variant: str, scenario: Path, sim_time_limit: str, overrides: dict) -> dict:
+    """Ini entries of one cell: common overrides, the variant flags and the scenario script."""
+    return {**overrides, **VARIANTS[variant], "sim-time-limit": sim_time_limit,
+            "*.scenarioManager.script": f'xmldoc("{scenario}")'}
+
+
+def cell_metrics(vectors: dict, history_length: float = np.nan) -> dict:
+    """
+    OoO/Dup, HL/buffer maxima and inter-arrival metrics from {vector name: (times_s, values)}.
+    history_length stands in for an empty historyLength vector (fixed HL, nothing recorded).
+    """
+    m = StreamingRatios()
+    m.update(np.asarray(vectors["seqNum:vector"][1], dtype=np.int64))
+    ooo, dup = m.ratios()
+    hl = vectors["historyLength:vector"][1]
+    buf = vectors["reorderBuffLength:vector"][1]
+    return {"ooo": ooo, "dup": dup,
+            "hl_max": float(hl.max()) if len(hl) else float(history_length),
+            "buf_max": float(buf.max()) if len(buf) else 0.0,
+            **interval_metrics(np.diff(vectors["packetJitter:vector"][0] * 1e3))}
+
+
+def run_cell_sim(frer_exe: Path, sim_args: dict, run_dir: Path, config: str, point: dict,
+                 base_ini: Path = INI_PATH) -> dict:
+    """Run and export one cell on FRER; executed in a worker process."""
+    row = run_point(frer_exe, sim_args, run_dir, config, point, export=True, base_ini=base_ini)
+    if row["status"] == "ok":
+        try:
+            row.update(cell_metrics({f"{v}:vector": cached_vector(run_dir / f"{config}_{v}.csv", f"{v}:vector")
+                                     for v in VECTORS}))
+        except (FileNotFoundError, KeyError, ValueError) as e:
+            row["status"] = f"failed ({e})"
+    return row
+
+
+def run_cell_model(run_dir: Path, config: str, point: dict, scenario: Path) -> dict:
+    """Run one cell on the merger model and write its vectors as CSV exports; executed in a worker process."""
+    run_dir.mkdir(parents=True, exist_ok=True)
+    cfg = MergerConfig.from_ini(point)
+    limit = parse_seconds(point["sim-time-limit"])
+    arrivals = scenario_compiler.arrivals(scenario_compiler.parse_scenario(scenario),
+                                          cfg.senderTransmissionInterval, limit)
+    vectors = simulate(arrivals, cfg, limit)
+    write_results(vectors, run_dir, config, cfg)
+    return {"name": config, **point, "status": "ok", **cell_metrics(vectors, cfg.bufferSize)}
+
+
+def run_batch(scenarios: list, variants: list, out_dir: Path, sim_time_limit: str = "100ms",
+              overrides: dict = None, backend: str = "sim", workers: int = None, build: bool = True,
+              base_ini: Path = INI_PATH) -> pd.DataFrame:
+    """
+    Run every (scenario, variant) cell in parallel and write `out_dir/batch.csv`.
+    Rows come back in scenario-major order with `scenario` and `variant` first.
+    """
+    cells = [(sc, v) for sc in scenarios for v in variants]
+    if backend == "sim":
+        frer_exe = run_cache.build_if_needed(build_frer, SCRIPT_DIR) if build else SCRIPT_DIR / "FRER"
+        sim_args = simulation_args(SCRIPT_DIR)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    rows = {}
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        futures = {}
+        for scenario, variant in cells:
+            config = f"{variant}_{scenario.stem}"
+            run_dir = out_dir / variant / scenario.stem
+            point = cell_point(variant, scenario, sim_time_limit, overrides or {})
+            if backend == "sim":
+                fut = pool.submit(run_cell_sim, frer_exe, sim_args, run_dir, config, point, base_ini)
+            else:
+                fut = pool.submit(run_cell_model, run_dir, config, point, scenario)
+            futures[fut] = (scenario, variant)
+        for fut in as_completed(futures):
+            scenario, variant = futures[fut]
+            try:
+                row = fut.result()
+            except (OSError, ValueError, KeyError) as e:
+                row = {"name": f"{variant}_{scenario.stem}", "status": f"failed ({e})"}
+            rows[scenario, variant] = {"scenario": scenario.stem, "variant": variant, **row}
+            mark = "✔" if row["status"] == "ok" else "✖"
+            print(f"{mark} {variant} × {scenario.name}: {row['status']}")
+
+    ordered = [rows[c] for c in cells]
+    write_summary(ordered, out_dir / "batch.csv")
+    return pd.DataFrame(ordered)
+
+
+def table(df: pd.DataFrame, metrics: tuple = ("ooo", "dup", "p99_ms")) -> pd.DataFrame:
+    """Scenario × variant table of the given metrics, in run order."""
+    ok = df[df["status"] == "ok"]
+    metrics = [m for m in metrics if m in ok]
+    wide = ok.pivot(index="scenario", columns="variant", values=metrics)
+    wide = wide.reindex(index=pd.unique(df["scenario"]))
+    return wide.reindex(columns=[(m, v) for m in metrics for v in pd.unique(df["variant"])])
+
+
+def plot_metrics(df: pd.DataFrame, metrics: tuple, out: Path):
+    """Grouped bars of metrics: one group per scenario, one bar per variant."""
+    scenarios = list(pd.unique(df["scenario"]))
+    variants = list(pd.unique(df["variant"]))
+    ok = df[df["status"] == "ok"].set_index(["scenario", "variant"])
+    x = np.arange(len(scenarios))
+    width = 0.8 / len(variants)
+    fig, axes = plt.subplots(1, len(metrics), figsize=(7.16, 3.0), squeeze=False)
+    for ax, (metric, ylabel) in zip(axes[0], metrics):
+        for i, variant in enumerate(variants):
+            values = [ok[metric].get((sc, variant), np.nan) if metric in ok else np.nan for sc in scenarios]
+            ax.bar(x + (i - (len(variants) - 1) / 2) * width, values, width,
+                   color=COLORS.get(variant), label=LABELS.get(variant, variant))
+        ax.set_xticks(x)
+        ax.set_xticklabels(scenarios, rotation=30, ha="right")
+        ax.set_ylabel(ylabel)
+        ax.grid(axis="x", visible=False)
+        ax.grid(axis="y", linestyle=":", linewidth=0.5)
+    handles, labels = axes[0][0].get_legend_handles_labels()
+    fig.legend(handles, labels, loc="upper center", ncol=len(variants), frameon=False,
+               bbox_to_anchor=(0.5, 1.08))
+    fig.tight_layout()
+    fig.savefig(out, dpi=300, bbox_inches="tight")
+    plt.close(fig)
+
+
+def parse_overrides(specs: list) -> dict:
+    """`NAME=VALUE` entries applied to every cell (merger parameter names or raw ini keys)."""
+    overrides = {}
+    for spec in specs:
+        name, sep, value = spec.partition("=")
+        if not sep or not value:
+            raise ValueError(f"Invalid --set entry (expected name=value): {spec}")
+        overrides[name.strip()] = value.strip()
+    return overrides
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run every merger variant on every scenario and compare them")
+    parser.add_argument("--scenarios", nargs="+", default=None, metavar="XML",
+                        help="Scenario files, as paths or names in simulations/ (default: all scenario*.xml there)")
+    parser.add_argument("--variants", type=str, default=",".join(VARIANTS),
+                        help=f"Comma-separated variants (of {', '.join(VARIANTS)})")
+    parser.add_argument("--set", action="append", default=[], metavar="NAME=VALUE",
+                        help="Parameter applied to every cell, e.g. jitter=5ms (repeatable)")
+    parser.add_argument("--sim-time-limit", type=str, default="100ms")
+    parser.add_argument("--backend", choices=("sim", "model"), default="sim",
+                        help="FRER runs, or merger_model.py on the compiled scenario arrivals")
+    parser.add_argument("--name", type=str, default="batch", help="Results go to results/sweeps/<name>/")
+    parser.add_argument("--workers", type=int, default=None, help="Parallel cells (default: number of CPUs)")
+    parser.add_argument("--no-build", action="store_true", help="Use the existing FRER binary (sim backend)")
+    args = parser.parse_args()
+
+    variants = [v.strip() for v in args.variants.split(",") if v.strip()]
+    unknown = [v for v in variants if v not in VARIANTS]
+    if unknown:
+        parser.error(f"unknown variant(s) {', '.join(unknown)} (one of {', '.join(VARIANTS)})")
+    out_dir = SWEEPS_DIR / args.name
+    try:
+        names = args.scenarios or [p.name for p in sorted(SIM_DIR.glob("scenario*.xml"))]
+        scenarios = [resolve_scenario(n) for n in names]
+        if len({s.stem for s in scenarios}) != len(scenarios):
+            raise ValueError("Scenario file names must be unique")
+        df = run_batch(scenarios, variants, out_dir, args.sim_time_limit, parse_overrides(args.set),
+                       args.backend, args.workers, build=not args.no_build)
+    except (ValueError, RuntimeError) as e:
+        print(f"✖ {e}", file=sys.stderr)
+        sys.exit(1)
+
+    failed = df[df["status"] != "ok"]
+    if len(failed) < len(df):
+        print()
+        print(table(df).round(3).to_string())
+        for figure, metrics in FIGURES.items():
+            plot_metrics(df, metrics, out_dir / f"batch_{figure}.pdf")
+        print(f"✔ Figures → {out_dir}/batch_{{{','.join(FIGURES)}}}.pdf")
+    print(f"✔ Batch `{args.name}`: {len(df) - len(failed)}/{len(df)} cells ok → {out_dir / 'batch.csv'}")
+    sys.exit(1 if len(failed) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Simulator benchmark: CPU cost of the merger variants per configuration.
+
+A fixed matrix of cases is run one after another (never in parallel, so the
+numbers are comparable):
+
+    variant  baseline | dynamicHL | sorting | shaping   (merger flags as in the paper)
+    scenario scenario.xml, scenario_2.xml
+    length   sim-time-limit 100ms, 1s
+    streams  1 (omnetpp.ini) and 100 (2-path network from topology.py)
+
+Every case runs --repeat times through the same Cmdenv command line as
+run_sim.run_simulation(); per run the wall time, user+sys CPU time and peak
+RSS of the FRER process (os.wait4 rusage) and the event count from the
+Cmdenv status lines are taken. The medians (max for RSS) and the CPU time
+per event are written to `results/bench/<timestamp>.json` and appended to
+`results/bench/history.jsonl` (one line per benchmark, with the git commit).
+
+With --baseline the result is compared case by case; a case whose CPU time
+per event or peak RSS grew by more than --tolerance is reported and the
+exit status is 1, so a merger change that doubles per-packet cost fails the
+job. Each case stores its merger flags; cases whose flags differ from the
+baseline's (or that the baseline lacks) are reported and not compared.
+--save-baseline stores the result as the new baseline.
+
+EX: `python3 bench.py --quick --save-baseline`
+    `python3 bench.py --baseline ../simulations/results/bench/baseline.json --tolerance 0.2`
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import re
+import shutil
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+import run_cache
+import topology
+from run_sim import build_frer, simulation_args, simulation_command
+from sweep import PARAM_TAGS, SCRIPT_DIR, SIM_DIR, VARIANTS, write_overlay
+
+BENCH_DIR = SIM_DIR / "results" / "bench"
+BASELINE  = BENCH_DIR / "baseline.json"
+HISTORY   = BENCH_DIR / "history.jsonl"
+
+SCENARIOS = ("scenario.xml", "scenario_2.xml")
+LIMITS    = ("100ms", "1s")
+STREAMS   = (1, 100)
+CMDENV_ARGS = ["--cmdenv-express-mode=true", "--cmdenv-status-frequency=1s"]
+
+_EVENT = re.compile(r"Event #(\d+)")
+
+
+def matrix(quick: bool = False) -> list:
+    """[(case name, merger/ini point, stream count)] of the benchmark matrix."""
+    cases = []
+    if quick:
+        combos = [(v, SCENARIOS[0], LIMITS[0], 1) for v in VARIANTS]
+    else:
+        combos = [(v, sc, lim, 1) for v, sc, lim in itertools.product(VARIANTS, SCENARIOS, LIMITS)]
+        combos += [(v, SCENARIOS[0], LIMITS[0], n) for v in VARIANTS for n in STREAMS[1:]]
+    for variant, scenario, limit, streams in combos:
+        point = {**VARIANTS[variant], "sim-time-limit": limit}
+        if streams == 1:
+            point["*.scenarioManager.script"] = f'xmldoc("{(SIM_DIR / scenario).resolve()}")'
+        name = f"{variant}_{Path(scenario).stem}_{limit}_{streams}st"
+        cases.append((name, point, streams))
+    return cases
+
+
+def stream_ini(streams: int) -> Path:
+    """Overlay ini of the 2-path network with `streams` streams (generated into simulations/)."""
+    lay = topology.generate({"name": f"bench_streams{streams}", "paths": 2,
+                             "streams": {"count": streams, "interval": "1ms"}})
+    return SIM_DIR / f"{lay['name']}.ini"
+
+
+def measure(cmd: list, cwd: Path, log_path: Path) -> dict:
+    """Run cmd once; wall/CPU seconds, peak RSS (MiB) and event count of the process."""
+    with open(log_path, "w") as log:
+        start = time.perf_counter()
+        proc = subprocess.Popen(cmd, cwd=str(cwd), stdout=log, stderr=subprocess.STDOUT)
+        _, status, usage = os.wait4(proc.pid, 0)
+        wall = time.perf_counter() - start
+        proc.returncode = os.waitstatus_to_exitcode(status)
+    if proc.returncode:
+        raise RuntimeError(f"FRER exited with {proc.returncode}, see {log_path}")
+    events = _EVENT.findall(log_path.read_text(errors="replace"))
+    return {"wall_s": wall, "cpu_s": usage.ru_utime + usage.ru_stime,
+            "rss_mib": usage.ru_maxrss / 1024, "events": int(events[-1]) if events else 0}
+
+
+def run_case(frer_exe: Path, sim_args: dict, name: str, point: dict, streams: int, repeat: int,
+             work_dir: Path) -> dict:
+    """Median wall/CPU time, max RSS and CPU µs per event of one case over repeat runs."""
+    run_dir = work_dir / name
+    run_dir.mkdir(parents=True, exist_ok=True)
+    if streams == 1:
+        overlay = write_overlay(run_dir, name, point)
+    else:       # the generated network's own [Config] sets everything but the merger flags
+        base = stream_ini(streams)
+        overlay = write_overlay(run_dir, name, {"extends": base.stem, **point}, base)
+    cmd = simulation_command(frer_exe, ini_path=overlay, extra_args=[
+        "-c", name, "-r", "0", f"--result-dir={run_dir}", *CMDENV_ARGS], **sim_args)
+    runs = [measure(cmd, SCRIPT_DIR, run_dir / f"cmdenv_{i}.log") for i in range(repeat)]
+    cpu = float(np.median([r["cpu_s"] for r in runs]))
+    events = runs[-1]["events"]
+    return {"wall_s": float(np.median([r["wall_s"] for r in runs])), "cpu_s": cpu,
+            "rss_mib": max(r["rss_mib"] for r in runs), "events": events,
+            "events_per_s": events / cpu if cpu else 0.0,
+            "cpu_us_per_event": cpu / events * 1e6 if events else None, "repeat": repeat,
+            "merger": {k: v for k, v in point.items() if k in PARAM_TAGS}}
+
+
+def compare(result: dict, baseline: dict, tolerance: float) -> tuple:
+    """
+    ([(case, metric, baseline, now, ratio)] of every regression beyond tolerance,
+    [case] skipped because its merger flags differ from (or are missing in) the baseline).
+    """
+    regressions, mismatched = [], []
+    for name, now in result["cases"].items():
+        before = baseline.get("cases", {}).get(name)
+        if not before:
+            continue
+        if before.get("merger") != now.get("merger"):
+            mismatched.append(name)
+            continue
+        for metric in ("cpu_us_per_event", "rss_mib"):
+            if before.get(metric) and now.get(metric):
+                ratio = now[metric] / before[metric]
+                if ratio > 1 + tolerance:
+                    regressions.append((name, metric, before[metric], now[metric], ratio))
+    return regressions, mismatched
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=str(SCRIPT_DIR), text=True,
+                              capture_output=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark FRER wall time, event rate and memory per configuration")
+    parser.add_argument("--quick", action="store_true", help="Only the four variants on scenario.xml at 100ms")
+    parser.add_argument("--only", type=str, default=None, help="Run cases whose name contains this text")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per case (medians are reported)")
+    parser.add_argument("--baseline", type=Path, default=None, help="Earlier result to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed growth of CPU time per event / peak RSS (0.25 = +25%%)")
+    parser.add_argument("--save-baseline", action="store_true", help=f"Store this result as {BASELINE}")
+    parser.add_argument("--no-build", action="store_true", help="Use the existing FRER binary")
+    args = parser.parse_args()
+
+    cases = [c for c in matrix(args.quick) if args.only is None or args.only in c[0]]
+    if not cases or args.repeat < 1:
+        parser.error("no cases selected (check --only / --repeat)")
+    try:
+        frer_exe = run_cache.build_if_needed(build_frer, SCRIPT_DIR) if not args.no_build else SCRIPT_DIR / "FRER"
+        sim_args = simulation_args(SCRIPT_DIR)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        work_dir = BENCH_DIR / "runs" / stamp
+        result = {"timestamp": stamp, "commit": git_commit(), "host": platform.node(),
+                  "fingerprint": run_cache.source_fingerprint(SCRIPT_DIR), "cases": {}}
+        for name, point, streams in cases:
+            r = run_case(frer_exe, sim_args, name, point, streams, args.repeat, work_dir)
+            result["cases"][name] = r
+            print(f"✔ {name:<40} {r['wall_s']:8.3f}s wall {r['cpu_s']:8.3f}s cpu "
+                  f"{r['events_per_s']:12.0f} ev/s {r['rss_mib']:8.1f} MiB")
+    except (RuntimeError, OSError, ValueError) as e:
+        print(f"✖ {e}", file=sys.stderr)
+        sys.exit(1)
+
+    BENCH_DIR.mkdir(parents=True, exist_ok=True)
+    out = BENCH_DIR / f"{stamp}.json"
+    out.write_text(json.dumps(result, indent=1))
+    with HISTORY.open("a") as f:
+        f.write(json.dumps(result) + "\n")
+    print(f"✔ Result → {out} (history: {HISTORY})")
+    if args.save_baseline:
+        shutil.copyfile(out, BASELINE)
+        print(f"✔ Saved as baseline → {BASELINE}")
+    if args.baseline:
+        regressions, mismatched = compare(result, json.loads(args.baseline.read_text()), args.tolerance)
+        for name in mismatched:
+            print(f"■ {name}: merger flags differ from the baseline, not compared")
+        for name, metric, before, now, ratio in regressions:
+            print(f"✖ {name}: {metric} {before:.3f} → {now:.3f} (×{ratio:.2f})")
+        if regressions:
+            sys.exit(1)
+        print(f"✔ No regression beyond {args.tolerance:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
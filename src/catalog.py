@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+SQLite catalog of all runs under simulations/results.
+
+Result files are grouped by the run id stored inside them (not by file
+name), so the five `baseline_*.csv` exports of one simulation are one run.
+Per run the catalog keeps the merger parameters (durations in seconds,
+booleans as 0/1), scenario file, seed, sim-time-limit, every config entry,
+the vectors present (with file, count, time span) and summary metrics
+computed once at indexing time:
+
+    ooo, dup (%) from seqNum; hl_max; buf_max; delay_mean_ms, delay_max_ms
+    from linkDelay; iqr_ms, p95_ms, p99_ms, std_ms from packetJitter intervals
+
+Indexing is incremental (files with unchanged size/mtime are skipped), so it
+scales to thousands of runs in sweeps/. Queries select by configuration:
+
+    cat = Catalog(RESULTS_DIR / "catalog.sqlite")
+    cat.update(RESULTS_DIR)
+    sel = cat.select(["jitter", "ooo", "dup"], enableReordering=True, jitter=(3e-3, 7e-3))
+    t_s, seq = cat.vector(sel["run"][0], "seqNum:vector")
+
+EX: `python3 catalog.py --where enableReordering=true --where jitter=3ms..7ms --columns label,jitter,ooo,dup`
+"""
+import argparse
+import os
+import re
+import sqlite3
+from dataclasses import fields
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from merger_model import MergerConfig
+from replicate import interval_metrics
+from result_cache import cached_vector
+from stream_metrics import StreamingRatios, parse_seconds
+from sweep import MERGER
+from vec_reader import read_csv_header, read_csv_vector, read_run
+
+RESULTS_DIR = Path(__file__).resolve().parent.parent / "simulations" / "results"
+DB_NAME     = "catalog.sqlite"
+CSV_HEADER  = "run,type,module,name"
+
+PARAMS = tuple(f.name for f in fields(MergerConfig))
+RUN_COLUMNS = ("run", "label", "configname", "seed", "scenario", "sim_time_limit") + PARAMS
+METRICS = ("ooo", "dup", "hl_max", "buf_max", "delay_mean_ms", "delay_max_ms",
+           "iqr_ms", "p95_ms", "p99_ms", "std_ms")
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS runs (
+    run TEXT PRIMARY KEY, label TEXT, configname TEXT, seed INTEGER, scenario TEXT,
+    sim_time_limit REAL, {", ".join(f"{p} REAL" for p in PARAMS)});
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY, run TEXT, size INTEGER, mtime_ns INTEGER);
+CREATE TABLE IF NOT EXISTS vectors (
+    run TEXT, module TEXT, name TEXT, path TEXT, count INTEGER, t_first REAL, t_last REAL,
+    PRIMARY KEY (run, module, name, path));
+CREATE TABLE IF NOT EXISTS metrics (
+    run TEXT, name TEXT, value REAL, PRIMARY KEY (run, name));
+CREATE TABLE IF NOT EXISTS config (
+    run TEXT, key TEXT, value TEXT, PRIMARY KEY (run, key));
+CREATE INDEX IF NOT EXISTS vectors_by_name ON vectors (name);
+"""
+
+
+def vector_metrics(name: str, t_s: np.ndarray, values: np.ndarray) -> dict:
+    """Summary metrics of one vector, by vector name."""
+    if not len(values):
+        return {}
+    if name == "seqNum:vector":
+        m = StreamingRatios()
+        m.update(values.astype(np.int64))
+        ooo, dup = m.ratios() if m.total > 1 else (0.0, 0.0)
+        return {"ooo": ooo, "dup": dup}
+    if name == "historyLength:vector":
+        return {"hl_max": float(values.max())}
+    if name == "reorderBuffLength:vector":
+        return {"buf_max": float(values.max())}
+    if name == "linkDelay:vector":
+        return {"delay_mean_ms": float(values.mean()), "delay_max_ms": float(values.max())}
+    if name == "packetJitter:vector":
+        out = interval_metrics(np.diff(t_s * 1e3))
+        out.pop("range_ms", None)
+        return out
+    return {}
+
+
+def run_params(config: dict) -> dict:
+    """Merger parameters explicitly set in a run's config, as numbers."""
+    present = {p: config[f"{MERGER}.{p}"] for p in PARAMS if f"{MERGER}.{p}" in config}
+    cfg = MergerConfig.from_ini(present)
+    return {p: float(getattr(cfg, p)) for p in present}
+
+
+def _scenario(config: dict):
+    m = re.search(r'xmldoc\(\s*"([^"]+)"', config.get("*.scenarioManager.script", ""))
+    return m.group(1) if m else None
+
+
+def _label(path: Path, vector_names: list) -> str:
+    """File stem without the trailing `_<vector>` (dynamicHL_J7_seqNum → dynamicHL_J7)."""
+    stem = path.stem
+    for name in vector_names:
+        suffix = "_" + name.split(":")[0]
+        if stem.endswith(suffix):
+            return stem[:-len(suffix)]
+    return stem
+
+
+def _is_export(path: Path) -> bool:
+    with open(path) as f:
+        return f.readline().startswith(CSV_HEADER)
+
+
+def read_result_file(path: Path) -> tuple:
+    """(header, {(module, name): (t, v)}) of a .vec or scavetool CSV export."""
+    if path.suffix == ".vec":
+        return read_run(path)
+    header = read_csv_header(path)
+    rows = pd.read_csv(path, usecols=["type", "module", "name"])
+    vectors = {}
+    for module, name in rows[rows["type"] == "vector"][["module", "name"]].itertuples(index=False):
+        vectors[(module, name)] = read_csv_vector(path, name, module)
+    return header, vectors
+
+
+class Catalog:
+    """SQLite index of result files; see the module docstring for the query API."""
+
+    def __init__(self, db_path: Path = RESULTS_DIR / DB_NAME):
+        self.db_path = Path(db_path)
+        self.db = sqlite3.connect(self.db_path)
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    # ───── INDEXING ─────────────────────────────────────────────────────────
+    def update(self, folder: Path = RESULTS_DIR) -> int:
+        """
+        Index new or changed result files below folder (hidden folders skipped)
+        and drop the entries of deleted ones; returns the count of indexed files.
+        """
+        folder = Path(folder).resolve()
+        self.remove_missing(folder)
+        count = 0
+        for path in sorted(folder.rglob("*")):
+            rel = path.relative_to(folder)
+            if path.suffix not in (".csv", ".vec") or any(p.startswith(".") for p in rel.parts):
+                continue
+            st = path.stat()
+            known = self.db.execute("SELECT size, mtime_ns FROM files WHERE path = ?", (str(path),)).fetchone()
+            if known == (st.st_size, st.st_mtime_ns):
+                continue
+            if path.suffix == ".csv" and not _is_export(path):
+                continue
+            self.add_file(path)
+            count += 1
+        self.db.commit()
+        return count
+
+    def remove_missing(self, folder: Path = RESULTS_DIR) -> int:
+        """Drop indexed files below folder that no longer exist, and runs left without a file."""
+        prefix = os.path.join(Path(folder).resolve(), "")
+        paths = [p for (p,) in self.db.execute("SELECT path FROM files WHERE substr(path, 1, ?) = ?",
+                                                (len(prefix), prefix))
+                 if not Path(p).exists()]
+        for path in paths:
+            self.db.execute("DELETE FROM vectors WHERE path = ?", (path,))
+            self.db.execute("DELETE FROM files WHERE path = ?", (path,))
+        if paths:
+            for table in ("runs", "config", "metrics"):
+                self.db.execute(f"DELETE FROM {table} WHERE run NOT IN (SELECT run FROM files)")
+        return len(paths)
+
+    def add_file(self, path: Path):
+        """(Re-)index one result file."""
+        header, vectors = read_result_file(path)
+        run = header.run or str(path)
+        st = path.stat()
+        self.db.execute("DELETE FROM vectors WHERE path = ?", (str(path),))
+        self.db.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)",
+                        (str(path), run, st.st_size, st.st_mtime_ns))
+        names = [name for _, name in vectors]
+        row = {"run": run, "label": _label(path, names), "configname": header.attrs.get("configname"),
+               "seed": int(header.attrs["seedset"]) if header.attrs.get("seedset", "").isdigit() else None,
+               "scenario": _scenario(header.config),
+               "sim_time_limit": parse_seconds(header.config["sim-time-limit"])
+               if "sim-time-limit" in header.config else None,
+               **run_params(header.config)}
+        existing = self.db.execute("SELECT label FROM runs WHERE run = ?", (run,)).fetchone()
+        if existing:           # keep the label of the first file seen for this run
+            row["label"] = existing[0]
+        cols = list(row)
+        self.db.execute(f"INSERT OR REPLACE INTO runs ({', '.join(cols)}) VALUES ({', '.join('?' * len(cols))})",
+                        [row[c] for c in cols])
+        self.db.executemany("INSERT OR REPLACE INTO config VALUES (?, ?, ?)",
+                            [(run, k, str(v)) for k, v in header.config.items()])
+        for (module, name), (t_s, values) in vectors.items():
+            self.db.execute("INSERT OR REPLACE INTO vectors VALUES (?, ?, ?, ?, ?, ?, ?)",
+                            (run, module, name, str(path), len(t_s),
+                             float(t_s[0]) if len(t_s) else None, float(t_s[-1]) if len(t_s) else None))
+            self.db.executemany("INSERT OR REPLACE INTO metrics VALUES (?, ?, ?)",
+                                [(run, k, float(v)) for k, v in vector_metrics(name, t_s, values).items()])
+
+    # ───── QUERIES ──────────────────────────────────────────────────────────
+    def select(self, columns: list = ("run",) + PARAMS + METRICS, **where) -> dict:
+        """
+        Runs matching where, as {column: np.ndarray}. Filters: a scalar means
+        equality, a (lo, hi) tuple an inclusive range, a list membership;
+        columns may be run attributes, merger parameters or metrics.
+        """
+        columns = list(dict.fromkeys(["run", *columns]))
+        unknown = [c for c in list(columns) + list(where) if c not in RUN_COLUMNS + METRICS]
+        if unknown:
+            raise KeyError(f"Unknown catalog column(s): {', '.join(unknown)}")
+        joins, args = [], []
+        for m in dict.fromkeys(c for c in list(columns) + list(where) if c in METRICS):
+            joins.append(f"LEFT JOIN metrics AS m_{m} ON m_{m}.run = runs.run AND m_{m}.name = ?")
+            args.append(m)
+        ref = lambda c: f"m_{c}.value" if c in METRICS else f"runs.{c}"
+        conds = []
+        for col, value in where.items():
+            if isinstance(value, tuple):
+                conds.append(f"{ref(col)} BETWEEN ? AND ?")
+                args += [float(value[0]), float(value[1])]
+            elif isinstance(value, list):
+                conds.append(f"{ref(col)} IN ({', '.join('?' * len(value))})")
+                args += value
+            else:
+                conds.append(f"{ref(col)} = ?")
+                args.append(float(value) if isinstance(value, bool) else value)
+        sql = (f"SELECT {', '.join(f'{ref(c)} AS {c}' for c in columns)} FROM runs {' '.join(joins)}"
+               + (f" WHERE {' AND '.join(conds)}" if conds else "") + " ORDER BY runs.label, runs.run")
+        rows = self.db.execute(sql, args).fetchall()
+        return {c: np.array([r[i] for r in rows]) for i, c in enumerate(columns)}
+
+    def vector(self, run: str, name: str, module: str = None) -> tuple:
+        """(times_s, values) of a vector of run, loaded from the file that holds it."""
+        sql = "SELECT path, module FROM vectors WHERE run = ? AND name = ?"
+        args = [run, name]
+        if module:
+            sql += " AND module = ?"
+            args.append(module)
+        found = self.db.execute(sql, args).fetchone()
+        if found is None:
+            raise KeyError(f"Vector {name!r} of run {run!r} not in the catalog")
+        return cached_vector(Path(found[0]), name, found[1])
+
+
+def parse_where(spec: str) -> tuple:
+    """`jitter=3ms..7ms` → ("jitter", (0.003, 0.007)); `enableReordering=true` → (…, True)."""
+    key, _, raw = spec.partition("=")
+    key, raw = key.strip(), raw.strip()
+    value = lambda v: {"true": True, "false": False}.get(v.lower(), v) if key not in (
+        "run", "label", "configname", "scenario") else v
+    if ".." in raw and key not in ("run", "label", "configname", "scenario"):
+        lo, hi = raw.split("..", 1)
+        return key, (parse_seconds(lo), parse_seconds(hi))
+    if "," in raw:
+        return key, [_number(value(v.strip())) for v in raw.split(",")]
+    return key, _number(value(raw))
+
+
+def _number(v):
+    if isinstance(v, bool) or not isinstance(v, str):
+        return v
+    try:
+        return parse_seconds(v)
+    except ValueError:
+        return v
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Index result files and query runs by configuration")
+    parser.add_argument("folder", type=Path, nargs="?", default=RESULTS_DIR, help="Results folder to index")
+    parser.add_argument("--db", type=Path, default=None, help=f"Catalog file (default: <folder>/{DB_NAME})")
+    parser.add_argument("--where", action="append", default=[], metavar="COL=VALUE",
+                        help="Filter, e.g. enableReordering=true, jitter=3ms..7ms, label=baseline,sorting")
+    parser.add_argument("--columns", type=str, default="label,jitter,bufferSize,enableReordering,ooo,dup")
+    args = parser.parse_args()
+
+    cat = Catalog(args.db or args.folder / DB_NAME)
+    print(f"✔ Indexed {cat.update(args.folder)} new/changed files")
+    try:
+        sel = cat.select(args.columns.split(","), **dict(parse_where(w) for w in args.where))
+    except KeyError as e:
+        parser.error(str(e))
+    cols = [c for c in sel if c != "run"] or ["run"]
+    print("  ".join(f"{c:>16}" for c in cols))
+    for i in range(len(sel["run"])):
+        print("  ".join(f"{sel[c][i]:>16.6g}" if isinstance(sel[c][i], (float, np.floating))
+                        else f"{str(sel[c][i]):>16}" for c in cols))
+    cat.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,10 @@
+"""
+Paper colours of the merger variants, as in the plot_*.py scripts.
+
+Kept free of matplotlib/seaborn so that tools can use them without the
+plot scripts' global style side effects.
+"""
+TUD_BLUE        = "#00305d"   # baseline
+COMNETS_BLUE    = "#2C94CC"   # dynamic
+COMNETS_MAGENTA = "#E20074"   # sorting
+GREEN           = "#65B32E"   # shaping
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Level-of-detail decimation for step and scatter plots of long vectors.
+
+Once a figure's limits and layout are final, decimate(ax) reduces what ax
+shows to what the saved figure can resolve, binning the samples on the
+pixel grid of the view (xlim/ylim, axes size and output DPI):
+
+- lines: M4 per pixel column (first, last, min and max sample of each
+  column). The envelope and every column's entry/exit value are kept, so
+  history-length changes and seqNum jumps render exactly as with all
+  samples, including under drawstyle='steps-post'.
+- scatters: one sample per occupied pixel cell, so isolated outliers stay
+  while the dense cloud collapses.
+
+Samples outside the view share one extra column/row per side (lines stay
+connected to the edge); non-finite samples are dropped before binning.
+
+Series that already fit (≤ 4 samples per column for steps, ≤ one per column
+for scatters) are returned unchanged, so the 100 ms paper figures are
+identical; long runs render in constant time and give constant-size PDFs.
+
+EX: `python3 downsample.py ../simulations/results/baseline_seqNum.csv --name seqNum:vector`
+"""
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+from result_cache import cached_vector
+
+SAVE_DPI = 300   # dpi the plot_*.py scripts pass to savefig
+
+
+def axes_pixels(ax, dpi: float = SAVE_DPI) -> tuple:
+    """(width, height) of ax in output pixels, at its current position in the figure."""
+    fig_w, fig_h = ax.figure.get_size_inches()
+    box = ax.get_position()
+    return max(1, int(box.width * fig_w * dpi)), max(1, int(box.height * fig_h * dpi))
+
+
+def _bins(v: np.ndarray, n: int, lo: float, hi: float) -> np.ndarray:
+    """
+    Pixel column/row of every value in [lo, hi] split into n bins, shifted by
+    one; values below lo go to bin 0 and above hi to bin n + 1, so samples
+    just outside the view still connect a line to its edge.
+    """
+    if hi <= lo:
+        return np.ones(len(v), dtype=np.int64)
+    return np.clip(np.floor((v - lo) / (hi - lo) * n), -1, n).astype(np.int64) + 1
+
+
+def _finite(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    return np.flatnonzero(np.isfinite(x) & np.isfinite(y))
+
+
+def m4_indices(x: np.ndarray, y: np.ndarray, columns: int, xlim: tuple = None) -> np.ndarray:
+    """
+    Sorted indices of the first/last/min/max finite sample per pixel column
+    of xlim (default: the data range; x ascending).
+    """
+    keep = _finite(x, y)
+    if len(keep) <= 4 * columns:
+        return keep
+    x, y = x[keep], y[keep]
+    lo, hi = xlim if xlim is not None else (float(x[0]), float(x[-1]))
+    cols = _bins(x, columns, lo, hi)
+    starts = np.flatnonzero(np.r_[True, cols[1:] != cols[:-1]])
+    ends = np.r_[starts[1:], len(x)] - 1
+    order = np.lexsort((y, cols))          # by column, then value: group head = min, tail = max
+    return keep[np.unique(np.concatenate([starts, ends, order[starts], order[ends]]))]
+
+
+def cell_indices(x: np.ndarray, y: np.ndarray, columns: int, rows: int,
+                 xlim: tuple = None, ylim: tuple = None) -> np.ndarray:
+    """
+    Sorted indices of the first finite sample in every occupied (column, row)
+    pixel cell of xlim × ylim (default: the data ranges).
+    """
+    keep = _finite(x, y)
+    if len(keep) <= columns:
+        return keep
+    x, y = x[keep], y[keep]
+    cx = _bins(x, columns, *(xlim if xlim is not None else (float(x.min()), float(x.max()))))
+    cy = _bins(y, rows, *(ylim if ylim is not None else (float(y.min()), float(y.max()))))
+    _, first = np.unique(cx * (rows + 2) + cy, return_index=True)
+    return keep[np.sort(first)]
+
+
+def decimate(ax, dpi: float = SAVE_DPI):
+    """
+    Decimate every line (M4) and scatter (one point per cell) of ax to the
+    pixels of its final view. Call it after the limits and layout are set,
+    right before savefig; the view limits are frozen at their current values.
+    Integer markevery is scaled so the number of markers stays the same.
+    """
+    xlim, ylim = ax.get_xlim(), ax.get_ylim()
+    columns, rows = axes_pixels(ax, dpi)
+    for line in ax.get_lines():
+        x, y = (np.asarray(a, dtype=float) for a in line.get_data())
+        idx = m4_indices(x, y, columns, xlim)
+        if len(idx) == len(x):
+            continue
+        every = line.get_markevery()
+        line.set_data(x[idx], y[idx])
+        if isinstance(every, (int, np.integer)) and every > 1:
+            line.set_markevery(max(1, round(every * len(idx) / len(x))))
+    for coll in ax.collections:
+        xy = np.asarray(coll.get_offsets(), dtype=float)
+        if xy.ndim != 2 or len(xy) <= columns:
+            continue
+        idx = cell_indices(xy[:, 0], xy[:, 1], columns, rows, xlim, ylim)
+        coll.set_offsets(xy[idx])
+        for get, set_ in ((coll.get_sizes, coll.set_sizes), (coll.get_facecolors, coll.set_facecolors),
+                          (coll.get_edgecolors, coll.set_edgecolors)):
+            values = get()
+            if len(values) == len(xy):
+                set_(values[idx])
+    ax.set_xlim(xlim)
+    ax.set_ylim(ylim)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show how far a vector is decimated for plotting")
+    parser.add_argument("file", type=Path, help=".vec file or scavetool CSV export")
+    parser.add_argument("--name", type=str, required=True, help="Vector name, e.g. seqNum:vector")
+    parser.add_argument("--width", type=float, default=7.16, help="Axes width in inches")
+    parser.add_argument("--height", type=float, default=3.5, help="Axes height in inches")
+    parser.add_argument("--dpi", type=float, default=SAVE_DPI)
+    args = parser.parse_args()
+
+    t_s, values = cached_vector(args.file, args.name)
+    columns, rows = int(args.width * args.dpi), int(args.height * args.dpi)
+    step = m4_indices(t_s, values, columns)
+    cells = cell_indices(t_s, values, columns, rows)
+    print(f"✔ {args.name}: {len(t_s)} samples → step {len(step)}, scatter {len(cells)} "
+          f"({columns}×{rows} px)")
+
+
+if __name__ == "__main__":
+    main()
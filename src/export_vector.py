@@ -1,12 +1,48 @@
+import csv
+import fnmatch
+import re
+import shutil
 import subprocess
 from pathlib import Path
+from stage_trace import stage
+from vec_reader import read_header, read_run
+
+def write_vector_csv(output_path: Path, run: str, attrs: dict, config: dict, vectors: dict):
+    """
+    Writes vectors ({(module, name): (times_s, values)}) as a CSV in the same
+    layout as `opp_scavetool export` (runattr/config/vector rows with
+    space-separated vectime/vecvalue).
+    """
+    with open(output_path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["run", "type", "module", "name", "attrname", "attrvalue", "vectime", "vecvalue"])
+        for key, value in attrs.items():
+            writer.writerow([run, "runattr", "", "", key, value, "", ""])
+        for key, value in config.items():
+            writer.writerow([run, "config", "", "", key, value, "", ""])
+        for (module, name), (t_s, values) in vectors.items():
+            writer.writerow([run, "vector", module, name, "", "",
+                             " ".join(map(repr, t_s.tolist())),
+                             " ".join(map(repr, values.tolist()))])
+
+def export_vector_native(vector_names: list,
+                         output_path: Path,
+                         vec_path: Path):
+    """
+    Writes the given vectors of a .vec file as a scavetool-style CSV using
+    the native .vec reader instead of `opp_scavetool`.
+    """
+    header, vectors = read_run(vec_path, vector_names)
+    write_vector_csv(output_path, header.run, header.attrs, header.config, vectors)
 
 def export_seqnum_vector(filter_expr: str,
                          output_filename: str,
                          vec_filename: str):
     """
     Runs `opp_scavetool export` on the given .vec file and writes the CSV
-    into the same directory as the .vec.
+    into the same directory as the .vec. Falls back to export_vector_native()
+    when opp_scavetool is not on PATH (only `name =~ "..."` filters, matched
+    as globs against the declared vector names).
 
     Args:
         filter_expr (str): e.g. 'name =~ "seqNum:vector"'
@@ -24,7 +60,22 @@ def export_seqnum_vector(filter_expr: str,
     # 3) Set the output CSV in the same folder
     output_path = vec_path.parent / output_filename    # …/results/output.csv
 
-    # 4) Invoke scavetool
+    # 4) Invoke scavetool, or the native reader if scavetool is unavailable
+    if shutil.which("opp_scavetool") is None:
+        patterns = re.findall(r'name\s*=~\s*"([^"]+)"', filter_expr)
+        if not patterns:
+            print(f"✖ Export failed: native export only supports name filters, got {filter_expr!r}")
+            return
+        # scavetool matches names as globs; expand them against the declared vectors
+        declared = {decl.name for decl in read_header(vec_path).vectors.values()}
+        names = sorted(n for n in declared if any(fnmatch.fnmatchcase(n, p) for p in patterns))
+        if not names:
+            print(f"✖ Export failed for {vec_path.name}: no vector matches {filter_expr!r}")
+            return
+        with stage("export_native", python=True, file=output_path.name):
+            export_vector_native(names, output_path, vec_path)
+        print(f"✔ Exported `{vec_path.name}` → `{output_path}` (native)")
+        return
     cmd = [
         "opp_scavetool", "export",
         "--filter", filter_expr,
@@ -32,7 +83,8 @@ def export_seqnum_vector(filter_expr: str,
         str(vec_path)
     ]
     try:
-        subprocess.run(cmd, check=True)
+        with stage("opp_scavetool", file=output_path.name):
+            subprocess.run(cmd, check=True)
         print(f"✔ Exported `{vec_path.name}` → `{output_path}`")
     except subprocess.CalledProcessError as e:
         print(f"✖ Export failed: {e}")
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Headless figure pipeline: renders all paper figures (Fig. 3–6) in one go.
+
+- matplotlib uses the Agg backend and plt.show() is never called;
+- every input vector is decoded once through result_cache (in-process memo,
+  .npz cache for the worker processes) before any figure is drawn;
+- with --workers > 1 the figures are rendered in a process pool;
+- a figure is skipped when its PDF exists and neither its inputs nor its
+  plot script changed since it was last rendered (stamps in `.figures.json`).
+
+Each figure re-applies the style of its plot script inside an rc_context, so
+the scripts do not leak rcParams into each other.
+
+EX: `python3 figures.py` or `python3 figures.py --only jitter_ratios --force`
+"""
+import argparse
+import hashlib
+import importlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+
+import stage_trace
+from result_cache import cached_vector, file_hash
+from stage_trace import stage
+from sweep import VARIANTS
+
+SCRIPT_DIR  = Path(__file__).resolve().parent
+RESULTS_DIR = SCRIPT_DIR.parent / "simulations" / "results"
+STAMP_FILE  = ".figures.json"
+SHARED_SCRIPTS = ("downsample.py",)   # helpers used by the plot scripts; a change re-renders every figure
+
+SEQNUM   = "seqNum:vector"
+
+# name → (plot module, function, kwargs, [(input file, vector)], output pdf)
+FIGURES = {
+    "seqNum_step_comparison": (
+        "plot_seqNum", "plot_seqnum_comparison", {},
+        [(f"{v}_seqNum.csv", SEQNUM) for v in VARIANTS],
+        "seqNum_step_comparison.pdf"),
+    "seqNum_ratios": (
+        "plot_barChart", "plot_bar_ratios", {},
+        [(f"{v}_seqNum.csv", SEQNUM) for v in list(VARIANTS)[:3]],
+        "seqNum_ratios.pdf"),
+    "jitter_ratios": (
+        "plot_jitter_ratios", "plot_jitter_vs_ratios", {},
+        [(f"dynamicHL_J{j}_seqNum.csv", SEQNUM) for j in range(11)]
+        + [("baseline_seqNum.csv", SEQNUM), ("sorting_seqNum.csv", SEQNUM)],
+        "jitter_ratios.pdf"),
+    "packetJitter_cdf": (
+        "plot_arrivalJitter", "plot_packet_jitter", {"plot_type": "cdf"},
+        [(f"{v}_packetJitter.csv", "packetJitter:vector") for v in VARIANTS],
+        "packetJitter_cdf.pdf"),
+    "combined_delay_hist": (
+        "plot_linkDelay", "plot_combined", {},
+        [("baseline_linkDelay.csv", "linkDelay:vector"),
+         ("dynamicHL_historyLength.csv", "historyLength:vector"),
+         ("sorting_reorderBuffLength.csv", "reorderBuffLength:vector"),
+         ("shaping_reorderBuffLength.csv", "reorderBuffLength:vector")],
+        "combined_delay_hist.pdf"),
+    "link_delay": (
+        "plot_linkDelay", "plot_link_delay", {},
+        [("baseline_linkDelay.csv", "linkDelay:vector")],
+        "link_delay.pdf"),
+}
+
+
+def fingerprint(name: str, folder: Path) -> str:
+    """Hash of a figure's inputs, its plot script and its arguments."""
+    module, func, kwargs, inputs, _ = FIGURES[name]
+    h = hashlib.sha256(f"{module}.{func}{sorted(kwargs.items())}".encode())
+    for script in (f"{module}.py", *SHARED_SCRIPTS):
+        h.update((SCRIPT_DIR / script).read_bytes())
+    for csv_name, vector in inputs:
+        h.update(f"{csv_name}:{vector}:{file_hash(folder / csv_name)}".encode())
+    return h.hexdigest()
+
+
+def load_stamps(folder: Path) -> dict:
+    try:
+        return json.loads((folder / STAMP_FILE).read_text())
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def warm(names: list, folder: Path):
+    """Decode every input vector once so renderers (and workers) hit the cache."""
+    for csv_name, vector in {i for name in names for i in FIGURES[name][3]}:
+        cached_vector(folder / csv_name, vector)
+
+
+def render(name: str, folder: Path) -> float:
+    """Render one figure headless with its own style; returns the wall time."""
+    module, func, kwargs, _, _ = FIGURES[name]
+    start = time.perf_counter()
+    with stage("import", python=True, module=module):
+        plot = importlib.import_module(module)
+    with matplotlib.rc_context():
+        plot.apply_style()
+        getattr(plot, func)(folder, show=False, **kwargs)
+    plt.close("all")
+    return time.perf_counter() - start
+
+
+def render_all(folder: Path, names: list = None, workers: int = 1, force: bool = False) -> dict:
+    """
+    Render the selected figures (default: all), skipping up-to-date ones.
+    Returns {name: "skipped" | seconds | error message}.
+    """
+    names = list(names or FIGURES)
+    missing = [n for n in names if n not in FIGURES]
+    if missing:
+        raise KeyError(f"Unknown figure(s): {', '.join(missing)}")
+    stamps = load_stamps(folder)
+    digests = {n: fingerprint(n, folder) for n in names}
+    status, todo = {}, []
+    for n in names:
+        if not force and stamps.get(n) == digests[n] and (folder / FIGURES[n][4]).exists():
+            status[n] = "skipped"
+        else:
+            todo.append(n)
+
+    with stage("warm", python=True):
+        warm(todo, folder)
+    if workers > 1 and len(todo) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(render, n, folder): n for n in todo}
+            for fut in as_completed(futures):
+                try:
+                    status[futures[fut]] = fut.result()
+                except Exception as e:
+                    status[futures[fut]] = f"{type(e).__name__}: {e}"
+    else:
+        for n in todo:
+            try:
+                status[n] = render(n, folder)
+            except Exception as e:
+                status[n] = f"{type(e).__name__}: {e}"
+
+    for n in todo:
+        if isinstance(status[n], float):
+            stamps[n] = digests[n]
+        else:
+            stamps.pop(n, None)
+    (folder / STAMP_FILE).write_text(json.dumps(stamps, indent=1, sort_keys=True))
+    return status
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render all paper figures headless")
+    parser.add_argument("results", type=Path, nargs="?", default=RESULTS_DIR,
+                        help="Folder with the CSV exports (figures are written there)")
+    parser.add_argument("--only", nargs="+", default=None, metavar="FIGURE",
+                        help=f"Render only these figures ({', '.join(FIGURES)})")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Render figures in parallel processes (0 = CPU count)")
+    parser.add_argument("--force", action="store_true", help="Re-render even if inputs are unchanged")
+    parser.add_argument("--trace", nargs="?", const="", default=None, metavar="FILE",
+                        help="Record per-stage timings as a Chrome trace (stage_trace.py)")
+    parser.add_argument("--profile", action="store_true", help="With --trace: cProfile the Python stages")
+    args = parser.parse_args()
+    if args.trace is not None or args.profile:
+        stage_trace.enable(Path(args.trace) if args.trace else None, profile=args.profile)
+
+    workers = args.workers or os.cpu_count()
+    status = render_all(args.results, args.only, workers, args.force)
+    failed = 0
+    for name, st in status.items():
+        if st == "skipped":
+            print(f"✔ {name}: up to date")
+        elif isinstance(st, float):
+            print(f"✔ {name}: rendered in {st:.1f}s → {FIGURES[name][4]}")
+        else:
+            failed += 1
+            print(f"✖ {name}: {st}")
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
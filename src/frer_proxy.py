@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""
+Live FRER merger on UDP sockets: the StreamMergerSorter logic of
+merger_model.Merger (elimination, DHL, sorting, shaping) applied to
+redundant copies of a stream arriving on localhost.
+
+Every datagram starts with an R-TAG-like header (HEADER): the R-TAG
+EtherType 0xF1C1 as marker, the sequence number (32 bit instead of the
+R-TAG's 16 bit, so long runs do not wrap) and the nominal send time in ns
+of CLOCK_MONOTONIC, which generator and proxy share on one host. The
+arrival time minus that send time is the path delay the DHL timer sees,
+like linkDelay in the simulation.
+
+Modes:
+- proxy: listen on one port per path, forward the merged stream to
+  --forward. On exit the seqNum, historyLength, reorderBuffLength and
+  packetJitter vectors are written to --out as `<prefix>_<vector>.csv`
+  exports, so plot_*.py, latency.py and catalog.py read them like a run.
+- load:  periodic source sending one copy per path, each delayed by
+  --delays or by the per-path delays of a scenario XML.
+- bench: proxy and generator as child processes at increasing --rates;
+  per rate the delivered share, Dup/OoO at the sink, proxy CPU time per
+  copy and sink latency percentiles, and the highest loss-free rate.
+
+EX: `python3 frer_proxy.py proxy --ports 50001,50002 --forward 50000 --param enableReordering=true --out ../simulations/results/live`
+    `python3 frer_proxy.py load --ports 50001,50002 --rate 1000 --duration 100ms --scenario ../simulations/scenario.xml`
+    `python3 frer_proxy.py bench --rates 10000,50000,100000,200000 --duration 2s`
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import struct
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import scenario_compiler
+from merger_model import PS, Merger, MergerConfig, ratios, write_results
+from stream_metrics import StreamingRatios, parse_seconds
+
+HEADER = struct.Struct("!HIQ")       # R-TAG marker, seqNum, send time (ns, CLOCK_MONOTONIC)
+RTAG   = 0xF1C1
+HOST   = "127.0.0.1"
+RCVBUF = 8 << 20                     # large socket buffers so bursts are not dropped by the kernel
+START_DELAY_NS = 20_000_000          # generator: first packet 20 ms after start
+SPIN_NS = 100_000                    # generator: busy-wait the last 100 µs before a copy is due
+
+
+def udp_socket(port: int, host: str = HOST) -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RCVBUF)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, RCVBUF)
+    sock.bind((host, port))
+    return sock
+
+
+def parse_ports(spec: str) -> list:
+    return [int(p) for p in spec.split(",") if p.strip()]
+
+
+# ───── PROXY ────────────────────────────────────────────────────────────────
+class _Input(asyncio.DatagramProtocol):
+    def __init__(self, proxy: "FrerProxy"):
+        self.proxy = proxy
+
+    def datagram_received(self, data, addr):
+        self.proxy.receive(data)
+
+
+class FrerProxy:
+    """Merger between the per-path input sockets and one forwarding socket."""
+
+    def __init__(self, cfg: MergerConfig, ports: list, forward: tuple, host: str = HOST):
+        self.cfg, self.ports, self.forward, self.host = cfg, ports, forward, host
+        self.merger = Merger(cfg, on_emit=self._emit)
+        self.t0_ns = time.monotonic_ns()
+        self.received = self.forwarded = self.malformed = 0
+        self.cpu_s = 0.0
+        self.out_ps, self.e2e_ps = [], []
+        self.last_rx = None
+        self._timer, self._timer_at = None, None
+
+    def now_ps(self) -> int:
+        return (time.monotonic_ns() - self.t0_ns) * 1000
+
+    def receive(self, data: bytes):
+        if len(data) < HEADER.size:
+            self.malformed += 1
+            return
+        tag, seq, sent_ns = HEADER.unpack_from(data)
+        if tag != RTAG:
+            self.malformed += 1
+            return
+        now = self.now_ps()
+        sent = (sent_ns - self.t0_ns) * 1000
+        self.received += 1
+        self.last_rx = now
+        self.merger.advance(now)
+        self.merger.arrive(now, seq, now - sent, (sent, data))
+        self._schedule()
+
+    def _emit(self, at, seq, item):
+        sent, data = item
+        self.out.sendto(data)
+        self.forwarded += 1
+        now = self.now_ps()          # shaper/timer emissions leave now, not at their nominal time
+        self.out_ps.append(now)
+        self.e2e_ps.append(now - sent)
+
+    def _on_timer(self):
+        self._timer, self._timer_at = None, None
+        self.merger.advance(self.now_ps())
+        self._schedule()
+
+    def _schedule(self):
+        """Keep one loop timer armed for the merger's next DHL tick or shaper emission."""
+        at = self.merger.next_timer()
+        if at == self._timer_at:
+            return
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer_at = at
+        self._timer = None if at is None else self.loop.call_at(self.t0_ns / 1e9 + at / PS, self._on_timer)
+
+    async def run(self, duration: float = None, idle_timeout: float = None, ready=None):
+        """Serve until duration has passed or nothing arrived for idle_timeout (after the first copy)."""
+        self.loop = asyncio.get_running_loop()
+        inputs = [(await self.loop.create_datagram_endpoint(lambda: _Input(self), sock=udp_socket(p, self.host)))[0]
+                  for p in self.ports]
+        self.out, _ = await self.loop.create_datagram_endpoint(asyncio.DatagramProtocol, remote_addr=self.forward)
+        self._schedule()
+        if ready:
+            ready()
+        cpu0 = time.process_time()
+        deadline = None if duration is None else time.monotonic() + duration
+        try:
+            while deadline is None or time.monotonic() < deadline:
+                await asyncio.sleep(min(idle_timeout or 0.1, 0.1))
+                if (idle_timeout and self.last_rx is not None
+                        and self.now_ps() - self.last_rx > idle_timeout * PS):
+                    break
+        finally:
+            self.cpu_s = time.process_time() - cpu0
+            if self._timer is not None:
+                self._timer.cancel()
+            for t in inputs:
+                t.close()
+            self.out.close()
+
+    def vectors(self) -> dict:
+        """Merger vectors plus packetJitter (e2e delay variation) at the proxy output."""
+        vectors = self.merger.vectors()
+        e2e = np.array(self.e2e_ps, dtype=np.int64)
+        vectors["packetJitter:vector"] = (np.array(self.out_ps, dtype=np.int64) / PS,
+                                          np.diff(e2e, prepend=0) / PS)
+        return vectors
+
+
+# ───── LOAD GENERATOR ───────────────────────────────────────────────────────
+def copy_schedule(send_s: np.ndarray, delays: list) -> tuple:
+    """(emit_s, seq, send_s, path) of every copy in emission order; delays[p] is a per-packet array or a constant."""
+    emit, seq, sent, path = [], [], [], []
+    idx = np.arange(len(send_s), dtype=np.int64)
+    for p, d in enumerate(delays):
+        d = np.broadcast_to(np.asarray(d, dtype=float), send_s.shape)
+        ok = np.isfinite(d)
+        emit.append(send_s[ok] + d[ok])
+        seq.append(idx[ok])
+        sent.append(send_s[ok])
+        path.append(np.full(int(ok.sum()), p))
+    emit, seq, sent, path = (np.concatenate(a) for a in (emit, seq, sent, path))
+    order = np.lexsort((seq, emit))
+    return emit[order], seq[order], sent[order], path[order]
+
+
+def send_load(ports: list, schedule: tuple, size: int, host: str = HOST) -> dict:
+    """Send the copies of schedule at their emission times; returns counts and the worst lateness."""
+    emit_s, seq, send_s, path = schedule
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, RCVBUF)
+    addrs = [(host, p) for p in ports]
+    pad = bytes(max(0, size - HEADER.size))
+    t0 = time.monotonic_ns() + START_DELAY_NS
+    due = (t0 + np.rint(emit_s * 1e9).astype(np.int64)).tolist()
+    stamp = (t0 + np.rint(send_s * 1e9).astype(np.int64)).tolist()
+    late = 0
+    for at, s, ts, p in zip(due, seq.tolist(), stamp, path.tolist()):
+        now = time.monotonic_ns()
+        if at - now > SPIN_NS:
+            time.sleep((at - now - SPIN_NS) / 1e9)
+        while time.monotonic_ns() < at:
+            pass
+        late = max(late, time.monotonic_ns() - at)
+        sock.sendto(HEADER.pack(RTAG, s, ts) + pad, addrs[p])
+    sock.close()
+    wall = (time.monotonic_ns() - t0) / 1e9
+    return {"copies": len(due), "packets": int(seq.max()) + 1 if len(seq) else 0,
+            "wall_s": wall, "max_late_ms": late / 1e6}
+
+
+def load_schedule(n_paths: int, rate: float, duration: float, delays: list = None, scenario: Path = None) -> tuple:
+    """Copy schedule of a periodic source at rate, delayed per path statically or by a scenario."""
+    interval = 1.0 / rate
+    if scenario is not None:
+        send, link_delays = scenario_compiler.packet_delays(
+            scenario_compiler.parse_scenario(scenario), interval, duration, base_latency=0.0)
+        return copy_schedule(send, list(link_delays.values())[:n_paths])
+    send = np.arange(int(np.floor(duration * rate + 1e-9))) * interval
+    return copy_schedule(send, delays or [0.0] * n_paths)
+
+
+# ───── BENCHMARK ────────────────────────────────────────────────────────────
+class _Sink(asyncio.DatagramProtocol):
+    def __init__(self):
+        self.rx_ns, self.seq, self.ts_ns = [], [], []
+
+    def datagram_received(self, data, addr):
+        self.rx_ns.append(time.monotonic_ns())
+        _, seq, ts = HEADER.unpack_from(data)
+        self.seq.append(seq)
+        self.ts_ns.append(ts)
+
+
+async def bench_rate(rate: float, args, params: list) -> dict:
+    """
+    One benchmark step: sink here, proxy and load generator as child processes.
+    Returns None (after printing ✖) if the proxy does not come up.
+    """
+    loop = asyncio.get_running_loop()
+    sink = _Sink()
+    transport, _ = await loop.create_datagram_endpoint(lambda: sink, sock=udp_socket(args.forward))
+    fd, stats_name = tempfile.mkstemp(suffix=".json")
+    os.close(fd)
+    stats_path = Path(stats_name)
+    script = str(Path(__file__).resolve())
+    interval = scenario_compiler._fmt(1.0 / rate)
+    proxy = await asyncio.create_subprocess_exec(
+        sys.executable, script, "proxy", "--ports", args.ports, "--forward", str(args.forward),
+        "--idle-timeout", "0.5", "--stats", str(stats_path),
+        "--param", f"senderTransmissionInterval={interval}", *params, stdout=asyncio.subprocess.PIPE)
+    line = (await proxy.stdout.readline()).decode(errors="replace").strip()
+    if "listening" not in line:
+        if proxy.returncode is None:
+            proxy.kill()
+        await proxy.wait()
+        transport.close()
+        stats_path.unlink()
+        print(f"✖ {rate:>10.0f} pps: proxy did not start (exit code {proxy.returncode}, {line!r})")
+        return None
+    gen = await asyncio.create_subprocess_exec(
+        sys.executable, script, "load", "--ports", args.ports, "--rate", str(rate),
+        "--duration", args.duration, "--size", str(args.size), stdout=asyncio.subprocess.DEVNULL)
+    await gen.wait()
+    await proxy.communicate()
+    await asyncio.sleep(0.05)
+    transport.close()
+    stats = json.loads(stats_path.read_text())
+    stats_path.unlink()
+
+    expected = int(np.floor(parse_seconds(args.duration) * rate + 1e-9))
+    seq = np.array(sink.seq, dtype=np.int64)
+    lat_ms = (np.array(sink.rx_ns, dtype=np.int64) - np.array(sink.ts_ns, dtype=np.int64)) / 1e6
+    m = StreamingRatios()
+    m.update(seq)
+    ooo, dup = m.ratios() if len(seq) else (np.nan, np.nan)
+    span = (sink.rx_ns[-1] - sink.rx_ns[0]) / 1e9 if len(seq) > 1 else np.nan
+    q = np.percentile(lat_ms, (50, 99)) if len(lat_ms) else (np.nan, np.nan)
+    return {"rate_pps": rate, "expected": expected, "proxy_rx": stats["received"], "proxy_fwd": stats["forwarded"],
+            "delivered": len(np.unique(seq)),
+            "delivered_pct": len(np.unique(seq)) / expected * 100 if expected else np.nan,
+            "out_pps": len(seq) / span if span else np.nan, "ooo_pct": ooo, "dup_pct": dup,
+            "proxy_us_per_copy": stats["cpu_s"] / stats["received"] * 1e6 if stats["received"] else np.nan,
+            "lat_p50_ms": q[0], "lat_p99_ms": q[1], "lat_max_ms": lat_ms.max() if len(lat_ms) else np.nan}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FRER merger as a UDP proxy, with load generator and benchmark")
+    parser.add_argument("mode", choices=("proxy", "load", "bench"))
+    parser.add_argument("--ports", type=str, default="50001,50002", help="One input port per path")
+    parser.add_argument("--forward", type=int, default=50000, help="Port of the merged stream (sink)")
+    parser.add_argument("--param", action="append", default=[], metavar="NAME=VALUE",
+                        help="Merger parameter as in omnetpp.ini, e.g. jitter=5ms or enableReordering=true")
+    parser.add_argument("--out", type=Path, default=None, help="proxy: write the vectors as CSV exports here")
+    parser.add_argument("--prefix", type=str, default="live", help="proxy: file prefix of the exports")
+    parser.add_argument("--duration", type=str, default="1s", help="proxy: serve time; load/bench: stream length")
+    parser.add_argument("--idle-timeout", type=float, default=None, help="proxy: stop after this many idle seconds")
+    parser.add_argument("--stats", type=Path, default=None, help="proxy: write counters and CPU time as JSON")
+    parser.add_argument("--rate", type=float, default=1000.0, help="load: packets per second")
+    parser.add_argument("--rates", type=str, default="1000,10000,50000,100000", help="bench: packet rates")
+    parser.add_argument("--delays", type=str, default=None, help="load: static delay per path, e.g. 0,5ms")
+    parser.add_argument("--scenario", type=Path, default=None, help="load: per-path delays from a scenario XML")
+    parser.add_argument("--size", type=int, default=1200, help="Datagram size in bytes")
+    parser.add_argument("--csv", type=Path, default=None, help="bench: write the table as CSV")
+    args = parser.parse_args()
+
+    ports = parse_ports(args.ports)
+    try:
+        entries = dict(p.split("=", 1) for p in args.param)
+    except ValueError:
+        parser.error("--param expects NAME=VALUE")
+
+    if args.mode == "proxy":
+        cfg = MergerConfig.from_ini(entries)
+        proxy = FrerProxy(cfg, ports, (HOST, args.forward))
+        duration = None if args.idle_timeout else parse_seconds(args.duration)
+        ready = lambda: print(f"✔ listening on {ports} → {args.forward}", flush=True)
+        try:
+            asyncio.run(proxy.run(duration, args.idle_timeout, ready))
+        except KeyboardInterrupt:
+            pass
+        stats = {"received": proxy.received, "forwarded": proxy.forwarded, "malformed": proxy.malformed,
+                 "cpu_s": proxy.cpu_s}
+        vectors = proxy.vectors()
+        ooo, dup = ratios(vectors) if proxy.forwarded else (0.0, 0.0)
+        print(f"✔ {proxy.received} copies, {proxy.forwarded} forwarded, {proxy.malformed} malformed; "
+              f"OoO {ooo:.2f} %, Dup {dup:.2f} %")
+        if args.stats:
+            args.stats.write_text(json.dumps(stats))
+        if args.out:
+            args.out.mkdir(parents=True, exist_ok=True)
+            write_results(vectors, args.out, args.prefix, cfg)
+            print(f"✔ Vectors → {args.out}/{args.prefix}_*.csv")
+    elif args.mode == "load":
+        delays = [parse_seconds(d) for d in args.delays.split(",")] if args.delays else None
+        if delays and len(delays) != len(ports):
+            parser.error("--delays needs one value per port")
+        schedule = load_schedule(len(ports), args.rate, parse_seconds(args.duration), delays, args.scenario)
+        r = send_load(ports, schedule, args.size)
+        print(f"✔ {r['packets']} packets / {r['copies']} copies in {r['wall_s']:.3f} s "
+              f"(max {r['max_late_ms']:.3f} ms late)")
+    else:
+        rows = []
+        for rate in (float(r) for r in args.rates.split(",")):
+            row = asyncio.run(bench_rate(rate, args, [a for p in args.param for a in ("--param", p)]))
+            if row is None:
+                continue
+            rows.append(row)
+            print(f"✔ {rate:>10.0f} pps: {row['delivered_pct']:6.2f} % delivered, "
+                  f"{row['proxy_us_per_copy']:6.1f} µs/copy, p99 {row['lat_p99_ms']:.3f} ms")
+        if not rows:
+            print("✖ No benchmark step completed")
+            sys.exit(1)
+        df = pd.DataFrame(rows)
+        print(df.round(3).to_string(index=False))
+        clean = df[(df["delivered_pct"] >= 99.9) & (df["dup_pct"] == 0)]
+        print(f"✔ Highest loss-free rate: {clean['rate_pps'].max():.0f} pps" if len(clean)
+              else "✖ Loss at every rate")
+        if args.csv:
+            df.to_csv(args.csv, index=False)
+
+
+if __name__ == "__main__":
+    main()
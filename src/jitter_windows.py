@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Inter-arrival jitter over time: rolling-window and per-phase statistics.
+
+The intervals between consecutive receptions (packetJitter vector, as in
+plot_arrivalJitter.py) are attributed to the time of the later reception.
+
+- rolling_stats(): every --step, the P50/P95/P99, IQR and σ of the intervals
+  received in the last --window. The window is a SortedWindow that is
+  updated incrementally (bisect insert/remove plus running sums), so each
+  sample is added and removed once instead of re-sorting every window.
+- phase_stats(): the same statistics per scenario phase, i.e. between
+  consecutive delay-change timestamps of scenario.xml, with the link delays
+  in effect during the phase.
+
+Both return dicts of NumPy arrays; the CLI writes them as CSV and can plot
+the rolling percentiles with the phase boundaries.
+
+EX: `python3 jitter_windows.py ../simulations/results/shaping_packetJitter.csv --window 5ms --step 1ms
+        --scenario ../simulations/scenario.xml --out ../simulations/results --plot`
+"""
+import argparse
+from bisect import bisect_left, insort
+from pathlib import Path
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+import scenario_compiler
+from colors import COMNETS_BLUE, COMNETS_MAGENTA, TUD_BLUE
+from result_cache import cached_vector
+from stream_metrics import parse_seconds
+
+QUANTILES = (25, 50, 75, 95, 99)
+STATS = ("count", "mean_ms", "std_ms", "p50_ms", "p95_ms", "p99_ms", "iqr_ms")
+VECTOR = "packetJitter:vector"
+
+
+class SortedWindow:
+    """Multiset of the values in a sliding window with O(log n) search, running mean/σ and percentiles."""
+
+    def __init__(self):
+        self.values = []
+        self.ref = 0.0          # sums are kept around a reference value to avoid cancellation
+        self.total = 0.0
+        self.total_sq = 0.0
+
+    def __len__(self):
+        return len(self.values)
+
+    def add(self, x: float):
+        if not self.values:
+            self.ref, self.total, self.total_sq = x, 0.0, 0.0
+        insort(self.values, x)
+        d = x - self.ref
+        self.total += d
+        self.total_sq += d * d
+
+    def remove(self, x: float):
+        del self.values[bisect_left(self.values, x)]
+        d = x - self.ref
+        self.total -= d
+        self.total_sq -= d * d
+
+    def percentile(self, q: float) -> float:
+        """Linear interpolation between closest ranks, like np.percentile's default."""
+        n = len(self.values)
+        if n == 0:
+            return np.nan
+        pos = (n - 1) * q / 100
+        lo = int(pos)
+        hi = min(lo + 1, n - 1)
+        return self.values[lo] + (self.values[hi] - self.values[lo]) * (pos - lo)
+
+    def stats(self) -> dict:
+        n = len(self.values)
+        shift = self.total / n if n else np.nan
+        var = (self.total_sq - n * shift * shift) / (n - 1) if n > 1 else np.nan
+        p = {q: self.percentile(q) for q in QUANTILES}
+        return {"count": n, "mean_ms": self.ref + shift, "std_ms": float(np.sqrt(max(var, 0.0))) if n > 1 else np.nan,
+                "p50_ms": p[50], "p95_ms": p[95], "p99_ms": p[99], "iqr_ms": p[75] - p[25]}
+
+
+def intervals(path: Path, vector_name: str = VECTOR) -> tuple:
+    """(time_s of the later reception, interval_ms) of a reception vector."""
+    t_s, _ = cached_vector(path, vector_name)
+    return t_s[1:], np.diff(t_s) * 1e3
+
+
+def rolling_stats(t_s: np.ndarray, ms: np.ndarray, window: float, step: float) -> dict:
+    """Statistics of the intervals in (t - window, t] for t = step, 2·step, … up to the last sample."""
+    if not len(t_s):
+        return {"t_s": np.empty(0), **{k: np.empty(0) for k in STATS}}
+    ends = np.arange(step, t_s[-1] + step, step)
+    hi_idx = np.searchsorted(t_s, ends, side="right")
+    lo_idx = np.searchsorted(t_s, ends - window, side="right")
+    win, lo, hi = SortedWindow(), 0, 0
+    rows = []
+    for new_lo, new_hi in zip(lo_idx, hi_idx):
+        for x in ms[hi:new_hi]:
+            win.add(float(x))
+        for x in ms[lo:new_lo]:
+            win.remove(float(x))
+        lo, hi = new_lo, new_hi
+        rows.append(win.stats())
+    return {"t_s": ends, **{k: np.array([r[k] for r in rows], dtype=float) for k in STATS}}
+
+
+def phase_bounds(scenario: Path, end: float) -> np.ndarray:
+    """0, every delay-change time of the scenario before end, and end."""
+    profile = scenario_compiler.parse_scenario(scenario)
+    changes = np.unique(np.concatenate([times for times, _ in profile.values()]))
+    return np.unique(np.r_[0.0, changes[(changes > 0) & (changes < end)], end])
+
+
+def phase_stats(t_s: np.ndarray, ms: np.ndarray, bounds: np.ndarray, scenario: Path = None) -> dict:
+    """Statistics of the intervals in every phase [bounds[i], bounds[i+1]), plus the link delays in effect."""
+    idx = np.searchsorted(t_s, bounds, side="left")
+    idx[-1] = np.searchsorted(t_s, bounds[-1], side="right")     # the last phase includes its end
+    rows = []
+    for lo, hi in zip(idx[:-1], idx[1:]):
+        x = ms[lo:hi]
+        q = np.percentile(x, QUANTILES) if len(x) else [np.nan] * len(QUANTILES)
+        rows.append({"count": len(x), "mean_ms": x.mean() if len(x) else np.nan,
+                     "std_ms": np.std(x, ddof=1) if len(x) > 1 else np.nan,
+                     "p50_ms": q[1], "p95_ms": q[3], "p99_ms": q[4], "iqr_ms": q[2] - q[0]})
+    out = {"start_s": bounds[:-1], "end_s": bounds[1:],
+           **{k: np.array([r[k] for r in rows], dtype=float) for k in STATS}}
+    if scenario is not None:
+        for link, profile in scenario_compiler.parse_scenario(scenario).items():
+            out[f"{link}_delay_ms"] = scenario_compiler.delay_at(profile, bounds[:-1]) * 1e3
+    return out
+
+
+def plot_rolling(rolling: dict, bounds: np.ndarray, label: str, out_pdf: Path):
+    """P50 line with P95/P99 above it and the phase boundaries as vertical lines."""
+    fig, ax = plt.subplots()
+    t_ms = rolling["t_s"] * 1e3
+    ax.plot(t_ms, rolling["p50_ms"], color=TUD_BLUE, label="P50")
+    ax.plot(t_ms, rolling["p95_ms"], color=COMNETS_BLUE, linestyle="--", label="P95")
+    ax.plot(t_ms, rolling["p99_ms"], color=COMNETS_MAGENTA, linestyle="-.", label="P99")
+    for b in bounds[1:-1]:
+        ax.axvline(b * 1e3, color="0.6", linewidth=0.6, zorder=0)
+    ax.set_xlabel("Time (ms)")
+    ax.set_ylabel("Interval (ms)")
+    ax.set_title(label, fontsize=12)
+    ax.legend(frameon=True)
+    fig.savefig(out_pdf, format="pdf", dpi=300, bbox_inches="tight")
+    plt.close(fig)
+    print(f"✅ Saved figure → {out_pdf}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rolling-window and per-phase inter-arrival jitter statistics")
+    parser.add_argument("files", type=Path, nargs="+", help="packetJitter exports (.csv or .vec)")
+    parser.add_argument("--vector", type=str, default=VECTOR)
+    parser.add_argument("--window", type=str, default="5ms", help="Rolling window length")
+    parser.add_argument("--step", type=str, default="1ms", help="Distance between window ends")
+    parser.add_argument("--scenario", type=Path, default=None, help="Scenario XML for per-phase statistics")
+    parser.add_argument("--out", type=Path, default=None,
+                        help="Write <file>_rolling.csv (and <file>_phases.csv) to this folder")
+    parser.add_argument("--plot", action="store_true", help="Also write <file>_rolling.pdf to --out")
+    args = parser.parse_args()
+
+    window, step = parse_seconds(args.window), parse_seconds(args.step)
+    if window <= 0 or step <= 0:
+        parser.error("--window and --step must be positive")
+    if args.plot and args.out is None:
+        parser.error("--plot needs --out")
+    for path in args.files:
+        t_s, ms = intervals(path, args.vector)
+        rolling = rolling_stats(t_s, ms, window, step)
+        end = float(t_s[-1]) if len(t_s) else 0.0
+        bounds = phase_bounds(args.scenario, end) if args.scenario else np.array([0.0, end])
+        phases = phase_stats(t_s, ms, bounds, args.scenario)
+        print(f"✔ {path.name}: {len(ms)} intervals, {len(rolling['t_s'])} windows of {window * 1e3:g} ms")
+        print(pd.DataFrame(phases).round(3).to_string(index=False))
+        if args.out:
+            args.out.mkdir(parents=True, exist_ok=True)
+            pd.DataFrame(rolling).to_csv(args.out / f"{path.stem}_rolling.csv", index=False)
+            if args.scenario:
+                pd.DataFrame(phases).to_csv(args.out / f"{path.stem}_phases.csv", index=False)
+            if args.plot:
+                plot_rolling(rolling, bounds, path.stem, args.out / f"{path.stem}_rolling.pdf")
+
+
+if __name__ == "__main__":
+    main()
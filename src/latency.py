@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Per-packet latency of the merger output.
+
+The source is periodic, so the emission time of every packet follows from its
+sequence number: send = start + (seq - startSequence) × senderTransmissionInterval.
+For trace-driven runs (packet_trace.py) the send times come from the
+`.sendtimes` file of the trace instead (--send-times).
+Joining that with the seqNum vector (recorded when the merger forwards a
+packet) gives the end-to-end latency source → merger output per packet; with
+a linkDelay recording the merger residence time (output − first arrival) is
+split off, and against a baseline run the latency added by sorting/shaping.
+Everything is array arithmetic on the vectors (no per-packet Python loop).
+
+EX: `python3 latency.py ../simulations/results/sorting_seqNum.csv ../simulations/results/shaping_seqNum.csv
+        --baseline ../simulations/results/baseline_seqNum.csv --link-delay ../simulations/results/baseline_linkDelay.csv`
+"""
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+from merger_model import arrivals_from_linkdelay
+from packet_trace import load_send_times
+from result_cache import cached_vector
+from stream_metrics import parse_seconds
+from vec_reader import read_csv_header, read_header
+
+PERCENTILES = (50.0, 99.0, 99.9)
+DEFAULT_INTERVAL = 1e-3
+
+
+def run_config(path: Path) -> dict:
+    """Config entries of a .vec file or scavetool CSV export."""
+    path = Path(path)
+    header = read_header(path) if path.suffix == ".vec" else read_csv_header(path)
+    return header.config
+
+
+def _config_value(config: dict, suffix: str, default=None):
+    for key, value in config.items():
+        if key.endswith(suffix):
+            return value
+    return default
+
+
+def source_timing(path: Path) -> tuple:
+    """(senderTransmissionInterval_s, startSequence) of the merger in a recorded run."""
+    config = run_config(path)
+    interval = _config_value(config, "merger.senderTransmissionInterval")
+    start_sequence = _config_value(config, "merger.startSequence", 0)
+    return (parse_seconds(str(interval)) if interval else DEFAULT_INTERVAL), int(start_sequence)
+
+
+def first_delivery(t_s: np.ndarray, seq: np.ndarray) -> tuple:
+    """(seq, t_s) of the first occurrence of every sequence number, sorted by seq."""
+    order = np.argsort(t_s, kind="stable")
+    seq_u, first = np.unique(seq[order], return_index=True)
+    return seq_u, t_s[order][first]
+
+
+def packet_latency(path: Path, interval: float = None, start: float = 0.0,
+                   start_sequence: int = None, vector_name: str = "seqNum:vector",
+                   send_times: np.ndarray = None) -> dict:
+    """
+    End-to-end latency (source → merger output) of every delivered packet.
+    interval/start_sequence default to the merger config of the run;
+    send_times (indexed by seq - startSequence) replaces the periodic send times.
+    Returns {"seq", "sent", "delivered", "latency"} arrays sorted by seq
+    (duplicates are dropped; the first delivery counts).
+    """
+    if interval is None or start_sequence is None:
+        cfg_interval, cfg_start = source_timing(path)
+        interval = cfg_interval if interval is None else interval
+        start_sequence = cfg_start if start_sequence is None else start_sequence
+    t_s, values = cached_vector(path, vector_name)
+    seq, delivered = first_delivery(t_s, values.astype(np.int64))
+    if send_times is not None:
+        keep = (seq >= start_sequence) & (seq - start_sequence < len(send_times))
+        seq, delivered = seq[keep], delivered[keep]
+        sent = np.asarray(send_times[seq - start_sequence])
+    else:
+        sent = start + (seq - start_sequence) * interval
+    return {"seq": seq, "sent": sent, "delivered": delivered, "latency": delivered - sent}
+
+
+def residence_time(lat: dict, arrivals: tuple) -> np.ndarray:
+    """
+    Time each delivered packet spent in the merger: output time minus the
+    arrival of its first copy (arrivals as returned by arrivals_from_linkdelay).
+    NaN where no copy of the packet is in the arrivals.
+    """
+    arr_seq, first_arrival = first_delivery(arrivals[0], arrivals[1])
+    pos = np.searchsorted(arr_seq, lat["seq"])
+    found = pos < len(arr_seq)
+    found[found] = arr_seq[pos[found]] == lat["seq"][found]
+    out = np.full(len(lat["seq"]), np.nan)
+    out[found] = lat["delivered"][found] - first_arrival[pos[found]]
+    return out
+
+
+def added_latency(lat: dict, baseline: dict) -> tuple:
+    """(seq, latency - baseline latency) for packets delivered in both runs."""
+    seq, i, j = np.intersect1d(lat["seq"], baseline["seq"], assume_unique=True, return_indices=True)
+    return seq, lat["latency"][i] - baseline["latency"][j]
+
+
+def delay_variation(lat: dict) -> np.ndarray:
+    """Latency difference between consecutive delivered packets (IPDV), valid for aperiodic sources too."""
+    consecutive = np.diff(lat["seq"]) == 1
+    return np.diff(lat["latency"])[consecutive]
+
+
+def summarize(x: np.ndarray) -> dict:
+    """count, mean, P50/P99/P99.9 and max of x (NaNs ignored)."""
+    x = np.asarray(x, dtype=float)
+    x = x[~np.isnan(x)]
+    if not len(x):
+        return {"count": 0, "mean": np.nan, **{f"p{p:g}": np.nan for p in PERCENTILES}, "max": np.nan}
+    pct = np.percentile(x, PERCENTILES)
+    return {"count": len(x), "mean": float(x.mean()),
+            **{f"p{p:g}": float(v) for p, v in zip(PERCENTILES, pct)}, "max": float(x.max())}
+
+
+def _fmt_row(label: str, stats: dict) -> str:
+    us = lambda v: f"{v * 1e6:10.1f}"
+    cols = "".join(us(stats[k]) for k in ("mean", "p50", "p99", "p99.9", "max"))
+    return f"  {label:<10}{cols}   (n={stats['count']})"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-packet end-to-end latency and merger residence time")
+    parser.add_argument("files", type=Path, nargs="+", help="seqNum CSV exports or .vec files")
+    parser.add_argument("--baseline", type=Path, default=None,
+                        help="seqNum recording of the baseline run (for the added latency)")
+    parser.add_argument("--link-delay", type=Path, default=None,
+                        help="linkDelay recording of the arrivals (for the merger residence time)")
+    parser.add_argument("--interval", type=str, default=None,
+                        help="Source interval (default: senderTransmissionInterval of the run)")
+    parser.add_argument("--start", type=str, default="0s", help="Emission time of the first packet")
+    parser.add_argument("--send-times", type=Path, default=None,
+                        help="<name>.sendtimes of a trace-driven run (packet_trace.py)")
+    parser.add_argument("--per-packet", type=Path, default=None,
+                        help="Folder to write <file>_latency.csv with per-packet values")
+    args = parser.parse_args()
+
+    interval = parse_seconds(args.interval) if args.interval else None
+    start = parse_seconds(args.start)
+    send_times = load_send_times(args.send_times) if args.send_times else None
+    baseline = packet_latency(args.baseline, interval, start, send_times=send_times) if args.baseline else None
+    arrivals = None
+    if args.link_delay:
+        arr_interval = interval or source_timing(args.link_delay)[0]
+        arrivals = arrivals_from_linkdelay(args.link_delay, interval=arr_interval, start=start,
+                                           send_times=send_times)
+
+    print(f"  {'[us]':<10}{'mean':>10}{'P50':>10}{'P99':>10}{'P99.9':>10}{'max':>10}")
+    for path in args.files:
+        lat = packet_latency(path, interval, start, send_times=send_times)
+        print(path.name)
+        print(_fmt_row("e2e", summarize(lat["latency"])))
+        print(_fmt_row("ipdv", summarize(np.abs(delay_variation(lat)))))
+        columns = {"seq": lat["seq"], "sent_s": lat["sent"], "delivered_s": lat["delivered"],
+                   "latency_s": lat["latency"]}
+        if arrivals is not None:
+            columns["residence_s"] = residence_time(lat, arrivals)
+            print(_fmt_row("residence", summarize(columns["residence_s"])))
+        if baseline is not None:
+            seq, added = added_latency(lat, baseline)
+            print(_fmt_row("added", summarize(added)))
+            columns["added_s"] = np.full(len(lat["seq"]), np.nan)
+            columns["added_s"][np.searchsorted(lat["seq"], seq)] = added
+        if args.per_packet:
+            args.per_packet.mkdir(parents=True, exist_ok=True)
+            out = args.per_packet / f"{path.stem}_latency.csv"
+            np.savetxt(out, np.column_stack(list(columns.values())), delimiter=",",
+                       header=",".join(columns), comments="", fmt="%.12g")
+            print(f"✔ Wrote per-packet latency → {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+"""
+Reference model of the StreamMergerSorter merger for what-if analysis
+without OMNeT++.
+
+The model replays the arrivals of all redundant copies at s2 (time, seqNum,
+end-to-end delay) through the same stages as the merger and records the
+same vectors as the simulation:
+
+- elimination: a copy is dropped when its seqNum is among the last
+  `historyLength` accepted sequence numbers (baseline: historyLength = bufferSize;
+  `recoveryAlgorithm` selects an 802.1CB scheme instead, see recovery.py);
+- DHL (`dynamicBuffersize`): every `timerInterval` the target history length is
+  ceil((Dmax - Dmin + jitter) / senderTransmissionInterval) from the delays seen
+  in that interval; increases apply at once, decreases halve the distance;
+- sorting (`enableReordering`): packets ahead of the next expected seqNum wait
+  in the reorder buffer until the gap is filled or the buffer exceeds the
+  history length; late packets pass through;
+- shaping (`periodicEmission`): in-order packets leave at most one per
+  senderTransmissionInterval.
+
+Times are handled as integer picoseconds like OMNeT++ simtime, so ties
+(timer vs. arrival, both copies at once) resolve the same way: timers first,
+then older packets first.
+
+EX: `python3 merger_model.py --validate ../simulations/results`
+    `python3 merger_model.py --param jitter=0..10ms --param bufferSize=5,10`
+"""
+import argparse
+import heapq
+from collections import deque
+from dataclasses import dataclass, fields
+from pathlib import Path
+
+import numpy as np
+
+import recovery
+import scenario_compiler
+from export_vector import write_vector_csv
+from stream_metrics import StreamingRatios, parse_seconds
+from sweep import MERGER, expand_grid, parse_grid, run_name
+from vec_reader import load_vector, read_csv_header
+
+PS = 10 ** 12                     # picoseconds per second
+MERGER_MODULE = "FRERnetwork.s2.bridging.streamRelay.merger"
+SINK_MODULE   = "FRERnetwork.destination.app[0].sink"
+# merger → sink latency in the checked-in runs (30.436 µs - 20.274 µs)
+SINK_DELAY    = 10.162e-6
+# transmission time of one 1200 B UDP payload frame on the 1 Gbps s2 → destination link
+FRAME_TX_TIME = 10.208e-6
+
+
+@dataclass
+class MergerConfig:
+    """Merger parameters, named as in omnetpp.ini (durations in seconds)."""
+    bufferSize: int = 5
+    timerInterval: float = 10e-3
+    senderTransmissionInterval: float = 1e-3
+    jitter: float = 10e-3
+    enableReordering: bool = False
+    periodicEmission: bool = False
+    dynamicBuffersize: bool = True
+    startSequence: int = 0
+    recoveryAlgorithm: str = "history"      # model only, see recovery.ALGORITHMS
+
+    @classmethod
+    def from_ini(cls, entries: dict) -> "MergerConfig":
+        """
+        Build a config from ini-style entries. Keys may be bare parameter names
+        or full `*.s2.bridging.streamRelay.merger.<name>` keys; values may be
+        ini literals such as `10ms` or `true`.
+        """
+        cfg = cls()
+        for f in fields(cls):
+            raw = entries.get(f.name, entries.get(f"{MERGER}.{f.name}"))
+            if raw is None:
+                continue
+            if f.type is bool:
+                value = raw if isinstance(raw, bool) else str(raw).strip().lower() == "true"
+            elif f.type is int:
+                value = int(raw)
+            elif f.type is str:
+                value = str(raw).strip().strip('"')
+            else:
+                value = raw if isinstance(raw, (int, float)) else parse_seconds(str(raw).strip())
+            setattr(cfg, f.name, value)
+        return cfg
+
+
+def arrivals_from_linkdelay(path: Path, vector_name: str = "linkDelay:vector",
+                            interval: float = 1e-3, start: float = 0.0, send_times: np.ndarray = None) -> tuple:
+    """
+    Arrivals at the merger from a linkDelay recording (time, delay in ms per copy).
+    The seqNum of each copy follows from its send time on the periodic source,
+    or, with send_times (packet_trace.py), is the last packet sent before the copy entered the link.
+    Returns (arrival_s, seq, delay_s).
+    """
+    t_s, delay_ms = load_vector(path, vector_name)
+    delay_s = delay_ms * 1e-3
+    if send_times is not None:
+        # 1 ns of slack: the recorded time minus the delay is the send time up to rounding
+        seq = np.searchsorted(send_times, t_s - delay_s + 1e-9, side="right").astype(np.int64) - 1
+    else:
+        seq = np.rint((t_s - delay_s - start) / interval).astype(np.int64)
+    return t_s, seq, delay_s
+
+
+def _ps(x) -> np.ndarray:
+    return np.rint(np.asarray(x, dtype=float) * PS).astype(np.int64)
+
+
+def _fifo_departures(emit_ps: np.ndarray, tx_ps: int) -> np.ndarray:
+    """
+    Start of transmission of each packet on a FIFO link: max(emit_i, start_{i-1} + tx).
+    Vectorized as start_i = i*tx + running max of (emit_k - k*tx).
+    """
+    if len(emit_ps) == 0:
+        return emit_ps
+    k = np.arange(len(emit_ps), dtype=np.int64) * tx_ps
+    return k + np.maximum.accumulate(emit_ps - k)
+
+
+class Merger:
+    """
+    Event-driven merger state, times in integer picoseconds. Drive it in time
+    order with advance(now) (fires the timers due up to now) before every
+    arrive(now, ...); emitted packets go to on_emit(now, seq, item), where item
+    is whatever was passed to arrive() with the packet.
+    simulate() replays recorded arrivals through it, frer_proxy.py live datagrams.
+    """
+
+    def __init__(self, cfg: MergerConfig, on_emit=None):
+        self.cfg = cfg
+        self.on_emit = on_emit
+        self.ts = int(round(cfg.senderTransmissionInterval * PS))
+        self.tau = int(round(cfg.timerInterval * PS))
+        self.jitter = int(round(cfg.jitter * PS))
+        self.hl = max(1, cfg.bufferSize)
+        self.recovery = recovery.create(cfg.recoveryAlgorithm, self.hl)
+        self.out_t, self.out_seq = [], []
+        self.hl_t, self.hl_v = ([0], [self.hl]) if cfg.dynamicBuffersize else ([], [])
+        self.buf_t, self.buf_v = [], []
+        self.d_min = self.d_max = None
+        self.reorder = []         # heap of (seq, item) waiting for a gap
+        self.ready = deque()      # in-order packets waiting for the shaper
+        self.next_seq = cfg.startSequence
+        self.last_emit = None
+        self.next_tick = self.tau if cfg.dynamicBuffersize and self.tau > 0 else None
+
+    def buffered(self) -> int:
+        return len(self.reorder) + len(self.ready)
+
+    def _emit(self, now, s, item):
+        self.out_t.append(now)
+        self.out_seq.append(s)
+        self.last_emit = now
+        if self.on_emit is not None:
+            self.on_emit(now, s, item)
+
+    def _deliver(self, now, s, item, from_buffer):
+        """Packet is in order: emit it now or queue it for the shaper."""
+        if self.cfg.periodicEmission and (self.ready or (self.last_emit is not None and now < self.last_emit + self.ts)):
+            self.ready.append((s, item))
+            if not from_buffer:
+                self.buf_t.append(now)
+                self.buf_v.append(self.buffered())
+            return
+        self._emit(now, s, item)
+        if from_buffer:
+            self.buf_t.append(now)
+            self.buf_v.append(self.buffered())
+
+    def _flush(self, now):
+        while self.reorder and self.reorder[0][0] <= self.next_seq:
+            s, item = heapq.heappop(self.reorder)
+            if s == self.next_seq:
+                self.next_seq += 1
+            self._deliver(now, s, item, from_buffer=True)
+
+    def _tick(self, now):
+        spread = (self.d_max - self.d_min) if self.d_min is not None else 0
+        target = max(1, -(-(spread + self.jitter) // self.ts))
+        self.hl = target if target >= self.hl else (self.hl + target) // 2
+        self.recovery.resize(self.hl)
+        self.hl_t.append(now)
+        self.hl_v.append(self.hl)
+        self.d_min = self.d_max = None
+
+    def next_timer(self):
+        """Time of the next DHL tick or shaper emission, None if nothing is pending."""
+        due = self.last_emit + self.ts if (self.ready and self.cfg.periodicEmission) else None
+        pending = [c for c in (self.next_tick, due) if c is not None]
+        return min(pending) if pending else None
+
+    def advance(self, now: int):
+        """Fire every timer due at or before now, each at its own time."""
+        while True:
+            timer = self.next_timer()
+            if timer is None or timer > now:
+                return
+            if self.ready and self.cfg.periodicEmission and timer == self.last_emit + self.ts:
+                s, item = self.ready.popleft()
+                self._emit(timer, s, item)
+                self.buf_t.append(timer)
+                self.buf_v.append(self.buffered())
+            if timer == self.next_tick:
+                self._tick(timer)
+                self.next_tick += self.tau
+
+    def arrive(self, now: int, s: int, d: int, item=None):
+        """One copy of packet s with path delay d arrives at now."""
+        self.d_min = d if self.d_min is None else min(self.d_min, d)
+        self.d_max = d if self.d_max is None else max(self.d_max, d)
+        if not self.recovery.accept(s):
+            return
+
+        if not self.cfg.enableReordering or s <= self.next_seq:
+            if s == self.next_seq:
+                self.next_seq += 1
+            self._deliver(now, s, item, from_buffer=False)
+            if self.cfg.enableReordering:
+                self._flush(now)
+            return
+        heapq.heappush(self.reorder, (s, item))
+        self.buf_t.append(now)
+        self.buf_v.append(self.buffered())
+        if len(self.reorder) > self.hl:         # give up on the gap
+            self.next_seq = self.reorder[0][0]
+            self._flush(now)
+
+    def vectors(self) -> dict:
+        """{vector name: (times_s, values)} of seqNum, historyLength and reorderBuffLength so far."""
+        return {
+            "seqNum:vector":            (np.array(self.out_t, dtype=np.int64) / PS, np.array(self.out_seq, dtype=float)),
+            "historyLength:vector":     (np.array(self.hl_t) / PS, np.array(self.hl_v, dtype=float)),
+            "reorderBuffLength:vector": (np.array(self.buf_t) / PS, np.array(self.buf_v, dtype=float)),
+        }
+
+
+def simulate(arrivals: tuple, cfg: MergerConfig, sim_time_limit: float = None,
+             sink_delay: float = SINK_DELAY, frame_tx_time: float = FRAME_TX_TIME) -> dict:
+    """
+    Run the merger model over arrivals (arrival_s, seq, delay_s) and return
+    {vector name: (times_s, values)} for seqNum, historyLength,
+    reorderBuffLength and packetJitter. Packets emitted back to back queue
+    on the output link (frame_tx_time each) before reaching the sink.
+    """
+    t_arr, seq, delay = (np.asarray(a) for a in arrivals)
+    order = np.lexsort((seq, t_arr))                 # time, then older packet first
+    t_ps = _ps(t_arr)[order]
+    seqs = np.asarray(seq, dtype=np.int64)[order]
+    d_ps = _ps(delay)[order]
+    limit = int(t_ps[-1]) if sim_time_limit is None and len(t_ps) else int(round((sim_time_limit or 0) * PS))
+    if sim_time_limit is not None:
+        keep = t_ps <= limit
+        t_ps, seqs, d_ps = t_ps[keep], seqs[keep], d_ps[keep]
+
+    send_ps = []
+    merger = Merger(cfg, on_emit=lambda now, s, sent: send_ps.append(sent))
+    for now, s, d in zip(t_ps.tolist(), seqs.tolist(), d_ps.tolist()):
+        merger.advance(now)
+        merger.arrive(now, s, d, now - d)
+    merger.advance(limit)
+
+    vectors = merger.vectors()
+    out_t = np.array(merger.out_t, dtype=np.int64)
+    sink_ps = _fifo_departures(out_t, int(round(frame_tx_time * PS))) + int(round(sink_delay * PS))
+    e2e = sink_ps - np.array(send_ps, dtype=np.int64)
+    vectors["packetJitter:vector"] = (sink_ps / PS, np.diff(e2e, prepend=0) / PS)
+    return vectors
+
+
+def write_results(vectors: dict, folder: Path, prefix: str, cfg: MergerConfig):
+    """Write the model vectors as `<prefix>_<vector>.csv` in the scavetool export layout."""
+    config = {f"{MERGER}.{f.name}": str(getattr(cfg, f.name)) for f in fields(cfg)}
+    for name, data in vectors.items():
+        module = SINK_MODULE if name == "packetJitter:vector" else MERGER_MODULE
+        out = folder / f"{prefix}_{name.split(':')[0]}.csv"
+        write_vector_csv(out, f"model-{prefix}", {"configname": "model"}, config,
+                         {(module, name): data})
+
+
+def ratios(vectors: dict) -> tuple:
+    """(OoO %, Dup %) of the modelled seqNum vector."""
+    m = StreamingRatios()
+    m.update(vectors["seqNum:vector"][1])
+    return m.ratios()
+
+
+def validate(results_dir: Path, delay_csv: str = "baseline_linkDelay.csv"):
+    """
+    Replay the recorded linkDelay arrivals through the model with the config
+    stored in every *_seqNum.csv export, and compare the seqNum vectors.
+    """
+    arrivals = arrivals_from_linkdelay(results_dir / delay_csv)
+    print(f"{'run':<22}{'OoO sim':>9}{'OoO model':>11}{'Dup sim':>9}{'Dup model':>11}  seqNum")
+    for csv_path in sorted(results_dir.glob("*_seqNum.csv")):
+        header = read_csv_header(csv_path)
+        cfg = MergerConfig.from_ini(header.config)
+        limit = parse_seconds(header.config.get("sim-time-limit", "100ms"))
+        vectors = simulate(arrivals, cfg, limit)
+        t_sim, s_sim = load_vector(csv_path, "seqNum:vector")
+        t_mod, s_mod = vectors["seqNum:vector"]
+        same = (len(s_sim) == len(s_mod) and np.array_equal(s_sim, s_mod)
+                and np.allclose(t_sim, t_mod, atol=1e-9))
+        m = StreamingRatios()
+        m.update(s_sim)
+        (o_sim, d_sim), (o_mod, d_mod) = m.ratios(), ratios(vectors)
+        name = csv_path.name[:-len("_seqNum.csv")]
+        print(f"{name:<22}{o_sim:9.2f}{o_mod:11.2f}{d_sim:9.2f}{d_mod:11.2f}  "
+              f"{'identical' if same else 'differs'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="StreamMergerSorter reference model")
+    parser.add_argument("--arrivals", type=Path,
+                        default=Path(__file__).resolve().parent.parent / "simulations" / "results" / "baseline_linkDelay.csv",
+                        help="linkDelay recording (CSV export or .vec) with the arrivals at s2")
+    parser.add_argument("--scenario", type=Path, default=None,
+                        help="Derive the arrivals from a scenario XML instead of --arrivals")
+    parser.add_argument("--production-interval", type=str, default="1ms",
+                        help="Source productionInterval used with --scenario")
+    parser.add_argument("--param", action="append", default=[], metavar="NAME=VALUES",
+                        help="Merger parameter grid, as in sweep.py (e.g. jitter=0..10ms)")
+    parser.add_argument("--sim-time-limit", type=str, default="100ms")
+    parser.add_argument("--out", type=Path, default=None,
+                        help="Write the vectors of every grid point as CSV exports into this folder")
+    parser.add_argument("--validate", type=Path, default=None, metavar="RESULTS_DIR",
+                        help="Compare the model with the checked-in exports in RESULTS_DIR")
+    args = parser.parse_args()
+
+    if args.validate:
+        validate(args.validate)
+        return
+
+    limit = parse_seconds(args.sim_time_limit)
+    if args.scenario:
+        profile = scenario_compiler.parse_scenario(args.scenario)
+        arrivals = scenario_compiler.arrivals(profile, parse_seconds(args.production_interval), limit)
+    else:
+        arrivals = arrivals_from_linkdelay(args.arrivals)
+    points = expand_grid(parse_grid(args.param))
+    if args.out:
+        args.out.mkdir(parents=True, exist_ok=True)
+    print(f"{'config':<40}{'OoO (%)':>9}{'Dup (%)':>9}{'max HL':>8}{'max buf':>9}")
+    for point in points:
+        cfg = MergerConfig.from_ini(point)
+        vectors = simulate(arrivals, cfg, limit)
+        ooo, dup = ratios(vectors)
+        hl = vectors["historyLength:vector"][1]
+        buf = vectors["reorderBuffLength:vector"][1]
+        name = run_name(point, "model")
+        print(f"{name:<40}{ooo:9.2f}{dup:9.2f}"
+              f"{int(hl.max()) if len(hl) else cfg.bufferSize:8d}{int(buf.max()) if len(buf) else 0:9d}")
+        if args.out:
+            write_results(vectors, args.out, name, cfg)
+
+
+if __name__ == "__main__":
+    main()
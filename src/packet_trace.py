@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+Trace-driven source traffic for the FRER scenario.
+
+The source app of omnetpp.ini sends 1200 B every 1 ms. This script turns a
+recorded packet trace into a run of the same network whose source sends the
+trace instead:
+
+- Input: a pcap file (classic libpcap, µs or ns timestamps; pcapng is not
+  supported) or a CSV with a timestamp column (`timestamp`/`time`, unit via
+  --time-unit) and a size column (`size`/`length`/`bytes`). pcap frame
+  lengths are reduced by --overhead (Ethernet+IPv4+UDP headers) to get the
+  UDP payload that UdpSourceApp's packetLength means.
+- Output in `simulations/`:
+  `<name>.xml`  the link scenario (--scenario) merged with `set-param`
+                commands that give the source its next productionInterval
+                and packetLength between two packets (only when they change),
+  `<name>.ini`  an overlay of omnetpp.ini with `[Config <name>]` using it,
+  `<name>.sendtimes`  the send time (s, float64) of every packet, indexed by
+                seq − startSequence, for the analysis scripts
+                (latency.py --send-times, arrivals_from_linkdelay(send_times=...)).
+
+Packets closer than --min-gap are spaced to --min-gap (a 1200 B frame takes
+~10 µs at 1 Gbps, so such bursts queue at the source anyway); the send times
+file holds the adjusted times. The trace is read and written chunk by chunk,
+so this script's memory does not grow with it. The simulator does not
+stream: ScenarioManager loads `<name>.xml` as one DOM at initialization,
+so a trace may produce at most --max-changes source parameter changes
+(MAX_CHANGES by default, roughly that many packets for traffic whose
+interval changes every packet). Longer traces fail with an error; replay
+a part of them with --start/--duration.
+
+Run: `./FRER -u Cmdenv -c <name> <name>.ini` (or run_sim.py with that ini).
+Merger parameters such as senderTransmissionInterval (used by shaping) are
+left as configured; pass --merger-interval to set it for the trace.
+
+EX: `python3 packet_trace.py capture.pcap --name replay --scenario ../simulations/scenario.xml`
+    `python3 packet_trace.py trace.csv --time-unit us --name replay --duration 500ms`
+"""
+import argparse
+import struct
+import sys
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from scenario_compiler import _fmt
+from stream_metrics import parse_seconds
+from sweep import INI_PATH, MERGER, SIM_DIR
+
+SOURCE_MODULE = "source.app[0].source"
+SOURCE_KEY    = f"*.{SOURCE_MODULE}"
+CHUNK_ROWS    = 200_000
+MIN_GAP       = 1e-6
+MAX_CHANGES   = 200_000          # <at> elements ScenarioManager has to hold in memory
+STOP_INTERVAL = "1000s"          # productionInterval after the last packet: no further packets
+UDP_OVERHEAD  = 14 + 20 + 8      # Ethernet, IPv4 and UDP headers in a pcap frame
+TIME_UNITS    = {"s": 1.0, "ms": 1e-3, "us": 1e-6, "ns": 1e-9}
+TIME_COLUMNS  = ("timestamp", "time", "t")
+SIZE_COLUMNS  = ("size", "length", "bytes", "len")
+PCAP_MAGIC    = {0xA1B2C3D4: 1_000, 0xA1B23C4D: 1}   # magic → ns per timestamp fraction unit
+
+
+# ───── READERS ──────────────────────────────────────────────────────────────
+def iter_pcap(path: Path, overhead: int = UDP_OVERHEAD, chunk_rows: int = CHUNK_ROWS):
+    """Yield (t_ns, payload_bytes) int64 arrays from a classic pcap file, chunk by chunk."""
+    with open(path, "rb") as f:
+        head = f.read(24)
+        if len(head) < 24:
+            raise ValueError(f"{path}: not a pcap file")
+        for endian in ("<", ">"):
+            magic = struct.unpack(endian + "I", head[:4])[0]
+            if magic in PCAP_MAGIC:
+                break
+        else:
+            raise ValueError(f"{path}: unsupported capture format (only classic pcap, not pcapng)")
+        frac_ns = PCAP_MAGIC[magic]
+        record = struct.Struct(endian + "IIII")
+        times, sizes = [], []
+        while True:
+            rec = f.read(record.size)
+            if len(rec) < record.size:
+                break
+            sec, frac, incl_len, orig_len = record.unpack(rec)
+            f.seek(incl_len, 1)
+            times.append(sec * 1_000_000_000 + frac * frac_ns)
+            sizes.append(orig_len - overhead)
+            if len(times) >= chunk_rows:
+                yield np.array(times, dtype=np.int64), np.array(sizes, dtype=np.int64)
+                times, sizes = [], []
+        if times:
+            yield np.array(times, dtype=np.int64), np.array(sizes, dtype=np.int64)
+
+
+def _column(columns, names: tuple, path: Path) -> str:
+    for c in columns:
+        if c.strip().lower() in names:
+            return c
+    raise ValueError(f"{path}: no column named {' / '.join(names)}")
+
+
+def iter_csv(path: Path, time_unit: str = "s", overhead: int = 0, chunk_rows: int = CHUNK_ROWS):
+    """Yield (t_ns, payload_bytes) int64 arrays from a CSV trace, chunk by chunk."""
+    scale = TIME_UNITS[time_unit] * 1e9
+    t_col = s_col = None
+    for chunk in pd.read_csv(path, chunksize=chunk_rows):
+        if t_col is None:
+            t_col = _column(chunk.columns, TIME_COLUMNS, path)
+            s_col = _column(chunk.columns, SIZE_COLUMNS, path)
+        t_ns = np.rint(chunk[t_col].to_numpy(dtype=float) * scale).astype(np.int64)
+        yield t_ns, chunk[s_col].to_numpy(dtype=np.int64) - overhead
+
+
+def iter_trace(path: Path, time_unit: str = "s", overhead: int = None):
+    path = Path(path)
+    if path.suffix in (".pcap", ".cap"):
+        return iter_pcap(path, UDP_OVERHEAD if overhead is None else overhead)
+    return iter_csv(path, time_unit, overhead or 0)
+
+
+# ───── COMPILER ─────────────────────────────────────────────────────────────
+def scenario_events(path: Path) -> list:
+    """[(t_ns, xml command strings)] of an existing ScenarioManager script."""
+    events = []
+    for at in ET.parse(path).getroot().iter("at"):
+        cmds = [ET.tostring(cmd, encoding="unicode").strip() for cmd in at if isinstance(cmd.tag, str)]
+        if cmds:
+            events.append((int(round(parse_seconds(at.get("t")) * 1e9)), cmds))
+    return sorted(events, key=lambda e: e[0])
+
+
+def _packets(chunks, start_ns: int, min_gap_ns: int, duration_ns: int = None):
+    """Re-based, monotonic (≥ min_gap apart) (t_ns, size) chunks; stops after duration."""
+    t0 = last = None
+    for t_ns, size in chunks:
+        if not len(t_ns):
+            continue
+        if t0 is None:
+            t0 = int(t_ns[0])
+        t = t_ns - t0 + start_ns
+        done = False
+        if duration_ns is not None:
+            keep = t < start_ns + duration_ns
+            done = not keep.all()
+            t, size = t[keep], size[keep]
+        if len(t):
+            # t'_i = max(t_i, t'_{i-1} + gap) = i·gap + running max of (t_i − i·gap), floored by the last chunk
+            steps = np.arange(len(t), dtype=np.int64) * min_gap_ns
+            floor = last + min_gap_ns if last is not None else t[0]
+            t = np.maximum.accumulate(np.maximum(t - steps, floor)) + steps
+            last = int(t[-1])
+            yield t, np.maximum(size, 1)
+        if done:
+            return
+
+
+def compile_trace(chunks, xml_path: Path, send_path: Path, base_scenario: Path = None,
+                  start: float = 0.0, min_gap: float = MIN_GAP, duration: float = None,
+                  max_changes: int = MAX_CHANGES) -> dict:
+    """
+    Write the merged scenario and the send times of the trace in chunks.
+    The command for packet k sits halfway between packets k-1 and k, after
+    the source scheduled packet k with the previous interval and before it
+    sends packet k and schedules k+1. Returns the values for the ini.
+    Raises ValueError once the scenario would exceed max_changes commands.
+    """
+    base = scenario_events(base_scenario) if base_scenario else []
+    base_i = 0
+    state = {"count": 0, "changes": 0}
+    window_t, window_s = np.empty(0, np.int64), np.empty(0, np.int64)
+    interval = size = None
+
+    def flush_base(upto_ns, out):
+        nonlocal base_i
+        while base_i < len(base) and base[base_i][0] <= upto_ns:
+            t_ns, cmds = base[base_i]
+            out.write(f'  <at t="{_fmt(t_ns / 1e9)}">\n' + "".join(f"    {c}\n" for c in cmds) + "  </at>\n")
+            base_i += 1
+
+    def emit(t, s, upto, out, last_interval=None):
+        """Commands for packets 1..upto-1 of window (t, s); packet k needs t[k+1]."""
+        nonlocal interval, size
+        for k in range(1, upto):
+            nxt = int(t[k + 1] - t[k]) if k + 1 < len(t) else last_interval
+            cmds = []
+            if nxt != interval:
+                value = _fmt(nxt / 1e9) if isinstance(nxt, int) else nxt
+                cmds.append(f'<set-param module="{SOURCE_MODULE}" par="productionInterval" value="{value}"/>')
+                interval = nxt
+            if int(s[k]) != size:
+                cmds.append(f'<set-param module="{SOURCE_MODULE}" par="packetLength" value="{int(s[k])}B"/>')
+                size = int(s[k])
+            if cmds:
+                if state["changes"] >= max_changes:
+                    raise ValueError(
+                        f"the trace needs more than {max_changes} source parameter changes, more than "
+                        f"ScenarioManager should load at once (it parses {xml_path.name} as one DOM); "
+                        f"replay a part with --duration (at packet {state['count'] - len(t) + k}, "
+                        f"{t[k] / 1e9:.6f} s) or raise --max-changes")
+                at = int(t[k - 1] + (t[k] - t[k - 1]) // 2)
+                flush_base(at, out)
+                out.write(f'  <at t="{_fmt(at / 1e9)}">\n' + "".join(f"    {c}\n" for c in cmds) + "  </at>\n")
+                state["changes"] += 1
+
+    duration_ns = int(round(duration * 1e9)) if duration else None
+    with open(xml_path, "w") as out, open(send_path, "wb") as send:
+        out.write("<scenario>\n  <!-- generated by packet_trace.py -->\n")
+        for t, s in _packets(chunks, int(round(start * 1e9)), max(1, int(round(min_gap * 1e9))), duration_ns):
+            (t / 1e9).astype("<f8").tofile(send)
+            if state["count"] == 0:
+                state["offset_ns"], state["first_size"] = int(t[0]), int(s[0])
+                if len(t) > 1:
+                    state["first_interval_ns"] = int(t[1] - t[0])
+                size = int(s[0])
+            state["count"] += len(t)
+            state["last_ns"] = int(t[-1])
+            # keep the last two packets: the next chunk supplies their successor
+            window_t, window_s = np.r_[window_t, t], np.r_[window_s, s]
+            if "first_interval_ns" not in state and len(window_t) > 1:
+                state["first_interval_ns"] = int(window_t[1] - window_t[0])
+            if interval is None and "first_interval_ns" in state:
+                interval = state["first_interval_ns"]
+            emit(window_t, window_s, len(window_t) - 1, out)
+            window_t, window_s = window_t[-2:], window_s[-2:]
+        if state["count"] == 0:
+            raise ValueError("the trace holds no packets")
+        emit(window_t, window_s, len(window_t), out, last_interval=STOP_INTERVAL)
+        if state["count"] == 1:
+            interval = STOP_INTERVAL
+        flush_base(np.iinfo(np.int64).max, out)
+        out.write("</scenario>\n")
+    state["first_interval"] = (_fmt(state["first_interval_ns"] / 1e9)
+                               if "first_interval_ns" in state else STOP_INTERVAL)
+    return state
+
+
+def write_ini(ini_path: Path, config: str, xml_path: Path, state: dict, drain: float,
+              merger_interval: str = None, base_ini: Path = INI_PATH):
+    """Overlay of base_ini whose source replays the compiled trace."""
+    limit = state["last_ns"] / 1e9 + drain
+    lines = [
+        "# generated by packet_trace.py, do not edit",
+        f"include {base_ini.resolve()}",
+        "",
+        f"[Config {config}]",
+        f"sim-time-limit = {_fmt(limit)}",
+        f'*.scenarioManager.script = xmldoc("{xml_path.name}")',
+        f"{SOURCE_KEY}.initialProductionOffset = {_fmt(state['offset_ns'] / 1e9)}",
+        f"{SOURCE_KEY}.productionInterval = {state['first_interval']}",
+        f"{SOURCE_KEY}.packetLength = {state['first_size']}B",
+    ]
+    if merger_interval:
+        lines.append(f"{MERGER}.senderTransmissionInterval = {merger_interval}")
+    ini_path.write_text("\n".join(lines) + "\n")
+
+
+def load_send_times(path: Path) -> np.ndarray:
+    """Send time (s) of every packet of a compiled trace, indexed by seq − startSequence."""
+    return np.memmap(path, dtype="<f8", mode="r")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a packet trace as the FRER source traffic")
+    parser.add_argument("trace", type=Path, help="pcap file or CSV with timestamp and size columns")
+    parser.add_argument("--name", type=str, default="trace", help="Config name and file stem in simulations/")
+    parser.add_argument("--scenario", type=Path, default=SIM_DIR / "scenario.xml",
+                        help="Link scenario to merge the traffic into")
+    parser.add_argument("--time-unit", choices=tuple(TIME_UNITS), default="s", help="CSV timestamp unit")
+    parser.add_argument("--overhead", type=int, default=None,
+                        help=f"Bytes subtracted from each size (default: {UDP_OVERHEAD} for pcap, 0 for CSV)")
+    parser.add_argument("--start", type=str, default="0s", help="Send time of the first packet")
+    parser.add_argument("--duration", type=str, default=None, help="Only replay this much of the trace")
+    parser.add_argument("--min-gap", type=str, default="1us", help="Smallest distance between two packets")
+    parser.add_argument("--drain", type=str, default="50ms", help="Simulated time after the last packet")
+    parser.add_argument("--merger-interval", type=str, default=None,
+                        help="senderTransmissionInterval for the merger in the overlay (e.g. 500us)")
+    parser.add_argument("--max-changes", type=int, default=MAX_CHANGES,
+                        help="Most source parameter changes in the scenario XML (loaded as one DOM by the simulator)")
+    parser.add_argument("--out", type=Path, default=SIM_DIR, help="Folder of the generated files")
+    args = parser.parse_args()
+
+    xml_path = args.out / f"{args.name}.xml"
+    send_path = args.out / f"{args.name}.sendtimes"
+    ini_path = args.out / f"{args.name}.ini"
+    try:
+        state = compile_trace(iter_trace(args.trace, args.time_unit, args.overhead), xml_path, send_path,
+                              args.scenario, parse_seconds(args.start), parse_seconds(args.min_gap),
+                              parse_seconds(args.duration) if args.duration else None, args.max_changes)
+    except (ValueError, OSError) as e:
+        for partial in (xml_path, send_path):
+            partial.unlink(missing_ok=True)
+        print(f"✖ {e}", file=sys.stderr)
+        sys.exit(1)
+    write_ini(ini_path, args.name, xml_path, state, parse_seconds(args.drain), args.merger_interval)
+    send = load_send_times(send_path)
+    gaps = np.diff(send) * 1e3
+    print(f"✔ {state['count']} packets over {(send[-1] - send[0]) * 1e3:.3f} ms, "
+          f"{state['changes']} source parameter changes → {xml_path}")
+    if len(gaps):
+        print(f"  interval mean {gaps.mean():.4f} ms, min {gaps.min():.4f} ms, max {gaps.max():.4f} ms")
+    print(f"✔ Send times → {send_path}")
+    print(f"✔ Run config [{args.name}] → {ini_path}")
+
+
+if __name__ == "__main__":
+    main()
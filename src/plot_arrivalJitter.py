@@ -1,28 +1,37 @@
 #!/usr/bin/env python3
 from matplotlib import font_manager
-font_manager.fontManager.addfont(
-    '/usr/share/fonts/truetype/msttcorefonts/Times_New_Roman.ttf'
-)
+try:
+    font_manager.fontManager.addfont(
+        '/usr/share/fonts/truetype/msttcorefonts/Times_New_Roman.ttf'
+    )
+except FileNotFoundError:   # headless/CI machines without msttcorefonts: fall back to the default serif
+    pass
 from pathlib import Path
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 import matplotlib as mpl
+from result_cache import cached_vector
+from stage_trace import traced
 # 1) seaborn style & matplotlib rcParams
-sns.set_style("whitegrid")
-# Make PDFs/PS embed TrueType (Type 42), not Type 3
-mpl.rcParams['pdf.fonttype'] = 42
-mpl.rcParams['ps.fonttype']  = 42
-
-# Make sure we're not going through LaTeX
-mpl.rcParams['text.usetex'] = False
-plt.rc("font",      family="serif", serif=["Times New Roman"])
-plt.rc("axes",      titlesize=14,  labelsize=14)
-plt.rc("xtick",     labelsize=14)
-plt.rc("ytick",     labelsize=14)
-plt.rc("legend",    fontsize=12)
-plt.rc("figure",    figsize=(7.16, 3.5))  # two-column width × a bit taller
+def apply_style():
+    sns.set_style("whitegrid")
+    # Make PDFs/PS embed TrueType (Type 42), not Type 3
+    mpl.rcParams['pdf.fonttype'] = 42
+    mpl.rcParams['ps.fonttype']  = 42
+
+    # Make sure we're not going through LaTeX
+    mpl.rcParams['text.usetex'] = False
+    plt.rc("font",      family="serif", serif=["Times New Roman"])
+    plt.rc("axes",      titlesize=14,  labelsize=14)
+    plt.rc("xtick",     labelsize=14)
+    plt.rc("ytick",     labelsize=14)
+    plt.rc("legend",    fontsize=12)
+    plt.rc("figure",    figsize=(7.16, 3.5))  # two-column width × a bit taller
+
+
+apply_style()
 
 # custom colors
 TUD_BLUE        = "#00305d"   # baseline
@@ -37,15 +46,14 @@ MARKER_EVERY = 30  # place a marker every N points along each CDF line
 
 
 def read_intervals(csv_path: Path, vector_name: str, unit: str = 'ms') -> np.ndarray:
-    """Load reception times and compute inter-receiving intervals."""
-    df = pd.read_csv(csv_path)
-    row = df[(df["type"] == "vector") & (df["name"] == vector_name)].iloc[0]
-    t_s = np.fromiter(map(float, row["vectime"].split()), dtype=float)
+    """Load reception times (.csv export or .vec) and compute inter-receiving intervals."""
+    t_s, _ = cached_vector(csv_path, vector_name)
     factor = 1e3 if unit == 'ms' else 1e6
     return np.diff(t_s * factor)
 
 
-def plot_packet_jitter(folder: Path, plot_type: str = 'violin'):
+@traced()
+def plot_packet_jitter(folder: Path, plot_type: str = 'violin', show: bool = True):
     """
     Plot packet inter-receiving intervals as a violin, box, or CDF plot.
     """
@@ -69,7 +77,7 @@ def plot_packet_jitter(folder: Path, plot_type: str = 'violin'):
     # print quartiles
     metrics = {}
     for lbl in variants:
-        ms = read_intervals(files[lbl], vector_name, unit='ms')
+        ms = data_ms[lbl]
         q1, q3 = np.percentile(ms, [25, 75])
         p95, p99 = np.percentile(ms, [95, 99])
         metrics[lbl] = {
@@ -135,7 +143,8 @@ def plot_packet_jitter(folder: Path, plot_type: str = 'violin'):
 
     out_pdf = folder / f"packetJitter_{plot_type}.pdf"
     fig.savefig(out_pdf, format="pdf", dpi=300, bbox_inches="tight")
-    plt.show()
+    if show:
+        plt.show()
     print(f"✅ Saved figure → {out_pdf}")
 
 
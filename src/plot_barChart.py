@@ -5,15 +5,21 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 from matplotlib.ticker import MultipleLocator
+from result_cache import cached_vector
+from stage_trace import traced
 
 # seaborn & matplotlib style
-sns.set_style("whitegrid")
-plt.rc("font",      family="serif", serif=["DejaVu Serif"])
-plt.rc("axes",      titlesize=14,  labelsize=14)
-plt.rc("xtick",     labelsize=14)
-plt.rc("ytick",     labelsize=14)
-plt.rc("legend",    fontsize=12)
-plt.rc("figure",    figsize=(7.16, 3.5))
+def apply_style():
+    sns.set_style("whitegrid")
+    plt.rc("font",      family="serif", serif=["DejaVu Serif"])
+    plt.rc("axes",      titlesize=14,  labelsize=14)
+    plt.rc("xtick",     labelsize=14)
+    plt.rc("ytick",     labelsize=14)
+    plt.rc("legend",    fontsize=12)
+    plt.rc("figure",    figsize=(7.16, 3.5))
+
+
+apply_style()
 
 # custom colors
 TUD_BLUE         = "#00305d"   # Baseline
@@ -21,11 +27,9 @@ COMNETS_BLUE     = "#2C94CC"   # DynamicHL
 COMNETS_MAGENTA  = "#E20074"   # Sorting
 
 def read_seqnums(csv_path: Path, vector_name: str):
-    """Read seqNum vector from CSV and return numpy array of ints."""
-    df = pd.read_csv(csv_path)
-    row = df[(df["type"]=="vector") & (df["name"]==vector_name)].iloc[0]
-    seq = np.fromiter(map(float, row["vecvalue"].split()), dtype=int)
-    return seq
+    """Read seqNum vector from a CSV export or .vec and return numpy array of ints."""
+    _, values = cached_vector(csv_path, vector_name)
+    return values.astype(int)
 
 def compute_ratios(seq: np.ndarray):
     """Compute out-of-order and duplicate ratios (in %)."""
@@ -44,7 +48,8 @@ def compute_ratios(seq: np.ndarray):
         "Duplicate (%)":     dup_count    / total       * 100
     }
 
-def plot_bar_ratios(folder: Path):
+@traced()
+def plot_bar_ratios(folder: Path, show: bool = True):
     # file paths
     baseline_csv = folder / "baseline_seqNum.csv"
     dynamic_csv  = folder / "dynamicHL_seqNum.csv"
@@ -106,7 +111,8 @@ def plot_bar_ratios(folder: Path):
     # save PDF in results folder
     out_pdf = folder / "seqNum_ratios.pdf"
     fig.savefig(out_pdf, format="pdf", dpi=300, bbox_inches="tight")
-    plt.show()
+    if show:
+        plt.show()
     print(f"✅ Saved → {out_pdf}")
 
 if __name__ == "__main__":
@@ -1,29 +1,38 @@
 #!/usr/bin/env python3
 from matplotlib import font_manager
-font_manager.fontManager.addfont(
-    '/usr/share/fonts/truetype/msttcorefonts/Times_New_Roman.ttf'
-)
+try:
+    font_manager.fontManager.addfont(
+        '/usr/share/fonts/truetype/msttcorefonts/Times_New_Roman.ttf'
+    )
+except FileNotFoundError:   # headless/CI machines without msttcorefonts: fall back to the default serif
+    pass
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 import matplotlib as mpl
 from pathlib import Path
 import seaborn as sns
+from result_cache import cached_vector
+from stage_trace import traced
 # ───── STYLE ────────────────────────────────────────────────────────────────
-sns.set_style("whitegrid")
-# Make PDFs/PS embed TrueType (Type 42), not Type 3
-mpl.rcParams['pdf.fonttype'] = 42
-mpl.rcParams['ps.fonttype']  = 42
-
-# Make sure we're not going through LaTeX
-mpl.rcParams['text.usetex'] = False
-mpl.rc('font',   family='serif', serif=['Times New Roman'])
-mpl.rc('axes',   titlesize=14,  labelsize=14, grid=True)
-mpl.rc('xtick',  labelsize=14)
-mpl.rc('ytick',  labelsize=14)
-mpl.rc('legend', fontsize=12)
-mpl.rc('figure', figsize=(7.16, 3.5))
-mpl.rc('grid',   color='0.8', linestyle='-')
+def apply_style():
+    sns.set_style("whitegrid")
+    # Make PDFs/PS embed TrueType (Type 42), not Type 3
+    mpl.rcParams['pdf.fonttype'] = 42
+    mpl.rcParams['ps.fonttype']  = 42
+
+    # Make sure we're not going through LaTeX
+    mpl.rcParams['text.usetex'] = False
+    mpl.rc('font',   family='serif', serif=['Times New Roman'])
+    mpl.rc('axes',   titlesize=14,  labelsize=14, grid=True)
+    mpl.rc('xtick',  labelsize=14)
+    mpl.rc('ytick',  labelsize=14)
+    mpl.rc('legend', fontsize=12)
+    mpl.rc('figure', figsize=(7.16, 3.5))
+    mpl.rc('grid',   color='0.8', linestyle='-')
+
+
+apply_style()
 
 # ───── COLORS ───────────────────────────────────────────────────────────────
 TUD_BLUE        = "#00305d"   # baseline
@@ -59,9 +68,8 @@ DARK_BLUE = darken_hex(COMNETS_BLUE, amount=0.2)
 
 # ───── DATA HELPERS ─────────────────────────────────────────────────────────
 def read_seqnums(csv_path: Path):
-    df  = pd.read_csv(csv_path)
-    row = df[(df["type"]=="vector") & (df["name"]=="seqNum:vector")].iloc[0]
-    return np.fromiter(map(float, row["vecvalue"].split()), dtype=int)
+    _, values = cached_vector(csv_path, "seqNum:vector")
+    return values.astype(int)
 
 def compute_ratios(seq: np.ndarray):
     diffs = seq[1:] - seq[:-1]
@@ -70,7 +78,8 @@ def compute_ratios(seq: np.ndarray):
     return ooo, dup
 
 # ───── PLOTTING ────────────────────────────────────────────────────────────
-def plot_jitter_vs_ratios(results_dir: Path):
+@traced()
+def plot_jitter_vs_ratios(results_dir: Path, show: bool = True):
     jitters  = list(range(11))
 
     # dynamicHL values
@@ -137,7 +146,8 @@ def plot_jitter_vs_ratios(results_dir: Path):
     fig.savefig(out_pdf, format="pdf", dpi=300, bbox_inches="tight")
     print(f"✅ Saved high-quality PDF → {out_pdf}")
 
-    plt.show()
+    if show:
+        plt.show()
 
 if __name__ == "__main__":
     results_dir = Path("/home/howhang/omnetpp-6.1.0-linux-x86_64/omnetpp-6.1/samples/FRER/simulations/results")
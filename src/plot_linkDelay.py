@@ -1,28 +1,36 @@
 #!/usr/bin/env python3
 from matplotlib import font_manager
-font_manager.fontManager.addfont(
-    '/usr/share/fonts/truetype/msttcorefonts/Times_New_Roman.ttf'
-)
+try:
+    font_manager.fontManager.addfont(
+        '/usr/share/fonts/truetype/msttcorefonts/Times_New_Roman.ttf'
+    )
+except FileNotFoundError:   # headless/CI machines without msttcorefonts: fall back to the default serif
+    pass
 from pathlib import Path
-import numpy as np
-import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 from matplotlib.ticker import MultipleLocator
 import matplotlib as mpl
+from result_cache import cached_vector
+from stage_trace import traced
+from downsample import decimate
 # 1) seaborn style & matplotlib rcParams
-sns.set_style("whitegrid")
-# Make PDFs/PS embed TrueType (Type 42), not Type 3
-mpl.rcParams['pdf.fonttype'] = 42
-mpl.rcParams['ps.fonttype']  = 42
-# Make sure we're not going through LaTeX
-mpl.rcParams['text.usetex'] = False
-plt.rc("font",      family="serif", serif=["Times New Roman"])
-plt.rc("axes",      titlesize=14,  labelsize=14)
-plt.rc("xtick",     labelsize=14)
-plt.rc("ytick",     labelsize=14)
-plt.rc("legend",    fontsize=12)
-plt.rc("figure",    figsize=(8, 4))  # wider for legend placement
+def apply_style():
+    sns.set_style("whitegrid")
+    # Make PDFs/PS embed TrueType (Type 42), not Type 3
+    mpl.rcParams['pdf.fonttype'] = 42
+    mpl.rcParams['ps.fonttype']  = 42
+    # Make sure we're not going through LaTeX
+    mpl.rcParams['text.usetex'] = False
+    plt.rc("font",      family="serif", serif=["Times New Roman"])
+    plt.rc("axes",      titlesize=14,  labelsize=14)
+    plt.rc("xtick",     labelsize=14)
+    plt.rc("ytick",     labelsize=14)
+    plt.rc("legend",    fontsize=12)
+    plt.rc("figure",    figsize=(8, 4))  # wider for legend placement
+
+
+apply_style()
 
 # custom colors and styles
 TUD_BLUE        = "#00305d"   # baseline
@@ -38,14 +46,12 @@ markers    = ['o', 's', '^', 'd']
 GRAY = "#555555"
 
 def unpack_vector(csv_path: Path, vector_name: str):
-    df = pd.read_csv(csv_path)
-    row = df[(df["type"] == "vector") & (df["name"] == vector_name)].iloc[0]
-    t_s = np.fromiter(map(float, row["vectime"].split()), dtype=float)
-    v   = np.fromiter(map(float, row["vecvalue"].split()), dtype=float)
+    t_s, v = cached_vector(csv_path, vector_name)
     return t_s * 1e3, v  # time in ms, value as-is
 
 
-def plot_combined(folder: Path):
+@traced()
+def plot_combined(folder: Path, show: bool = True):
     # file paths
     delay_csv = folder / "baseline_linkDelay.csv"
     dyn_csv   = folder / "dynamicHL_historyLength.csv"
@@ -152,17 +158,21 @@ def plot_combined(folder: Path):
 
     # save PDF
     out_pdf = folder / "combined_delay_hist.pdf"
+    decimate(ax1)
+    decimate(ax2)
     fig.savefig(
         out_pdf,
         format="pdf",
         dpi=300,
         bbox_inches="tight"
     )
-    plt.show()
+    if show:
+        plt.show()
     print(f"✅ Saved combined plot → {out_pdf}")
 
 
-def plot_link_delay(folder: Path):
+@traced()
+def plot_link_delay(folder: Path, show: bool = True):
     # file path
     delay_csv = folder / "baseline_linkDelay.csv"
 
@@ -199,13 +209,15 @@ def plot_link_delay(folder: Path):
 
     # save PDF
     out_pdf = folder / "link_delay.pdf"
+    decimate(ax)
     fig.savefig(
         out_pdf,
         format="pdf",
         dpi=300,
         bbox_inches="tight"
     )
-    plt.show()
+    if show:
+        plt.show()
     print(f"✅ Saved link delay plot → {out_pdf}")
 
 
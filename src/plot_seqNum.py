@@ -1,29 +1,37 @@
 #!/usr/bin/env python3
 from matplotlib import font_manager
-font_manager.fontManager.addfont(
-    '/usr/share/fonts/truetype/msttcorefonts/Times_New_Roman.ttf'
-)
+try:
+    font_manager.fontManager.addfont(
+        '/usr/share/fonts/truetype/msttcorefonts/Times_New_Roman.ttf'
+    )
+except FileNotFoundError:   # headless/CI machines without msttcorefonts: fall back to the default serif
+    pass
 from pathlib import Path
-import numpy as np
-import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 from matplotlib.ticker import MultipleLocator
 import matplotlib as mpl
+from result_cache import cached_vector
+from stage_trace import traced
+from downsample import decimate
 # 1) seaborn style & matplotlib rcParams
-sns.set_style("whitegrid")
-# Make PDFs/PS embed TrueType (Type 42), not Type 3
-mpl.rcParams['pdf.fonttype'] = 42
-mpl.rcParams['ps.fonttype']  = 42
-
-# Make sure we're not going through LaTeX
-mpl.rcParams['text.usetex'] = False
-plt.rc("font",      family="serif", serif=["Times New Roman"])
-plt.rc("axes",      titlesize=14,  labelsize=14)
-plt.rc("xtick",     labelsize=14)
-plt.rc("ytick",     labelsize=14)
-plt.rc("legend",    fontsize=12)
-plt.rc("figure",    figsize=(7.16, 3.5))  # two-column width × a bit taller
+def apply_style():
+    sns.set_style("whitegrid")
+    # Make PDFs/PS embed TrueType (Type 42), not Type 3
+    mpl.rcParams['pdf.fonttype'] = 42
+    mpl.rcParams['ps.fonttype']  = 42
+
+    # Make sure we're not going through LaTeX
+    mpl.rcParams['text.usetex'] = False
+    plt.rc("font",      family="serif", serif=["Times New Roman"])
+    plt.rc("axes",      titlesize=14,  labelsize=14)
+    plt.rc("xtick",     labelsize=14)
+    plt.rc("ytick",     labelsize=14)
+    plt.rc("legend",    fontsize=12)
+    plt.rc("figure",    figsize=(7.16, 3.5))  # two-column width × a bit taller
+
+
+apply_style()
 
 # custom colors and styles
 TUD_BLUE        = "#00305d"   # baseline
@@ -36,15 +44,13 @@ markers    = ['o',   's',   '^',   'd']
 
 
 def read_vector(csv_path: Path, vector_name: str):
-    """Load a single vector series from a CSV and return (time_ms, values)."""
-    df = pd.read_csv(csv_path)
-    row = df[(df["type"] == "vector") & (df["name"] == vector_name)].iloc[0]
-    t_s    = np.fromiter(map(float, row["vectime"].split()),  dtype=float)
-    values = np.fromiter(map(float, row["vecvalue"].split()), dtype=float)
+    """Load a single vector series from a CSV export or .vec and return (time_ms, values)."""
+    t_s, values = cached_vector(csv_path, vector_name)
     return t_s * 1e3, values  # time in ms
 
 
-def plot_seqnum_comparison(folder: Path):
+@traced()
+def plot_seqnum_comparison(folder: Path, show: bool = True):
     # file paths
     baseline_csv = folder / "baseline_seqNum.csv"
     dynamic_csv  = folder / "dynamicHL_seqNum.csv"
@@ -61,15 +67,15 @@ def plot_seqnum_comparison(folder: Path):
     # helper to plot step with sparse markers
     def sparse_step(x, y, color, ls, marker, label):
         markevery = max(1, len(x) // 12)
-        plt.plot(x, y,
-                 drawstyle='steps-post',
-                 color=color,
-                 linestyle=ls,
-                 marker=marker,
-                 markersize=5,
-                 markevery=markevery,
-                 linewidth=1.5,
-                 label=label)
+        ax.plot(x, y,
+                drawstyle='steps-post',
+                color=color,
+                linestyle=ls,
+                marker=marker,
+                markersize=5,
+                markevery=markevery,
+                linewidth=1.5,
+                label=label)
 
     # create figure
     fig, ax = plt.subplots()
@@ -95,8 +101,10 @@ def plot_seqnum_comparison(folder: Path):
 
     # save PDF into results folder
     out_pdf = folder / "seqNum_step_comparison.pdf"
+    decimate(ax)
     fig.savefig(out_pdf, format="pdf", dpi=300, bbox_inches="tight")
-    plt.show()
+    if show:
+        plt.show()
     print(f"✅ Saved figure → {out_pdf}")
 
 
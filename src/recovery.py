@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Sequence recovery (duplicate elimination) algorithms for merger_model.Merger.
+
+Every algorithm has the same small interface: accept(seq) returns True for
+a packet to pass and records it, resize(length) applies a new history
+length (DHL), and `rogue` counts packets dropped for lying outside the
+window rather than for being duplicates. They differ in what "seen"
+means and how it is stored:
+
+- history / ring: the last `length` accepted sequence numbers, in
+  acceptance order, as the INET merger does (baseline, DHL). `history` is
+  the reference deque + set, `ring` a preallocated ring buffer + set.
+- vector / vector-sorted: IEEE 802.1CB VectorRecoveryAlgorithm, a window
+  of `length` sequence numbers ending at the highest one accepted
+  (RecovSeqNum); newer packets move the window, packets older than it are
+  rogue. `vector` keeps the window as a bitmap (Python int), `vector-sorted`
+  as a sorted list.
+- match: IEEE 802.1CB MatchRecoveryAlgorithm, only a repeat of the last
+  accepted sequence number is discarded.
+
+The 802.1CB reset timer and the 16-bit sequence wrap are not modelled.
+
+The CLI compares the algorithms on both axes: OoO/Dup of the merger model
+on the recorded arrivals for each checked-in variant, and ns/packet and
+bytes per stream (tracemalloc) of accept() at increasing history lengths.
+
+EX: `python3 recovery.py --results ../simulations/results --lengths 4,16,64,256,1024,4096`
+    `python3 merger_model.py --param recoveryAlgorithm=history,vector,match --param jitter=0,5ms`
+"""
+import argparse
+import time
+import tracemalloc
+from bisect import bisect_left
+from collections import deque
+from dataclasses import replace
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from stream_metrics import StreamingRatios, parse_seconds
+from sweep import VARIANTS
+from vec_reader import read_csv_header
+
+
+class HistoryRecovery:
+    """Last `length` accepted sequence numbers in a deque, with a set for lookups."""
+
+    def __init__(self, length: int):
+        self.length = max(1, length)
+        self.rogue = 0
+        self.order, self.seen = deque(), set()
+
+    def accept(self, seq: int) -> bool:
+        if seq in self.seen:
+            return False
+        self.order.append(seq)
+        self.seen.add(seq)
+        while len(self.order) > self.length:
+            self.seen.discard(self.order.popleft())
+        return True
+
+    def resize(self, length: int):
+        self.length = max(1, length)
+        while len(self.order) > self.length:
+            self.seen.discard(self.order.popleft())
+
+
+class RingRecovery:
+    """Same window as HistoryRecovery, kept in a preallocated ring buffer that grows by doubling."""
+
+    def __init__(self, length: int):
+        self.length = max(1, length)
+        self.rogue = 0
+        self.ring = [0] * self.length
+        self.head = self.count = 0
+        self.seen = set()
+
+    def accept(self, seq: int) -> bool:
+        if seq in self.seen:
+            return False
+        if self.count == self.length:
+            self._evict()
+        self.ring[(self.head + self.count) % len(self.ring)] = seq
+        self.count += 1
+        self.seen.add(seq)
+        return True
+
+    def _evict(self):
+        self.seen.discard(self.ring[self.head])
+        self.head = (self.head + 1) % len(self.ring)
+        self.count -= 1
+
+    def resize(self, length: int):
+        self.length = max(1, length)
+        while self.count > self.length:
+            self._evict()
+        if self.length > len(self.ring):
+            size = max(self.length, 2 * len(self.ring))
+            kept = [self.ring[(self.head + i) % len(self.ring)] for i in range(self.count)]
+            self.ring = kept + [0] * (size - self.count)
+            self.head = 0
+
+
+class VectorRecovery:
+    """802.1CB vector recovery; bit i of the bitmap is RecovSeqNum - i."""
+
+    def __init__(self, length: int):
+        self.length = max(1, length)
+        self.mask = (1 << self.length) - 1
+        self.rogue = 0
+        self.recov = None
+        self.bits = 0
+
+    def accept(self, seq: int) -> bool:
+        if self.recov is None or seq > self.recov:
+            shift = seq - self.recov if self.recov is not None else self.length
+            self.bits = ((self.bits << shift) | 1) & self.mask if shift < self.length else 1
+            self.recov = seq
+            return True
+        back = self.recov - seq
+        if back >= self.length:
+            self.rogue += 1
+            return False
+        if self.bits >> back & 1:
+            return False
+        self.bits |= 1 << back
+        return True
+
+    def resize(self, length: int):
+        self.length = max(1, length)
+        self.mask = (1 << self.length) - 1
+        self.bits &= self.mask
+
+
+class SortedVectorRecovery:
+    """802.1CB vector recovery with the window kept as a sorted list of the accepted sequence numbers."""
+
+    def __init__(self, length: int):
+        self.length = max(1, length)
+        self.rogue = 0
+        self.recov = None
+        self.window = []
+
+    def _trim(self):
+        cut = bisect_left(self.window, self.recov - self.length + 1)
+        if cut:
+            del self.window[:cut]
+
+    def accept(self, seq: int) -> bool:
+        if self.recov is None or seq > self.recov:
+            self.recov = seq
+            self.window.append(seq)
+            self._trim()
+            return True
+        if self.recov - seq >= self.length:
+            self.rogue += 1
+            return False
+        i = bisect_left(self.window, seq)
+        if i < len(self.window) and self.window[i] == seq:
+            return False
+        self.window.insert(i, seq)
+        return True
+
+    def resize(self, length: int):
+        self.length = max(1, length)
+        if self.recov is not None:
+            self._trim()
+
+
+class MatchRecovery:
+    """802.1CB match recovery: drop a packet only if it repeats the last accepted one."""
+
+    def __init__(self, length: int):
+        self.length = max(1, length)
+        self.rogue = 0
+        self.last = None
+
+    def accept(self, seq: int) -> bool:
+        if seq == self.last:
+            return False
+        self.last = seq
+        return True
+
+    def resize(self, length: int):
+        self.length = max(1, length)
+
+
+ALGORITHMS = {
+    "history":       HistoryRecovery,
+    "ring":          RingRecovery,
+    "vector":        VectorRecovery,
+    "vector-sorted": SortedVectorRecovery,
+    "match":         MatchRecovery,
+}
+
+
+def create(name: str, length: int):
+    """Recovery algorithm `name` with the given history length."""
+    try:
+        return ALGORITHMS[name](length)
+    except KeyError:
+        raise ValueError(f"Unknown recovery algorithm {name!r} (one of {', '.join(ALGORITHMS)})") from None
+
+
+# ───── BENCHMARK ────────────────────────────────────────────────────────────
+def two_path_stream(n: int, lag: int) -> list:
+    """Arrival order of n packets on two paths, the second `lag` packets behind (ties: older first)."""
+    seq = np.r_[np.arange(n), np.arange(n)]
+    t = np.r_[np.arange(n), np.arange(n) + lag]
+    return seq[np.lexsort((seq, t))].tolist()
+
+
+def microbench(name: str, length: int, n: int = 100_000, repeat: int = 3) -> dict:
+    """
+    ns per accept() (best of repeat), bytes held by the algorithm once its
+    window is full, and Dup (%) of what it passed, on a two-path stream
+    whose second copy lags length/2 packets. The held bytes are the
+    algorithm's own structures; the seqNum ints are shared with the caller.
+    """
+    stream = two_path_stream(n, max(1, length // 2))
+    best = None
+    for _ in range(repeat):
+        accept = create(name, length).accept
+        start = time.perf_counter_ns()
+        for s in stream:
+            accept(s)
+        elapsed = time.perf_counter_ns() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    warm = stream[:4 * length + 16]
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    alg = create(name, length)
+    for s in warm:
+        alg.accept(s)
+    held = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+
+    alg = create(name, length)
+    m = StreamingRatios()
+    m.update([s for s in stream if alg.accept(s)])
+    return {"algorithm": name, "length": length, "ns_per_packet": best / len(stream),
+            "bytes_per_stream": held, "dup_pct": m.ratios()[1]}
+
+
+def behaviour(results_dir: Path, variants: tuple = tuple(VARIANTS), delay_csv: str = "baseline_linkDelay.csv") -> pd.DataFrame:
+    """OoO/Dup (%) of the merger model per variant and algorithm on the recorded arrivals."""
+    from merger_model import MergerConfig, arrivals_from_linkdelay, ratios, simulate
+    arrivals = arrivals_from_linkdelay(results_dir / delay_csv)
+    rows = []
+    for variant in variants:
+        header = read_csv_header(results_dir / f"{variant}_seqNum.csv")
+        limit = parse_seconds(header.config.get("sim-time-limit", "100ms"))
+        for name in ALGORITHMS:
+            cfg = replace(MergerConfig.from_ini(header.config), recoveryAlgorithm=name)
+            ooo, dup = ratios(simulate(arrivals, cfg, limit))
+            rows.append({"variant": variant, "algorithm": name, "ooo_pct": ooo, "dup_pct": dup})
+    return pd.DataFrame(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare sequence recovery algorithms: merger behaviour and cost per packet")
+    parser.add_argument("--results", type=Path,
+                        default=Path(__file__).resolve().parent.parent / "simulations" / "results",
+                        help="Folder with baseline_linkDelay.csv and the <variant>_seqNum.csv exports")
+    parser.add_argument("--algorithms", type=str, default=",".join(ALGORITHMS))
+    parser.add_argument("--lengths", type=str, default="4,16,64,256,1024,4096", help="History lengths to benchmark")
+    parser.add_argument("--packets", type=int, default=100_000, help="Packets per microbenchmark run")
+    parser.add_argument("--csv", type=Path, default=None, help="Write both tables to this folder")
+    args = parser.parse_args()
+
+    names = [a.strip() for a in args.algorithms.split(",") if a.strip()]
+    unknown = [a for a in names if a not in ALGORITHMS]
+    if unknown:
+        parser.error(f"unknown algorithm(s) {', '.join(unknown)} (one of {', '.join(ALGORITHMS)})")
+    lengths = [int(v) for v in args.lengths.split(",")]
+
+    behav = behaviour(args.results)
+    behav = behav[behav["algorithm"].isin(names)]
+    print(behav.pivot(index="algorithm", columns="variant", values=["ooo_pct", "dup_pct"]).round(2).to_string())
+    cost = pd.DataFrame([microbench(a, n, args.packets) for a in names for n in lengths])
+    print()
+    print(cost.round(1).to_string(index=False))
+    if args.csv:
+        args.csv.mkdir(parents=True, exist_ok=True)
+        behav.to_csv(args.csv / "recovery_behaviour.csv", index=False)
+        cost.to_csv(args.csv / "recovery_cost.csv", index=False)
+        print(f"✔ Tables → {args.csv}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Multi-seed replications with confidence intervals and sequential stopping.
+
+Every configuration (a grid point as in sweep.py) is run with independent
+seed sets (`seed-set = k` in the overlay ini). Per replication the OoO/Dup
+ratios of seqNum and the IQR/P95/P99/σ/range of the packetJitter intervals
+are computed (as in plot_jitter_ratios.py / plot_arrivalJitter.py); per
+configuration they are aggregated to mean ± Student-t confidence interval.
+
+Seeds are added in rounds: a configuration stops once it has --min-seeds
+replications and the CI of every --stop-on metric is narrower than
+--target-width (or --max-seeds is reached), so only noisy configurations
+keep consuming CPU. Note that the ini only draws random numbers if it uses
+random parameters; deterministic configurations converge at --min-seeds.
+
+EX: `python3 replicate.py --param jitter=0,5ms,10ms --target-width 0.5 --name jitter_ci`
+"""
+import argparse
+import csv
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from statistics import NormalDist
+
+import numpy as np
+
+import run_cache
+from result_cache import cached_vector
+from run_sim import build_frer, simulation_args
+from stream_metrics import stream_ratios
+from sweep import INI_PATH, SCRIPT_DIR, SWEEPS_DIR, expand_grid, parse_grid, run_name, run_point
+
+METRICS = ("ooo", "dup", "iqr_ms", "p95_ms", "p99_ms", "std_ms", "range_ms")
+# two-sided Student-t quantiles for df = 1..30; larger df use the normal quantile
+T_TABLE = {
+    0.90: (6.314, 2.920, 2.353, 2.132, 2.015, 1.943, 1.895, 1.860, 1.833, 1.812,
+           1.796, 1.782, 1.771, 1.761, 1.753, 1.746, 1.740, 1.734, 1.729, 1.725,
+           1.721, 1.717, 1.714, 1.711, 1.708, 1.706, 1.703, 1.701, 1.699, 1.697),
+    0.95: (12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+           2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+           2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042),
+    0.99: (63.657, 9.925, 5.841, 4.604, 4.032, 3.707, 3.499, 3.355, 3.250, 3.169,
+           3.106, 3.055, 3.012, 2.977, 2.947, 2.921, 2.898, 2.878, 2.861, 2.845,
+           2.831, 2.819, 2.807, 2.797, 2.787, 2.779, 2.771, 2.763, 2.756, 2.750),
+}
+
+
+def t_quantile(confidence: float, df: int) -> float:
+    if df <= len(T_TABLE[confidence]):
+        return T_TABLE[confidence][df - 1]
+    return NormalDist().inv_cdf(0.5 + confidence / 2)
+
+
+def mean_ci(values, confidence: float = 0.95) -> tuple:
+    """(mean, CI half-width); the half-width is inf with fewer than two samples."""
+    x = np.asarray(values, dtype=float)
+    if len(x) < 2:
+        return (float(x.mean()) if len(x) else np.nan), np.inf
+    return float(x.mean()), t_quantile(confidence, len(x) - 1) * float(x.std(ddof=1)) / np.sqrt(len(x))
+
+
+def interval_metrics(ms: np.ndarray) -> dict:
+    """IQR/P95/P99/σ/range of inter-receiving intervals in ms (as in plot_arrivalJitter.py)."""
+    if len(ms) < 2:
+        return {k: np.nan for k in METRICS[2:]}
+    q1, q3, p95, p99 = map(float, np.percentile(ms, [25, 75, 95, 99]))
+    return {"iqr_ms": q3 - q1, "p95_ms": p95, "p99_ms": p99,
+            "std_ms": float(np.std(ms, ddof=1)), "range_ms": float(ms.max() - ms.min())}
+
+
+def run_metrics(run_dir: Path, config: str) -> dict:
+    """Metrics of one exported replication in run_dir."""
+    ooo, dup = stream_ratios(run_dir / f"{config}_seqNum.csv").ratios()
+    t_s, _ = cached_vector(run_dir / f"{config}_packetJitter.csv", "packetJitter:vector")
+    return {"ooo": ooo, "dup": dup, **interval_metrics(np.diff(t_s * 1e3))}
+
+
+def run_replication(frer_exe: Path, sim_args: dict, run_dir: Path, config: str, point: dict,
+                    seed: int, base_ini: Path = INI_PATH) -> dict:
+    """Run and export one seed of a configuration; executed in a worker process."""
+    row = run_point(frer_exe, sim_args, run_dir, config, {**point, "seed-set": seed},
+                    export=True, base_ini=base_ini)
+    row["seed"] = seed
+    if row["status"] == "ok":
+        try:
+            row.update(run_metrics(run_dir, config))
+        except (FileNotFoundError, KeyError, ValueError) as e:
+            row["status"] = f"failed ({e})"
+    return row
+
+
+def summarize(rows: list, stop_on: tuple, target_width: float, confidence: float) -> dict:
+    """Mean ± CI per metric of the ok rows of one configuration, plus the stop decision."""
+    ok = [r for r in rows if r["status"] == "ok"]
+    out = {"n": len(ok)}
+    for m in METRICS:
+        mean, half = mean_ci([r[m] for r in ok], confidence)
+        out[m], out[f"{m}_ci"] = mean, half
+    out["converged"] = all(2 * out[f"{m}_ci"] <= target_width for m in stop_on)
+    return out
+
+
+def replicate(points: list, out_dir: Path, min_seeds: int = 3, max_seeds: int = 20, batch: int = 2,
+              target_width: float = 1.0, stop_on: tuple = ("ooo", "dup"), confidence: float = 0.95,
+              workers: int = None, build: bool = True, base_ini: Path = INI_PATH) -> dict:
+    """
+    Replicate every point until its CIs are narrow enough or max_seeds is used up.
+    Runs go to `out_dir/<config>/<config>_s<seed>/`; returns {config: summary}.
+    """
+    frer_exe = run_cache.build_if_needed(build_frer, SCRIPT_DIR) if build else SCRIPT_DIR / "FRER"
+    sim_args = simulation_args(SCRIPT_DIR)
+    names = [run_name(p) for p in points]
+    if len(set(names)) != len(names):
+        raise ValueError("Grid points do not map to unique run names")
+    rows = {n: [] for n in names}
+    summary = {}
+    active = dict(zip(names, points))
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        while active:
+            futures = {}
+            for name, point in active.items():
+                done = len(rows[name])
+                count = min(max(min_seeds - done, batch), max_seeds - done)
+                for seed in range(done, done + count):
+                    config = f"{name}_s{seed}"
+                    fut = pool.submit(run_replication, frer_exe, sim_args, out_dir / name / config,
+                                      config, point, seed, base_ini)
+                    futures[fut] = name
+            for fut in as_completed(futures):
+                row = fut.result()
+                rows[futures[fut]].append(row)
+                if row["status"] != "ok":
+                    print(f"✖ {row['name']}: {row['status']}")
+            for name in list(active):
+                summary[name] = summarize(rows[name], stop_on, target_width, confidence)
+                if summary[name]["converged"] or len(rows[name]) >= max_seeds:
+                    del active[name]
+    write_rows([r for n in names for r in sorted(rows[n], key=lambda r: r["seed"])],
+               out_dir / "replications.csv")
+    write_rows([{"config": n, **summary[n]} for n in names], out_dir / "summary.csv")
+    return summary
+
+
+def write_rows(rows: list, path: Path):
+    fields = list(dict.fromkeys(k for row in rows for k in row))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Multi-seed FRER replications with confidence intervals")
+    parser.add_argument("--param", action="append", default=[], metavar="NAME=VALUES",
+                        help="Configuration grid, same syntax as sweep.py")
+    parser.add_argument("--name", type=str, default="replications",
+                        help="Results go to simulations/results/sweeps/<name>/")
+    parser.add_argument("--min-seeds", type=int, default=3)
+    parser.add_argument("--max-seeds", type=int, default=20)
+    parser.add_argument("--batch", type=int, default=2, help="Seeds added per round and configuration")
+    parser.add_argument("--target-width", type=float, default=1.0,
+                        help="Stop once the CI width (%% points / ms) of every --stop-on metric is below this")
+    parser.add_argument("--stop-on", type=str, default="ooo,dup",
+                        help=f"Metrics checked for stopping ({', '.join(METRICS)})")
+    parser.add_argument("--confidence", type=float, default=0.95, choices=sorted(T_TABLE))
+    parser.add_argument("--workers", type=int, default=None, help="Parallel runs (default: number of CPUs)")
+    parser.add_argument("--no-build", action="store_true", help="Use the existing FRER binary")
+    args = parser.parse_args()
+
+    stop_on = tuple(m.strip() for m in args.stop_on.split(",") if m.strip())
+    unknown = [m for m in stop_on if m not in METRICS]
+    if unknown or args.min_seeds < 2 or args.max_seeds < args.min_seeds:
+        parser.error(f"invalid stopping rule (unknown metrics: {unknown}; need 2 <= min-seeds <= max-seeds)")
+    out_dir = SWEEPS_DIR / args.name
+    try:
+        summary = replicate(expand_grid(parse_grid(args.param)), out_dir, args.min_seeds, args.max_seeds,
+                            args.batch, args.target_width, stop_on, args.confidence, args.workers,
+                            build=not args.no_build)
+    except (ValueError, RuntimeError) as e:
+        print(f"✖ {e}", file=sys.stderr)
+        sys.exit(1)
+
+    pct = int(args.confidence * 100)
+    for name, s in summary.items():
+        mark = "✔" if s["converged"] else "…"
+        print(f"{mark} {name} (n={s['n']}, {pct}% CI)")
+        print(f"    OoO {s['ooo']:.2f} ± {s['ooo_ci']:.2f} %   Dup {s['dup']:.2f} ± {s['dup_ci']:.2f} %")
+        print("    " + "   ".join(f"{m[:-3].upper()} {s[m]:.3f} ± {s[m + '_ci']:.3f} ms" for m in METRICS[2:]))
+    print(f"✔ Summary → {out_dir / 'summary.csv'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Binary cache for decoded result vectors.
+
+Each (source file content hash, vector name, module) is stored once as an
+uncompressed .npz with `time` and `value` float64 columns in a `.vec_cache/`
+folder next to the source. Entries are keyed by content, so they are
+rebuilt only when the .vec/.csv actually changes; the hash itself is
+memoized on (size, mtime) so unchanged files are not re-read either.
+
+EX: `t_s, values = cached_vector(results / "baseline_seqNum.csv", "seqNum:vector")`
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+from pathlib import Path
+
+import numpy as np
+
+from stage_trace import stage
+from vec_reader import load_vector
+
+CACHE_DIRNAME = ".vec_cache"
+MANIFEST      = "hashes.json"
+HASH_CHUNK    = 4 << 20
+
+_memory = {}   # (hash, name, module) -> (time, value), per process
+
+
+def cache_dir(source: Path) -> Path:
+    return Path(source).resolve().parent / CACHE_DIRNAME
+
+
+def _atomic_write(path: Path, write):
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    write(tmp)
+    os.replace(tmp, path)
+
+
+def file_hash(source: Path) -> str:
+    """SHA-256 of source, memoized in the cache manifest by (size, mtime_ns)."""
+    source = Path(source).resolve()
+    st = source.stat()
+    manifest_path = cache_dir(source) / MANIFEST
+    try:
+        manifest = json.loads(manifest_path.read_text())
+    except (FileNotFoundError, ValueError):
+        manifest = {}
+    entry = manifest.get(source.name)
+    if entry and entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns:
+        return entry["sha256"]
+
+    h = hashlib.sha256()
+    with open(source, "rb") as f:
+        while block := f.read(HASH_CHUNK):
+            h.update(block)
+    manifest[source.name] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns,
+                             "sha256": h.hexdigest()}
+    manifest_path.parent.mkdir(exist_ok=True)
+    _atomic_write(manifest_path, lambda p: p.write_text(json.dumps(manifest, indent=1)))
+    return h.hexdigest()
+
+
+def _save_npz(path: Path, t: np.ndarray, v: np.ndarray):
+    with open(path, "wb") as f:       # file object: np.savez would append .npz to a path
+        np.savez(f, time=t, value=v)
+
+
+def _slug(text: str) -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "-", text).strip("-") or "any"
+
+
+def entry_path(source: Path, digest: str, name: str, module: str = None) -> Path:
+    return cache_dir(source) / f"{digest[:20]}_{_slug(name)}_{_slug(module or '')}.npz"
+
+
+def cached_vector(source: Path, name: str, module: str = None):
+    """
+    Same as vec_reader.load_vector(source, name, module), served from the
+    in-process memo or the on-disk cache when source is unchanged.
+    """
+    digest = file_hash(source)
+    key = (digest, name, module)
+    if key in _memory:
+        return _memory[key]
+    path = entry_path(source, digest, name, module)
+    if path.exists():
+        with stage("load_npz", python=True, file=Path(source).name), np.load(path) as npz:
+            data = (npz["time"], npz["value"])
+    else:
+        with stage("parse", python=True, file=Path(source).name):
+            data = load_vector(source, name, module)
+        _atomic_write(path, lambda p: _save_npz(p, *data))
+    _memory[key] = data
+    return data
+
+
+def prune(folder: Path) -> int:
+    """Delete cache entries whose source content no longer matches; returns the count."""
+    cdir = Path(folder) / CACHE_DIRNAME
+    if not cdir.exists():
+        return 0
+    live = {file_hash(p)[:20] for p in Path(folder).iterdir()
+            if p.suffix in (".vec", ".csv") and p.is_file()}
+    removed = 0
+    for entry in cdir.glob("*.npz"):
+        if entry.name.split("_", 1)[0] not in live:
+            entry.unlink()
+            removed += 1
+    return removed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the decoded-vector cache of a results folder")
+    parser.add_argument("folder", type=Path, help="Results folder (cache lives in <folder>/.vec_cache)")
+    parser.add_argument("--clear", action="store_true", help="Remove the whole cache")
+    args = parser.parse_args()
+
+    if args.clear:
+        shutil.rmtree(args.folder / CACHE_DIRNAME, ignore_errors=True)
+        print(f"✔ Cleared cache in {args.folder}")
+    else:
+        print(f"✔ Pruned {prune(args.folder)} stale cache entries in {args.folder}")
+
+
+if __name__ == "__main__":
+    main()
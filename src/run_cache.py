@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Build and run cache for run_sim.py.
+
+- The FRER build is skipped when the fingerprint of the sources (C++/msg/NED
+  files and Makefile under src/) matches the one recorded after the last
+  successful `make` and the binary is still there.
+- Every run is keyed by a fingerprint of the FRER binary, the ini file (and
+  everything it includes), the scenario XML files it references, the NED
+  files of the network, the INET library and the run arguments. Results are stored under
+  simulations/results/store/<fingerprint>/ and reused when the key matches.
+"""
+import hashlib
+import json
+import re
+import shutil
+import time
+from pathlib import Path
+
+SCRIPT_DIR  = Path(__file__).resolve().parent
+SIM_DIR     = SCRIPT_DIR.parent / "simulations"
+STORE_DIR   = SIM_DIR / "results" / "store"
+BUILD_STAMP = SCRIPT_DIR / ".build_fingerprint"
+MANIFEST    = "manifest.json"
+
+SOURCE_PATTERNS = ("*.cc", "*.h", "*.msg", "*.ned", "Makefile", "makefrag")
+_INCLUDE = re.compile(r"^\s*include\s+(\S+)", re.M)
+_XMLDOC  = re.compile(r'xmldoc\(\s*"([^"]+)"')
+
+
+def _sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while block := f.read(1 << 20):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _stat_digest(path: Path) -> str:
+    """Cheap stand-in for large binaries (shared libraries): size and mtime."""
+    st = Path(path).stat()
+    return f"{st.st_size}:{st.st_mtime_ns}"
+
+
+def _digest(items) -> str:
+    """Hash of (label, file digest or value) pairs, order-independent in label."""
+    h = hashlib.sha256()
+    for label, value in sorted(items):
+        h.update(f"{label}\0{value}\n".encode())
+    return h.hexdigest()
+
+
+def source_fingerprint(src_dir: Path = SCRIPT_DIR) -> str:
+    files = {p for pattern in SOURCE_PATTERNS for p in src_dir.rglob(pattern)
+             if "out" not in p.relative_to(src_dir).parts}
+    return _digest((str(p.relative_to(src_dir)), _sha256(p)) for p in files)
+
+
+def build_if_needed(build, src_dir: Path = SCRIPT_DIR, force: bool = False) -> Path:
+    """
+    Call build(src_dir) (e.g. run_sim.build_frer) only when the sources changed
+    since the last successful build or the binary is missing; returns the binary.
+    """
+    frer_exe = src_dir / "FRER"
+    fingerprint = source_fingerprint(src_dir)
+    stamp = src_dir / BUILD_STAMP.name
+    if not force and frer_exe.exists() and stamp.exists() and stamp.read_text().strip() == fingerprint:
+        print("✔ FRER sources unchanged; skipping build")
+        return frer_exe
+    frer_exe = build(src_dir)
+    stamp.write_text(fingerprint + "\n")
+    return frer_exe
+
+
+def ini_inputs(ini_path: Path, seen: set = None) -> list:
+    """The ini file, all files it includes and all xmldoc() files it references."""
+    ini_path = Path(ini_path).resolve()
+    seen = set() if seen is None else seen
+    if ini_path in seen:
+        return []
+    seen.add(ini_path)
+    text = ini_path.read_text()
+    inputs = [ini_path]
+    for inc in _INCLUDE.findall(text):
+        inputs += ini_inputs(ini_path.parent / inc, seen)
+    for doc in _XMLDOC.findall(text):
+        path = (ini_path.parent / doc).resolve()
+        if path.exists() and path not in seen:
+            seen.add(path)
+            inputs.append(path)
+    return inputs
+
+
+def run_fingerprint(frer_exe: Path, ini_path: Path, args: list = (), ned_dirs: tuple = (SIM_DIR,),
+                    libs: tuple = ()) -> str:
+    """Content fingerprint of one simulation run (binary, ini + includes, scenarios, NED, libs, args)."""
+    files = {p: _sha256(p) for p in ini_inputs(ini_path)}
+    for d in ned_dirs:
+        files.update({p: _sha256(p) for p in Path(d).glob("*.ned")})
+    items = [(f"file:{p.name}:{i}", digest) for i, (p, digest) in enumerate(sorted(files.items()))]
+    items.append(("binary", _sha256(frer_exe)))
+    items += [(f"lib:{Path(lib).name}", _stat_digest(lib)) for lib in libs if Path(lib).exists()]
+    items.append(("args", " ".join(map(str, args))))
+    return _digest(items)
+
+
+def store_dir(fingerprint: str) -> Path:
+    return STORE_DIR / fingerprint[:16]
+
+
+def lookup(fingerprint: str):
+    """Store directory of a complete earlier run with this fingerprint, or None."""
+    run_dir = store_dir(fingerprint)
+    try:
+        manifest = json.loads((run_dir / MANIFEST).read_text())
+    except (FileNotFoundError, ValueError):
+        return None
+    return run_dir if manifest.get("fingerprint") == fingerprint else None
+
+
+def commit(fingerprint: str, run_dir: Path, **meta):
+    """Mark run_dir as a complete result set for fingerprint (written last)."""
+    manifest = {"fingerprint": fingerprint, "created": time.strftime("%Y-%m-%dT%H:%M:%S"), **meta}
+    (run_dir / MANIFEST).write_text(json.dumps(manifest, indent=1))
+
+
+def prepare(fingerprint: str) -> Path:
+    """Fresh (empty) store directory for a run with this fingerprint."""
+    run_dir = store_dir(fingerprint)
+    shutil.rmtree(run_dir, ignore_errors=True)
+    run_dir.mkdir(parents=True)
+    return run_dir
+
+
+def publish(run_dir: Path, results_dir: Path) -> list:
+    """
+    Copy the result files of a stored run into results_dir, replacing older
+    files of the same name (copies, not links: the IDE rewrites results/ in place).
+    """
+    published = []
+    for src in sorted(run_dir.iterdir()):
+        if src.name == MANIFEST or not src.is_file():
+            continue
+        dest = results_dir / src.name
+        shutil.copy2(src, dest)
+        published.append(dest)
+    return published
+
+
+def wait_for_results(vec_file: Path, timeout: float = 30.0, poll: float = 0.05) -> Path:
+    """
+    Wait until vec_file exists and its size is stable (the simulator has
+    exited, but slow/network file systems may lag). Raises FileNotFoundError
+    after timeout.
+    """
+    deadline = time.monotonic() + timeout
+    last = -1
+    while time.monotonic() < deadline:
+        if vec_file.exists():
+            size = vec_file.stat().st_size
+            if size == last:
+                return vec_file
+            last = size
+        time.sleep(poll)
+    raise FileNotFoundError(f"Result file not ready after {timeout}s: {vec_file}")
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Live monitoring and early abort of FRER runs.
+
+run_monitored() starts the simulator with its output going to a log file
+(not into memory), tails the .vec while the run is in progress and keeps
+live metrics: OoO/Dup ratios of seqNum, the largest reorder buffer and
+history length, and the newest sim time seen. As soon as one of the
+thresholds (e.g. `dup>20`, `buf>=50`) is crossed after --abort-after of sim
+time, the run is terminated and reported as aborted.
+
+OMNeT++ buffers vector data before writing it; FLUSH_ARGS lower that buffer
+to its minimum (1 MiB) so samples reach the file while the run is going.
+
+EX: `python3 sweep.py --param bufferSize=1..20 --abort-if "dup>20" --abort-after 10ms`
+"""
+import operator
+import re
+import subprocess
+from pathlib import Path
+
+import numpy as np
+
+from stream_metrics import StreamingRatios
+from vec_reader import VecTail
+
+LIVE_METRICS = ("ooo", "dup", "buf", "hl")
+FLUSH_ARGS = ["--output-vectors-memory-limit=1MiB"]
+POLL_SECONDS = 0.25
+
+_OPS = {">": operator.gt, ">=": operator.ge, "<": operator.lt, "<=": operator.le}
+_THRESHOLD = re.compile(r"^\s*(\w+)\s*(>=|<=|>|<)\s*([-+\d.eE]+)\s*$")
+
+
+def parse_threshold(text: str) -> tuple:
+    """`dup>20` → ("dup", ">", 20.0); the run is aborted when the comparison holds."""
+    m = _THRESHOLD.match(text)
+    if not m or m.group(1) not in LIVE_METRICS:
+        raise ValueError(f"Invalid abort threshold {text!r} (metric op value, metrics: {', '.join(LIVE_METRICS)})")
+    return m.group(1), m.group(2), float(m.group(3))
+
+
+class LiveMetrics:
+    """Metrics over the samples of a running simulation, fed from a VecTail."""
+
+    def __init__(self, vec_file: Path):
+        self.tail = VecTail(vec_file)
+        self.ratios = StreamingRatios()
+        self.buf = 0.0
+        self.hl = 0.0
+        self.t = 0.0
+
+    def update(self) -> int:
+        """Fold the newly appended samples in; returns their count."""
+        new = 0
+        for vid, (t, v) in self.tail.poll().items():
+            if not len(t):
+                continue
+            name = self.tail.header.vectors[vid].name
+            new += len(t)
+            self.t = max(self.t, float(t[-1]))
+            if name == "seqNum:vector":
+                self.ratios.update(v.astype(np.int64))
+            elif name == "reorderBuffLength:vector":
+                self.buf = max(self.buf, float(v.max()))
+            elif name == "historyLength:vector":
+                self.hl = max(self.hl, float(v.max()))
+            self.on_samples(name, t, v)
+        return new
+
+    def on_samples(self, name: str, t: np.ndarray, v: np.ndarray):
+        """Hook for subclasses: called with the new samples of every vector after they are folded in."""
+
+    def values(self) -> dict:
+        ooo, dup = self.ratios.ratios() if self.ratios.total > 1 else (0.0, 0.0)
+        return {"ooo": ooo, "dup": dup, "buf": self.buf, "hl": self.hl, "t": self.t}
+
+    def crossed(self, thresholds: list, min_time: float = 0.0):
+        """Description of the first crossed threshold, or None."""
+        if self.t < min_time:
+            return None
+        values = self.values()
+        for name, op, bound in thresholds:
+            if _OPS[op](values[name], bound):
+                return f"{name} {values[name]:.4g} {op} {bound:g} at t={values['t'] * 1e3:.1f}ms"
+        return None
+
+
+def run_monitored(cmd: list, cwd: Path, vec_file: Path, log_path: Path, thresholds: list,
+                  min_time: float = 0.0, poll: float = POLL_SECONDS) -> tuple:
+    """
+    Run cmd (a simulation_command() writing vec_file) and watch it.
+    Returns (returncode, abort reason or None); the output goes to log_path.
+    """
+    metrics = LiveMetrics(vec_file)
+    with open(log_path, "w") as log:
+        proc = subprocess.Popen(cmd, cwd=str(cwd), stdout=log, stderr=subprocess.STDOUT, text=True)
+        while True:
+            try:
+                return proc.wait(timeout=poll), None
+            except subprocess.TimeoutExpired:
+                pass
+            metrics.update()
+            reason = metrics.crossed(thresholds, min_time)
+            if reason:
+                proc.terminate()
+                try:
+                    proc.wait(timeout=5)
+                except subprocess.TimeoutExpired:
+                    proc.kill()
+                    proc.wait()
+                log.write(f"\naborted: {reason}\n")
+                return proc.returncode, reason
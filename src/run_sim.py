@@ -2,41 +2,45 @@
 import os
 import sys
 import subprocess
-import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 import argparse
 
+import run_cache
+import stage_trace
+from export_vector import write_vector_csv
+from stage_trace import stage
+from vec_reader import read_run
 
-def export_vector(filter_expr: str, output_filename: str, vec_path: Path):
-    """
-    Runs `opp_scavetool export` on the given .vec file and writes the CSV.
-    """
-    output_path = vec_path.parent / output_filename
-    cmd = [
-        "opp_scavetool", "export",
-        "--filter", filter_expr,
-        "-o", str(output_path),
-        str(vec_path)
-    ]
-    try:
-        subprocess.run(cmd, check=True)
-        print(f"✔ Exported `{vec_path.name}` → `{output_path.name}`")
-    except subprocess.CalledProcessError as e:
-        print(f"✖ Export failed for {vec_path.name}: {e}")
+# vectors written by export_all_vectors(), one CSV each
+EXPORT_VECTORS = (
+    "historyLength:vector",
+    "seqNum:vector",
+    "packetJitter:vector",
+    "reorderBuffLength:vector",
+    "linkDelay:vector",
+)
 
 
-def run_simulation(script_dir: Path, frer_exe: Path, ned_arg: str, x_arg: str, image_path: Path, src_inet: Path, ini_path: Path) -> subprocess.CompletedProcess:
-    """
-    Executes the FRER simulation and returns the completed process.
-    """
-    cmd = [
+def simulation_command(frer_exe: Path, ned_arg: str, x_arg: str, image_path: Path, src_inet: Path, ini_path: Path, extra_args: list = None) -> list:
+    """Cmdenv command line of a FRER run (see run_simulation())."""
+    return [
         str(frer_exe), '-u', 'Cmdenv',
         '-n', ned_arg,
         '-x', x_arg,
         f"--image-path={image_path}",
         '-l', str(src_inet),
+        *(extra_args or []),
         str(ini_path)
     ]
+
+
+def run_simulation(script_dir: Path, frer_exe: Path, ned_arg: str, x_arg: str, image_path: Path, src_inet: Path, ini_path: Path, extra_args: list = None) -> subprocess.CompletedProcess:
+    """
+    Executes the FRER simulation and returns the completed process.
+    extra_args are passed to Cmdenv before the ini file (e.g. -c, -r, --result-dir=...).
+    """
+    cmd = simulation_command(frer_exe, ned_arg, x_arg, image_path, src_inet, ini_path, extra_args)
     print(f"Running: {cmd!s}", file=sys.stderr)
     return subprocess.run(
         cmd,
@@ -48,6 +52,96 @@ def run_simulation(script_dir: Path, frer_exe: Path, ned_arg: str, x_arg: str, i
     )
 
 
+def build_frer(script_dir: Path) -> Path:
+    """
+    Runs `make` in script_dir and returns the path of the usable FRER binary.
+    Raises RuntimeError if the build fails or the binary is not executable.
+    """
+    print("🔨 Building FRER…")
+    try:
+        subprocess.run(["make"], cwd=str(script_dir), check=True)
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"Build failed: {e}") from e
+    frer_exe = script_dir / 'FRER'
+    if not frer_exe.exists() or not os.access(frer_exe, os.X_OK):
+        raise RuntimeError(f"FRER binary not usable at {frer_exe}")
+    return frer_exe
+
+
+def simulation_args(script_dir: Path) -> dict:
+    """
+    Returns the NED path, excluded packages and INET locations needed to run FRER
+    from script_dir, as keyword arguments for run_simulation().
+    """
+    inet_root = (script_dir.parent / '..' / 'inet4.5').resolve()
+    simulations_dir = script_dir.parent / 'simulations'
+    ned_paths = [
+        simulations_dir,
+        script_dir,
+        inet_root / 'examples',
+        inet_root / 'showcases',
+        inet_root / 'src',
+        inet_root / 'tests' / 'validation',
+        inet_root / 'tests' / 'networks',
+        inet_root / 'tutorials'
+    ]
+    ned_arg = ":".join(str(p.resolve()) for p in ned_paths)
+    x_arg = (
+        "inet.applications.voipstream;"
+        "inet.common.selfdoc;"
+        "inet.emulation;"
+        "inet.examples.emulation;"
+        "inet.examples.voipstream;"
+        "inet.linklayer.configurator.gatescheduling.z3;"
+        "inet.showcases.emulation;"
+        "inet.showcases.visualizer.osg;"
+        "inet.transportlayer.tcp_lwip;"
+        "inet.visualizer.osg"
+    )
+    return {
+        "ned_arg": ned_arg,
+        "x_arg": x_arg,
+        "image_path": inet_root / 'images',
+        "src_inet": inet_root / 'src' / 'INET',
+    }
+
+
+def inet_libs(src_inet: Path) -> list:
+    """Shared INET libraries loaded by `-l src_inet` (release and debug builds)."""
+    return [src_inet.parent / f"lib{src_inet.name}{sfx}.so" for sfx in ("", "_dbg")]
+
+
+def cached_run(script_dir: Path, frer_exe: Path, ini_path: Path, results_dir: Path,
+               sim_args: dict, extra_args: list = None, force: bool = False) -> Path:
+    """
+    Runs the simulation into the content-addressed store (see run_cache.py),
+    or reuses a stored run with the same inputs, then copies the result files
+    into results_dir. Returns the store directory of the run.
+    """
+    extra_args = list(extra_args or [])
+    fingerprint = run_cache.run_fingerprint(frer_exe, ini_path, extra_args,
+                                            libs=inet_libs(sim_args["src_inet"]))
+    run_dir = None if force else run_cache.lookup(fingerprint)
+    if run_dir is not None:
+        print(f"✔ Inputs unchanged; reusing stored run {run_dir.name}")
+    else:
+        run_dir = run_cache.prepare(fingerprint)
+        with stage("cmdenv"):
+            result = run_simulation(script_dir, frer_exe, ini_path=ini_path,
+                                    extra_args=[f"--result-dir={run_dir}", *extra_args], **sim_args)
+        print(result.stdout)
+        (run_dir / "cmdenv.log").write_text(result.stdout)
+        vecs = sorted(run_dir.glob("*.vec"))
+        if not vecs:
+            raise FileNotFoundError(f"No .vec file written to {run_dir}")
+        for vec in vecs:
+            run_cache.wait_for_results(vec)
+        run_cache.commit(fingerprint, run_dir, ini=str(ini_path), args=extra_args)
+    with stage("publish", python=True):
+        run_cache.publish(run_dir, results_dir)
+    return run_dir
+
+
 def find_vec_file(results_dir: Path, specified: str = None) -> Path:
     """
     Finds the .vec file in results_dir. If specified provided, checks that first.
@@ -66,18 +160,39 @@ def find_vec_file(results_dir: Path, specified: str = None) -> Path:
     return vecs[0]
 
 
-def export_all_vectors(prefix: str , vec_file: Path):
+def export_all_vectors(prefix: str, vec_file: Path, names: tuple = EXPORT_VECTORS) -> list:
     """
-    Exports both historyLength and seqNum vectors to CSV with the given prefix.
+    Reads vec_file once and writes one scavetool-style CSV per vector name
+    (`<prefix>_historyLength.csv`, `<prefix>_seqNum.csv`, …) next to it.
+    Returns the names that could not be exported (not recorded in the run).
     """
-    exports = [
-        ('name =~ "historyLength:vector"', f"{prefix}_historyLength.csv"),
-        ('name =~ "seqNum:vector"', f"{prefix}_seqNum.csv"),
-        ('name =~ "packetJitter:vector"', f"{prefix}_packetJitter.csv"),
-        ('name =~ "reorderBuffLength:vector"', f"{prefix}_reorderBuffLength.csv")
-    ]
-    for filter_expr, out_name in exports:
-        export_vector(filter_expr, out_name, vec_file)
+    missing = []
+    with stage("read", python=True, file=vec_file.name):
+        header, vectors = read_run(vec_file, names)
+    for name in names:
+        selected = {key: tv for key, tv in vectors.items() if key[1] == name}
+        if not selected:
+            print(f"✖ Export failed for {vec_file.name}: no {name} vector")
+            missing.append(name)
+            continue
+        out_path = vec_file.parent / f"{prefix}_{name.split(':')[0]}.csv"
+        with stage("write", python=True, file=out_path.name):
+            write_vector_csv(out_path, header.run, header.attrs, header.config, selected)
+        print(f"✔ Exported `{vec_file.name}` → `{out_path.name}`")
+    return missing
+
+
+def export_runs(prefix: str, vec_files: list, workers: int = None, names: tuple = EXPORT_VECTORS) -> dict:
+    """
+    Exports every .vec in vec_files in parallel (one process per file).
+    With more than one file the run's file stem is appended to the prefix.
+    Returns {vec file: missing vector names} of the incomplete exports.
+    """
+    prefixes = [prefix if len(vec_files) == 1 else f"{prefix}_{vec.stem}" for vec in vec_files]
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        futures = [pool.submit(export_all_vectors, p, vec, names) for p, vec in zip(prefixes, vec_files)]
+        missing = {vec: fut.result() for vec, fut in zip(vec_files, futures)}
+    return {vec: names for vec, names in missing.items() if names}
 
 
 def main():
@@ -96,69 +211,61 @@ def main():
         "--vec-filename", type=str, default=None,
         help="Specify the .vec file to export (default: first in results)"
     )
+    parser.add_argument(
+        "--all-runs", action="store_true",
+        help="Export every .vec in results (in parallel) instead of a single file."
+    )
+    parser.add_argument(
+        "--workers", type=int, default=None,
+        help="Parallel export processes for --all-runs (default: CPU count)"
+    )
+    parser.add_argument(
+        "--force", action="store_true",
+        help="Rebuild and rerun even if sources and inputs are unchanged."
+    )
+    parser.add_argument(
+        "--trace", nargs="?", const="", default=None, metavar="FILE",
+        help="Record per-stage wall/CPU time and peak RSS as a Chrome trace (default: results/traces/)."
+    )
+    parser.add_argument(
+        "--profile", action="store_true",
+        help="With --trace: also run cProfile on the Python stages."
+    )
     args = parser.parse_args()
+    if args.trace is not None or args.profile:
+        stage_trace.enable(Path(args.trace) if args.trace else None, profile=args.profile)
 
     # Setup paths
     script_dir = Path(__file__).resolve().parent
     # ————————————————————————————————
-    # Always rebuild the FRER binary
-    print("🔨 Building FRER…")
+    # Rebuild the FRER binary only if its sources changed
     try:
-        subprocess.run(["make"], cwd=str(script_dir), check=True)
-    except subprocess.CalledProcessError as e:
-        print("✖ Build failed:", e, file=sys.stderr)
+        with stage("make"):
+            frer_exe = run_cache.build_if_needed(build_frer, script_dir, force=args.force)
+    except RuntimeError as e:
+        print(f"✖ {e}", file=sys.stderr)
         sys.exit(1)
     # ————————————————————————————————
-    frer_exe = script_dir / 'FRER'
-    if not frer_exe.exists() or not os.access(frer_exe, os.X_OK):
-        print(f"Error: FRER binary not usable at {frer_exe}", file=sys.stderr)
-        sys.exit(1)
-
-    inet_root = (script_dir.parent / '..' / 'inet4.5').resolve()
-    image_path = inet_root / 'images'
-    src_inet = inet_root / 'src' / 'INET'
     simulations_dir = script_dir.parent / 'simulations'
     results_dir = simulations_dir / 'results'
     ini_path = simulations_dir / 'omnetpp.ini'
     if not ini_path.exists():
         print(f"Error: ini file not found at {ini_path}", file=sys.stderr)
         sys.exit(1)
+    sim_args = simulation_args(script_dir)
 
-    ned_paths = [
-        simulations_dir,
-        script_dir,
-        inet_root / 'examples',
-        inet_root / 'showcases',
-        inet_root / 'src',
-        inet_root / 'tests' / 'validation',
-        inet_root / 'tests' / 'networks',
-        inet_root / 'tutorials'
-    ]
-    ned_arg = ":".join(str(p.resolve()) for p in ned_paths)
-    x_arg = (
-        "inet.applications.voipstream;"
-        "inet.common.selfdoc;"
-        "inet.emulation;"
-        "inet.examples.emulation;"
-        "inet.examples.voipstream;"
-        "inet.linklayer.configurator.gatescheduling.z3;"
-        "inet.showcases.emulation;"
-        "inet.showcases.visualizer.osg;"
-        "inet.transportlayer.tcp_lwip;"
-        "inet.visualizer.osg"
-    )
-
-    # Run simulation
+    # Run simulation (or reuse a stored run with identical inputs)
     try:
-        result = run_simulation(script_dir, frer_exe, ned_arg, x_arg, image_path, src_inet, ini_path)
-        print(result.stdout)
+        with stage("simulate"):
+            cached_run(script_dir, frer_exe, ini_path, results_dir, sim_args, force=args.force)
     except subprocess.CalledProcessError as e:
         print(f"\nFRER exited with code {e.returncode}", file=sys.stderr)
         print(e.stdout, file=sys.stderr)
         print(e.stderr, file=sys.stderr)
         sys.exit(e.returncode)
-    # pause briefly to let files flush
-    time.sleep(1)
+    except FileNotFoundError as fnf:
+        print(f"Error: {fnf}", file=sys.stderr)
+        sys.exit(1)
 
     # only export if explicitly asked
     if args.export:
@@ -166,11 +273,19 @@ def main():
             print("Error: --export requires you to also pass --prefix", file=sys.stderr)
             sys.exit(1)
         try:
-            vec_file = find_vec_file(results_dir, args.vec_filename)
-            export_all_vectors(args.prefix, vec_file)
+            with stage("export"):
+                if args.all_runs:
+                    vec_files = sorted(results_dir.glob('*.vec'))
+                    if not vec_files:
+                        raise FileNotFoundError(f"No .vec files found in {results_dir}")
+                    missing = export_runs(args.prefix, vec_files, args.workers)
+                else:
+                    missing = export_all_vectors(args.prefix, find_vec_file(results_dir, args.vec_filename))
         except FileNotFoundError as fnf:
             print(f"Error: {fnf}", file=sys.stderr)
             sys.exit(1)
+        if missing:
+            sys.exit(1)
     else:
         print("✔ Simulation complete; skipping CSV export (use --export to enable).")
 
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Memory-mapped sample store for large result vectors.
+
+Every vector of an ingested result file is kept as two contiguous
+little-endian binary columns (`<key>.time` float64, `<key>.value` int64 for
+counter-like vectors such as seqNum, float64 otherwise) in a `.sample_store/`
+folder next to the source, plus a small JSON index with run, module, vector
+name, run attributes (runattr rows), vector attributes, sample count and
+time span. Reads return np.memmap views; read(..., t_range=(t0, t1)) finds
+the window with a binary search on the mapped time column, so a window of a
+run with tens of millions of samples is read without loading the rest.
+
+.vec files are ingested chunk by chunk (constant memory); CSV exports are
+decoded once through vec_reader. Sources are re-ingested only when their
+content changes (hash from result_cache.file_hash).
+
+EX: `t_s, seq = store_vector(results / "General-#0.vec", "seqNum:vector", t_range=(0.02, 0.03))`
+    `python3 sample_store.py ../simulations/results/General-#0.vec --list`
+"""
+import argparse
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from result_cache import file_hash
+from stream_metrics import parse_seconds
+from vec_reader import iter_vectors, read_csv_header, read_csv_vector, read_header
+
+STORE_DIRNAME = ".sample_store"
+INDEX         = "index.json"
+TIME_DTYPE    = np.dtype("<f8")
+# vectors whose values are counts/sequence numbers are stored as int64
+INT_VECTORS   = ("seqNum:vector", "historyLength:vector", "reorderBuffLength:vector")
+
+
+def value_dtype(name: str) -> np.dtype:
+    return np.dtype("<i8") if name in INT_VECTORS else np.dtype("<f8")
+
+
+def _key(source: str, run: str, module: str, name: str) -> str:
+    return hashlib.sha1(f"{source}\0{run}\0{module}\0{name}".encode()).hexdigest()[:16]
+
+
+class SampleStore:
+    """Index + memory-mapped columns of one store folder."""
+
+    def __init__(self, folder: Path):
+        self.folder = Path(folder)
+        try:
+            self.index = json.loads((self.folder / INDEX).read_text())
+        except (FileNotFoundError, ValueError):
+            self.index = {"sources": {}, "vectors": {}}
+
+    def save(self):
+        self.folder.mkdir(parents=True, exist_ok=True)
+        tmp = self.folder / f".{INDEX}.{os.getpid()}.tmp"
+        tmp.write_text(json.dumps(self.index, indent=1))
+        os.replace(tmp, self.folder / INDEX)
+
+    # ───── WRITE ────────────────────────────────────────────────────────────
+    def ingest(self, source: Path, force: bool = False) -> int:
+        """Add every vector of source (.vec or CSV export); returns the number of vectors written."""
+        source = Path(source).resolve()
+        digest = file_hash(source)
+        if not force and self.index["sources"].get(source.name) == digest:
+            return 0
+        self.drop_source(source.name)
+        self.folder.mkdir(parents=True, exist_ok=True)
+        entries = self._ingest_vec(source) if source.suffix == ".vec" else self._ingest_csv(source)
+        for key, entry in entries.items():
+            entry["source"] = source.name
+            self.index["vectors"][key] = entry
+        self.index["sources"][source.name] = digest
+        self.save()
+        return len(entries)
+
+    def _columns(self, key: str) -> tuple:
+        return self.folder / f"{key}.time", self.folder / f"{key}.value"
+
+    def _ingest_vec(self, vec_path: Path) -> dict:
+        files, entries, header = {}, {}, None
+        try:
+            for header, data in iter_vectors(vec_path):
+                for vid, (t, v) in data.items():
+                    decl = header.vectors[vid]
+                    key = _key(vec_path.name, header.run, decl.module, decl.name)
+                    if key not in files:
+                        t_path, v_path = self._columns(key)
+                        files[key] = (open(t_path, "wb"), open(v_path, "wb"))
+                        entries[key] = {"run": header.run, "module": decl.module, "name": decl.name,
+                                        "attrs": decl.attrs, "count": 0,
+                                        "value_dtype": value_dtype(decl.name).str,
+                                        "t_first": float(t[0]) if len(t) else None}
+                    ft, fv = files[key]
+                    ft.write(t.astype(TIME_DTYPE).tobytes())
+                    fv.write(v.astype(value_dtype(decl.name)).tobytes())
+                    entries[key]["count"] += len(t)
+                    if len(t):
+                        entries[key]["t_last"] = float(t[-1])
+        finally:
+            for ft, fv in files.values():
+                ft.close()
+                fv.close()
+        run_attrs = header.attrs if header is not None else read_header(vec_path).attrs
+        for entry in entries.values():
+            entry["run_attrs"] = run_attrs
+        return entries
+
+    def _ingest_csv(self, csv_path: Path) -> dict:
+        header = read_csv_header(csv_path)
+        rows = pd.read_csv(csv_path, usecols=["type", "module", "name"])
+        entries = {}
+        for module, name in rows[rows["type"] == "vector"][["module", "name"]].itertuples(index=False):
+            t, v = read_csv_vector(csv_path, name, module)
+            key = _key(csv_path.name, header.run, module, name)
+            t_path, v_path = self._columns(key)
+            t.astype(TIME_DTYPE).tofile(t_path)
+            v.astype(value_dtype(name)).tofile(v_path)
+            entries[key] = {"run": header.run, "module": module, "name": name, "attrs": {},
+                            "run_attrs": header.attrs, "count": len(t),
+                            "value_dtype": value_dtype(name).str,
+                            "t_first": float(t[0]) if len(t) else None,
+                            "t_last": float(t[-1]) if len(t) else None}
+        return entries
+
+    def drop_source(self, source_name: str):
+        """Remove all vectors ingested from source_name."""
+        for key in [k for k, e in self.index["vectors"].items() if e["source"] == source_name]:
+            for path in self._columns(key):
+                path.unlink(missing_ok=True)
+            del self.index["vectors"][key]
+        self.index["sources"].pop(source_name, None)
+
+    # ───── READ ─────────────────────────────────────────────────────────────
+    def find(self, name: str, module: str = None, run: str = None, source: str = None) -> str:
+        """Key of the first vector matching name (and module/run/source file name if given)."""
+        for key, e in self.index["vectors"].items():
+            if (e["name"] == name and module in (None, e["module"]) and run in (None, e["run"])
+                    and source in (None, e["source"])):
+                return key
+        raise KeyError(f"Vector {name!r} not found in {self.folder}")
+
+    def read(self, name: str, module: str = None, run: str = None, t_range: tuple = None,
+             source: str = None) -> tuple:
+        """
+        (times_s, values) as read-only np.memmap views; t_range=(t0, t1)
+        narrows them to t0 <= t <= t1 without touching the rest of the file.
+        source (a file name) picks the vector of that file when several
+        files in the folder hold the same run.
+        """
+        key = self.find(name, module, run, source)
+        entry = self.index["vectors"][key]
+        t_path, v_path = self._columns(key)
+        if entry["count"] == 0:
+            return np.empty(0, TIME_DTYPE), np.empty(0, np.dtype(entry["value_dtype"]))
+        t = np.memmap(t_path, dtype=TIME_DTYPE, mode="r", shape=(entry["count"],))
+        v = np.memmap(v_path, dtype=np.dtype(entry["value_dtype"]), mode="r", shape=(entry["count"],))
+        if t_range is None:
+            return t, v
+        lo = int(np.searchsorted(t, t_range[0], side="left"))
+        hi = int(np.searchsorted(t, t_range[1], side="right"))
+        return t[lo:hi], v[lo:hi]
+
+
+def store_for(source: Path) -> SampleStore:
+    return SampleStore(Path(source).resolve().parent / STORE_DIRNAME)
+
+
+def store_vector(source: Path, name: str, module: str = None, t_range: tuple = None) -> tuple:
+    """
+    Drop-in for result_cache.cached_vector() on large files: ingests source
+    into its store on first use (or after it changed) and returns memmap
+    views, optionally limited to t_range.
+    """
+    store = store_for(source)
+    store.ingest(source)
+    return store.read(name, module, t_range=t_range, source=Path(source).resolve().name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory-mapped sample store for result vectors")
+    parser.add_argument("files", type=Path, nargs="+", help=".vec files or scavetool CSV exports")
+    parser.add_argument("--list", action="store_true", help="List the stored vectors of the files")
+    parser.add_argument("--name", type=str, default=None, help="Print a vector (e.g. seqNum:vector)")
+    parser.add_argument("--module", type=str, default=None)
+    parser.add_argument("--from", dest="t0", type=str, default=None, help="Window start (e.g. 20ms)")
+    parser.add_argument("--to", dest="t1", type=str, default=None, help="Window end")
+    parser.add_argument("--force", action="store_true", help="Re-ingest even if unchanged")
+    args = parser.parse_args()
+
+    for path in args.files:
+        store = store_for(path)
+        n = store.ingest(path, force=args.force)
+        print(f"✔ {path.name}: {'ingested ' + str(n) + ' vectors' if n else 'up to date'} → {store.folder}")
+        if args.list:
+            for e in store.index["vectors"].values():
+                if e["source"] == path.resolve().name:
+                    print(f"  {e['module']} {e['name']}: {e['count']} samples "
+                          f"[{e['t_first']}, {e.get('t_last')}] s ({np.dtype(e['value_dtype']).name})")
+        if args.name:
+            t_range = None
+            if args.t0 or args.t1:
+                t_range = (parse_seconds(args.t0) if args.t0 else -np.inf,
+                           parse_seconds(args.t1) if args.t1 else np.inf)
+            t_s, values = store_vector(path, args.name, args.module, t_range)
+            for t, v in zip(t_s, values):
+                print(f"{t:.9f}\t{v}")
+
+
+if __name__ == "__main__":
+    main()
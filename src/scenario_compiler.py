@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Scenario compiler for the ScenarioManager scripts in simulations/.
+
+- parse_scenario(): scenario.xml → compact delay profile per link
+  ({"s1.ethg[2]": (change_times_s, delays_s)}, a disconnected link has delay inf);
+- profile_from_spec(): build profiles from declarative segments (step, ramp,
+  random walk, down, recorded trace) and write_scenario() to emit the XML;
+- packet_delays()/arrivals(): per-packet path delays and the resulting
+  arrivals at the merger for a given productionInterval, so analysis and
+  merger_model.py can run without the simulator.
+
+Spec files are JSON, e.g.
+    {"resolution": "10us",
+     "links": {"s1.ethg[2]": [{"ramp": {"start": "10ms", "end": "20ms", "from": "1ms", "to": "10ms", "step": "1ms"}},
+                              {"trace": {"file": "prod_delay.csv", "offset": "20ms"}}],
+               "s1.ethg[1]": [{"down": {"start": "50ms", "end": "60ms"}}]}}
+
+EX: `python3 scenario_compiler.py ../simulations/scenario.xml --summary`
+    `python3 scenario_compiler.py --spec ramps.json -o ../simulations/scenario_ramp.xml`
+"""
+import argparse
+import json
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+import numpy as np
+
+from stream_metrics import parse_seconds
+
+# redundant paths s1 → s2 (link1 = fast, link2 = slow in scenario.xml), initial delay from the NED file
+LINKS = ("s1.ethg[1]", "s1.ethg[2]")
+INITIAL_DELAY = 0.0
+CHANNEL_TYPE = "inet.node.ethernet.EthernetLink"
+# end-to-end latency source → merger without channel delay, and source → s1 egress
+BASE_LATENCY  = 20.274e-6
+EGRESS_OFFSET = BASE_LATENCY / 2
+
+
+def _link_key(module: str, gate: str) -> str:
+    return f"{module}.{gate}"
+
+
+def _peer(link: str) -> tuple:
+    """(dest-module, dest-gate) of a s1 → s2 link: s1.ethg[k] ↔ s2.ethg[k]."""
+    module, gate = link.split(".", 1)
+    return module.replace("s1", "s2"), gate
+
+
+def parse_scenario(path: Path, links: tuple = LINKS) -> dict:
+    """
+    Parse a ScenarioManager script into {link: (times_s, delays_s)} step
+    functions (value holds from each time on). Every link in links starts at
+    INITIAL_DELAY; disconnect → inf, connect → the delay param (or 0).
+    """
+    changes = {link: [(0.0, INITIAL_DELAY)] for link in links}
+    for at in ET.parse(path).getroot().iter("at"):
+        t = parse_seconds(at.get("t"))
+        for cmd in at:
+            if not isinstance(cmd.tag, str):          # comments
+                continue
+            link = _link_key(cmd.get("src-module", ""), cmd.get("src-gate", ""))
+            if cmd.tag == "set-channel-param" and cmd.get("par") == "delay":
+                delay = parse_seconds(cmd.get("value"))
+            elif cmd.tag == "disconnect":
+                delay = np.inf
+            elif cmd.tag == "connect":
+                param = cmd.find("param[@name='delay']")
+                delay = parse_seconds(param.get("value")) if param is not None else INITIAL_DELAY
+            else:
+                continue
+            changes.setdefault(link, [(0.0, INITIAL_DELAY)]).append((t, delay))
+    return {link: _compact(np.array([c[0] for c in ch]), np.array([c[1] for c in ch]))
+            for link, ch in changes.items()}
+
+
+def _compact(times: np.ndarray, delays: np.ndarray) -> tuple:
+    """Sort by time (later entries win on equal times) and drop no-op changes."""
+    order = np.argsort(times, kind="stable")
+    times, delays = times[order], delays[order]
+    last_of_time = np.append(times[1:] != times[:-1], True)
+    times, delays = times[last_of_time], delays[last_of_time]
+    changed = np.append(True, delays[1:] != delays[:-1])
+    return times[changed], delays[changed]
+
+
+def delay_at(profile: tuple, t) -> np.ndarray:
+    """Channel delay in effect at time(s) t for one link profile."""
+    times, delays = profile
+    idx = np.searchsorted(times, np.asarray(t, dtype=float), side="right") - 1
+    return np.where(idx >= 0, delays[np.clip(idx, 0, None)], INITIAL_DELAY)
+
+
+# ───── DECLARATIVE SPECS ────────────────────────────────────────────────────
+def _grid(start: float, end: float, step: float) -> np.ndarray:
+    return start + np.arange(int(round((end - start) / step)) + 1) * step
+
+
+def _segment(kind: str, p: dict, resolution: float) -> tuple:
+    sec = lambda key, default=None: parse_seconds(p[key]) if key in p else default
+    if kind == "step":
+        return np.array([sec("at")]), np.array([sec("delay")])
+    if kind == "ramp":
+        t = _grid(sec("start"), sec("end"), sec("step", resolution))
+        return t, np.linspace(sec("from"), sec("to"), len(t))
+    if kind == "random_walk":
+        t = _grid(sec("start"), sec("end"), sec("step", resolution))
+        rng = np.random.default_rng(p.get("seed", 0))
+        d = sec("initial", 0.0) + np.cumsum(rng.normal(0.0, sec("sigma"), len(t)))
+        return t, np.clip(d, sec("min", 0.0), sec("max", np.inf))
+    if kind == "down":
+        end = sec("end")
+        t = [sec("start")] + ([end] if end is not None else [])
+        return np.array(t), np.array([np.inf, sec("restore", INITIAL_DELAY)][:len(t)])
+    if kind == "trace":
+        # CSV with time_s,delay_s columns (header optional), shifted by offset
+        with open(p["file"]) as f:
+            has_header = not f.readline()[:1].isdigit()
+        data = np.loadtxt(p["file"], delimiter=",", ndmin=2, skiprows=int(has_header))
+        t = data[:, 0] + sec("offset", 0.0)
+        return t, data[:, 1] * float(p.get("scale", 1.0))
+    raise ValueError(f"Unknown scenario segment: {kind}")
+
+
+def profile_from_spec(spec: dict) -> dict:
+    """
+    Build {link: (times_s, delays_s)} from a spec; segments are applied in
+    order and times are quantized to the spec resolution (default 1us).
+    """
+    resolution = parse_seconds(spec.get("resolution", "1us"))
+    profile = {}
+    for link, segments in spec["links"].items():
+        times, delays = [np.array([0.0])], [np.array([INITIAL_DELAY])]
+        for seg in segments:
+            (kind, params), = seg.items()
+            t, d = _segment(kind, params, resolution)
+            times.append(np.round(t / resolution) * resolution)
+            delays.append(np.where(np.isinf(d), d, np.round(d / resolution) * resolution))
+        profile[link] = _compact(np.concatenate(times), np.concatenate(delays))
+    return profile
+
+
+# ───── XML OUTPUT ───────────────────────────────────────────────────────────
+def _fmt(seconds: float) -> str:
+    ns = int(round(seconds * 1e9))
+    if ns == 0:
+        return "0ms"
+    for unit, scale in (("s", 10 ** 9), ("ms", 10 ** 6), ("us", 10 ** 3)):
+        if ns % scale == 0:
+            return f"{ns // scale}{unit}"
+    return f"{ns}ns"
+
+
+def write_scenario(profile: dict, path: Path):
+    """Emit a ScenarioManager script reproducing profile (one <at> per change time)."""
+    events = {}
+    for link, (times, delays) in profile.items():
+        module, gate = link.split(".", 1)
+        prev = INITIAL_DELAY
+        for t, d in zip(times, delays):
+            if t == 0.0 and d == prev:
+                continue
+            if np.isinf(d):
+                cmd = f'<disconnect src-module="{module}" src-gate="{gate}"/>'
+            elif np.isinf(prev):
+                dest_module, dest_gate = _peer(link)
+                cmd = (f'<connect src-module="{module}" src-gate="{gate}" '
+                       f'dest-module="{dest_module}" dest-gate="{dest_gate}" channel-type="{CHANNEL_TYPE}">'
+                       f'<param name="delay" value="{_fmt(d)}"/></connect>')
+            else:
+                cmd = f'<set-channel-param src-module="{module}" src-gate="{gate}" par="delay" value="{_fmt(d)}"/>'
+            events.setdefault(int(round(t * 1e9)), []).append(cmd)
+            prev = d
+    lines = ["<scenario>", "  <!-- generated by scenario_compiler.py -->"]
+    for ns in sorted(events):
+        lines.append(f'  <at t="{_fmt(ns / 1e9)}">')
+        lines += [f"    {cmd}" for cmd in events[ns]]
+        lines.append("  </at>")
+    lines.append("</scenario>")
+    Path(path).write_text("\n".join(lines) + "\n")
+
+
+# ───── PER-PACKET DELAYS ────────────────────────────────────────────────────
+def packet_delays(profile: dict, interval: float, sim_time_limit: float, start: float = 0.0,
+                  base_latency: float = BASE_LATENCY, egress_offset: float = EGRESS_OFFSET) -> tuple:
+    """
+    Per-packet end-to-end delay (source → merger) on every path for a periodic
+    source. A packet takes the channel delay in effect when s1 starts sending
+    it (send time + egress_offset). Returns (send_s, {link: delay_s}), with
+    inf for packets sent while the link is down.
+    """
+    send = start + np.arange(int(np.floor((sim_time_limit - start) / interval + 1e-9)) + 1) * interval
+    return send, {link: base_latency + delay_at(p, send + egress_offset) for link, p in profile.items()}
+
+
+def arrivals(profile: dict, interval: float, sim_time_limit: float, start: float = 0.0, **kwargs) -> tuple:
+    """
+    Arrivals of all copies at the merger, in the (arrival_s, seq, delay_s)
+    layout used by merger_model.simulate(); lost copies and arrivals after
+    sim_time_limit are dropped.
+    """
+    send, delays = packet_delays(profile, interval, sim_time_limit, start, **kwargs)
+    seq = np.arange(len(send), dtype=np.int64)
+    t, s, d = [], [], []
+    for delay in delays.values():
+        ok = np.isfinite(delay) & (send + delay <= sim_time_limit)
+        t.append(send[ok] + delay[ok])
+        s.append(seq[ok])
+        d.append(delay[ok])
+    t, s, d = np.concatenate(t), np.concatenate(s), np.concatenate(d)
+    order = np.lexsort((s, np.rint(t * 1e12)))       # simtime ties: older packet first
+    return t[order], s[order], d[order]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parse, generate and precompute FRER delay scenarios")
+    parser.add_argument("scenario", type=Path, nargs="?", help="Existing scenario XML to parse")
+    parser.add_argument("--spec", type=Path, default=None, help="JSON spec to build a profile from")
+    parser.add_argument("-o", "--output", type=Path, default=None, help="Write the profile as scenario XML")
+    parser.add_argument("--delays", type=Path, default=None,
+                        help="Write per-packet path delays as CSV (send_s and one column per link)")
+    parser.add_argument("--interval", type=str, default="1ms", help="Source productionInterval")
+    parser.add_argument("--sim-time-limit", type=str, default="100ms")
+    parser.add_argument("--summary", action="store_true", help="Print the delay change points per link")
+    args = parser.parse_args()
+
+    if args.spec:
+        profile = profile_from_spec(json.loads(args.spec.read_text()))
+    elif args.scenario:
+        profile = parse_scenario(args.scenario)
+    else:
+        parser.error("pass a scenario XML or --spec")
+
+    if args.summary:
+        for link, (times, delays) in profile.items():
+            print(f"{link}: {len(times)} changes")
+            for t, d in zip(times, delays):
+                print(f"  {_fmt(t):>8} → {'down' if np.isinf(d) else _fmt(d)}")
+    if args.output:
+        write_scenario(profile, args.output)
+        print(f"✔ Wrote scenario → {args.output}")
+    if args.delays:
+        send, delays = packet_delays(profile, parse_seconds(args.interval), parse_seconds(args.sim_time_limit))
+        links = list(delays)
+        np.savetxt(args.delays, np.column_stack([send] + [delays[l] for l in links]),
+                   delimiter=",", header=",".join(["send_s"] + links), comments="", fmt="%.12g")
+        print(f"✔ Wrote per-packet delays for {len(send)} packets → {args.delays}")
+
+
+if __name__ == "__main__":
+    main()
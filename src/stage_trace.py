@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Stage timing for the run/export/plot pipeline.
+
+Code marks its stages with `with stage("make"):` or the @traced() decorator.
+Nothing is recorded until tracing is enabled, either by enable() (run_sim.py
+and figures.py `--trace [FILE] --profile`) or by the environment, which also
+covers the plot_*.py scripts run on their own:
+
+    FRER_TRACE=1 | FRER_TRACE=<file.json>   record stages of this process
+    FRER_PROFILE=1                          also run cProfile in Python stages
+
+Per stage the wall time, CPU time of the process and of the child processes
+it waited for (make, FRER, opp_scavetool, export workers), and the peak RSS
+high-water marks of both are taken from getrusage(). At exit the stages are
+written as a Chrome trace (chrome://tracing, Perfetto; nested stages nest)
+to FILE, by default `results/traces/<script>_<time>.json`, and a summary
+table with per-stage self time is printed. With profiling, the Python
+stages' cProfile data goes to `<trace>.prof` and the top functions are
+printed.
+
+Stages run in ProcessPoolExecutor workers are not recorded separately;
+their CPU time and RSS show up as child usage of the enclosing stage.
+
+EX: `python3 run_sim.py --export --prefix baseline --trace --profile`
+    `FRER_TRACE=1 python3 plot_seqNum.py`
+    `python3 stage_trace.py ../simulations/results/traces/run_sim_20250101-120000.json`
+"""
+import argparse
+import atexit
+import cProfile
+import functools
+import json
+import os
+import pstats
+import resource
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+TRACE_DIR = Path(__file__).resolve().parent.parent / "simulations" / "results" / "traces"
+TOP_FUNCTIONS = 15
+
+_tracer = None
+
+
+def _usage() -> tuple:
+    """(wall ns, own CPU s, children CPU s, own peak RSS MiB, children peak RSS MiB)."""
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    kids = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return (time.perf_counter_ns(), own.ru_utime + own.ru_stime, kids.ru_utime + kids.ru_stime,
+            own.ru_maxrss / 1024, kids.ru_maxrss / 1024)     # ru_maxrss is in KiB on Linux
+
+
+class Tracer:
+    """Collects finished stages of this process as Chrome trace events."""
+
+    def __init__(self, path: Path, profile: bool = False):
+        self.path = path
+        self.events = []
+        self.t0 = time.perf_counter_ns()
+        self.profiler = cProfile.Profile() if profile else None
+        self._profiling = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._done = False
+
+    def _stack(self) -> list:
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    def enter(self, python: bool):
+        self._stack().append(0)                  # wall ns of finished child stages
+        if python and self.profiler is not None and threading.current_thread() is threading.main_thread():
+            if self._profiling == 0:
+                self.profiler.enable()
+            self._profiling += 1
+            return True
+        return False
+
+    def leave(self, name: str, start: tuple, end: tuple, python: bool, profiled: bool, error: bool,
+              details: dict = None):
+        if profiled:
+            self._profiling -= 1
+            if self._profiling == 0:
+                self.profiler.disable()
+        stack = self._stack()
+        wall = end[0] - start[0]
+        self_ns = wall - stack.pop()
+        if stack:
+            stack[-1] += wall
+        event = {
+            "name": name, "cat": "python" if python else "stage", "ph": "X",
+            "ts": (start[0] - self.t0) / 1e3, "dur": wall / 1e3,
+            "pid": os.getpid(), "tid": threading.get_ident(),
+            "args": {"self_s": self_ns / 1e9, "cpu_s": end[1] - start[1], "children_cpu_s": end[2] - start[2],
+                     "peak_rss_mib": end[3], "children_peak_rss_mib": end[4]},
+        }
+        if details:
+            event["args"].update(details)
+        if error:
+            event["args"]["error"] = True
+        with self._lock:
+            self.events.append(event)
+
+    def finish(self):
+        """Write the trace (and profile) and print the summary; safe to call twice."""
+        if self._done:
+            return
+        self._done = True
+        if not self.events:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(json.dumps({"traceEvents": self.events, "displayTimeUnit": "ms",
+                                         "otherData": {"argv": sys.argv}}, indent=1))
+        print_summary(self.events)
+        print(f"✔ Trace → {self.path}")
+        if self.profiler is not None:
+            prof = self.path.with_suffix(".prof")
+            self.profiler.dump_stats(str(prof))
+            pstats.Stats(str(prof)).sort_stats("cumulative").print_stats(TOP_FUNCTIONS)
+            print(f"✔ Profile → {prof} (e.g. `python3 -m pstats {prof.name}`)")
+
+
+def default_path() -> Path:
+    script = Path(sys.argv[0]).stem or "python"
+    return TRACE_DIR / f"{script}_{time.strftime('%Y%m%d-%H%M%S')}_{os.getpid()}.json"
+
+
+def enable(path: Path = None, profile: bool = False) -> Tracer:
+    """Start recording stages of this process; the trace is written at exit."""
+    global _tracer
+    if _tracer is None:
+        _tracer = Tracer(Path(path) if path else default_path(), profile)
+        atexit.register(_tracer.finish)
+    return _tracer
+
+
+def enabled() -> bool:
+    return _tracer is not None
+
+
+@contextmanager
+def stage(name: str, python: bool = False, **details):
+    """
+    Time the enclosed block as one stage; python=True marks it for cProfile.
+    Keep name fixed per pipeline step (the summary groups by it) and pass
+    per-call details such as file=... as keywords; they go to the event args.
+    """
+    tracer = _tracer
+    if tracer is None:
+        yield
+        return
+    start = _usage()
+    profiled = tracer.enter(python)
+    error = False
+    try:
+        yield
+    except BaseException:
+        error = True
+        raise
+    finally:
+        tracer.leave(name, start, _usage(), python, profiled, error, details)
+
+
+def traced(name: str = None, python: bool = True):
+    """Decorator form of stage(), named after the function by default."""
+    def wrap(func):
+        @functools.wraps(func)
+        def inner(*args, **kwargs):
+            with stage(name or func.__name__, python):
+                return func(*args, **kwargs)
+        return inner
+    return wrap
+
+
+def summarize(events: list) -> list:
+    """Rows per stage name in first-seen order: calls, wall/self/CPU totals and RSS high-water marks."""
+    rows = {}
+    for e in sorted(events, key=lambda e: e["ts"]):
+        a = e["args"]
+        r = rows.setdefault(e["name"], {"stage": e["name"], "calls": 0, "wall_s": 0.0, "self_s": 0.0,
+                                        "cpu_s": 0.0, "children_cpu_s": 0.0, "peak_rss_mib": 0.0,
+                                        "children_peak_rss_mib": 0.0})
+        r["calls"] += 1
+        r["wall_s"] += e["dur"] / 1e6
+        for key in ("self_s", "cpu_s", "children_cpu_s"):
+            r[key] += a[key]
+        for key in ("peak_rss_mib", "children_peak_rss_mib"):
+            r[key] = max(r[key], a[key])
+    return list(rows.values())
+
+
+def print_summary(events: list):
+    print(f"{'stage':<40}{'calls':>6}{'wall s':>9}{'self s':>9}{'cpu s':>9}{'child cpu':>10}"
+          f"{'RSS MiB':>9}{'child RSS':>10}")
+    for r in summarize(events):
+        print(f"{r['stage'][:39]:<40}{r['calls']:>6}{r['wall_s']:9.3f}{r['self_s']:9.3f}{r['cpu_s']:9.3f}"
+              f"{r['children_cpu_s']:10.3f}{r['peak_rss_mib']:9.1f}{r['children_peak_rss_mib']:10.1f}")
+
+
+_env = os.environ.get("FRER_TRACE")
+if _env:
+    enable(None if _env == "1" else Path(_env), os.environ.get("FRER_PROFILE") == "1")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Print the stage summary of a recorded trace")
+    parser.add_argument("trace", type=Path, help="Trace JSON written by a traced run")
+    args = parser.parse_args()
+    print_summary(json.loads(args.trace.read_text())["traceEvents"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Streaming out-of-order / duplicate ratios for seqNum vectors of any length.
+
+StreamingRatios consumes seqNum samples chunk by chunk and keeps only a
+bitmap of the last `window` sequence numbers, so memory is O(window + chunk)
+instead of O(run). The ratios are the same as compute_ratios() in
+plot_jitter_ratios.py as long as no duplicate arrives more than `window`
+sequence numbers behind the newest one (the default covers the full 16-bit
+R-TAG sequence space). Samples older than the window are counted as
+duplicates and reported separately as `stale`.
+
+EX: `python3 stream_metrics.py ../simulations/results/dynamicHL_seqNum.csv --interval 10ms`
+"""
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+from vec_reader import iter_vector, load_vector
+
+DEFAULT_WINDOW = 1 << 16
+
+
+def parse_seconds(text: str) -> float:
+    """Parse an ini-style duration like `10ms`, `250us` or `0.5s` into seconds."""
+    units = {"s": 1.0, "ms": 1e-3, "us": 1e-6, "ns": 1e-9}
+    for unit in ("ms", "us", "ns", "s"):
+        if text.endswith(unit):
+            return float(text[:-len(unit)]) * units[unit]
+    return float(text)
+
+
+class StreamingRatios:
+    """
+    Incremental OoO/Dup counter with a sliding duplicate bitmap.
+
+    update(seq, t) may be called any number of times with consecutive chunks;
+    t is only needed when per-interval series are requested (interval > 0).
+    """
+
+    def __init__(self, window: int = DEFAULT_WINDOW, interval: float = 0.0):
+        self.window = int(window)
+        self.interval = float(interval)
+        self.seen = np.zeros(self.window, dtype=bool)   # slot s % window
+        self.hi = None          # highest sequence number seen so far
+        self.last = None        # last sample, to pair across chunk borders
+        self.total = 0
+        self.pairs = 0
+        self.ooo = 0
+        self.dup = 0
+        self.stale = 0
+        # per-interval accumulators: bin -> [samples, pairs, ooo, dup]
+        self._bins = {}
+        self._series = []
+        self._next_bin = None
+
+    def update(self, seq, t=None):
+        seq = np.asarray(seq, dtype=np.int64)
+        n = len(seq)
+        if n == 0:
+            return
+        if self.hi is None:
+            self.hi = int(seq[0]) - 1
+
+        # out-of-order: adjacent jump != +1, attributed to the later sample
+        prev = np.concatenate(([self.last], seq[:-1])) if self.last is not None else seq[:-1]
+        ooo_flags = np.zeros(n, dtype=bool)
+        ooo_flags[n - len(prev):] = (seq[n - len(prev):] - prev) != 1
+
+        # duplicates: compare against the running high-water mark before each sample
+        run_max = np.maximum.accumulate(np.concatenate(([self.hi], seq)))
+        stale = seq <= run_max[:-1] - self.window
+        _, first_idx = np.unique(seq, return_index=True)
+        repeat = np.ones(n, dtype=bool)
+        repeat[first_idx] = False
+        in_old = (~stale) & (seq <= self.hi)
+        seen_before = np.zeros(n, dtype=bool)
+        seen_before[in_old] = self.seen[seq[in_old] % self.window]
+        dup_flags = stale | repeat | seen_before
+
+        # slide the bitmap to the new high-water mark and record this chunk
+        new_hi = int(run_max[-1])
+        if new_hi - self.hi >= self.window:
+            self.seen[:] = False
+        elif new_hi > self.hi:
+            self.seen[np.arange(self.hi + 1, new_hi + 1) % self.window] = False
+        keep = seq > new_hi - self.window
+        self.seen[seq[keep] % self.window] = True
+        self.hi = new_hi
+
+        self.total += n
+        self.pairs += len(prev)
+        self.ooo += int(ooo_flags.sum())
+        self.dup += int(dup_flags.sum())
+        self.stale += int(stale.sum())
+        self.last = int(seq[-1])
+        if self.interval > 0:
+            if t is None:
+                raise ValueError("Per-interval ratios need sample times")
+            self._bin(np.asarray(t, dtype=float), ooo_flags, dup_flags, len(prev) < n)
+
+    def _bin(self, t, ooo_flags, dup_flags, first_unpaired):
+        bins = np.floor(t / self.interval).astype(np.int64)
+        pair_flags = np.ones(len(t), dtype=bool)
+        pair_flags[0] = not first_unpaired
+        lo = int(bins[0])
+        counts = [np.bincount(bins - lo, weights=w.astype(float))
+                  for w in (np.ones(len(t), dtype=bool), pair_flags, ooo_flags, dup_flags)]
+        for k in np.nonzero(counts[0])[0]:
+            acc = self._bins.setdefault(lo + int(k), [0, 0, 0, 0])
+            for i in range(4):
+                acc[i] += int(counts[i][k])
+        # every bin before the last one seen is complete
+        self._flush(int(bins[-1]))
+
+    def _flush(self, upto: int = None):
+        """Emit completed bins in order; empty bins in between get NaN ratios."""
+        if not self._bins:
+            return
+        last = max(self._bins) + 1 if upto is None else upto
+        b = self._next_bin if self._next_bin is not None else min(self._bins)
+        while b < last:
+            samples, pairs, ooo, dup = self._bins.pop(b, (0, 0, 0, 0))
+            self._series.append(((b + 1) * self.interval,
+                                 ooo / pairs * 100 if pairs else np.nan,
+                                 dup / samples * 100 if samples else np.nan,
+                                 samples))
+            b += 1
+        self._next_bin = b
+
+    def ratios(self) -> tuple:
+        """(OoO %, Dup %) over everything seen so far, as compute_ratios() reports them."""
+        ooo = self.ooo / self.pairs * 100 if self.pairs else 0.0
+        dup = self.dup / self.total * 100 if self.total else 0.0
+        return ooo, dup
+
+    def series(self) -> dict:
+        """
+        Per-interval ratios as arrays {'t_end', 'ooo', 'dup', 'samples'}; flushes
+        the open bin, so call it once the stream is complete.
+        """
+        self._flush()
+        arr = np.array(self._series, dtype=float).reshape(-1, 4)
+        return {"t_end": arr[:, 0], "ooo": arr[:, 1], "dup": arr[:, 2],
+                "samples": arr[:, 3].astype(np.int64)}
+
+
+def stream_ratios(path: Path, window: int = DEFAULT_WINDOW, interval: float = 0.0,
+                  vector_name: str = "seqNum:vector") -> StreamingRatios:
+    """
+    Feed a seqNum vector into StreamingRatios; .vec files are streamed chunk
+    by chunk, CSV exports are read whole (they hold the vector in one cell).
+    """
+    metrics = StreamingRatios(window, interval)
+    path = Path(path)
+    chunks = iter_vector(path, vector_name) if path.suffix == ".vec" else [load_vector(path, vector_name)]
+    for t_s, values in chunks:
+        metrics.update(values, t_s)
+    return metrics
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming OoO/Dup ratios of a seqNum vector")
+    parser.add_argument("files", type=Path, nargs="+", help=".vec files or seqNum CSV exports")
+    parser.add_argument("--window", type=int, default=DEFAULT_WINDOW,
+                        help="Duplicate detection window in sequence numbers")
+    parser.add_argument("--interval", type=str, default=None,
+                        help="Also print per-interval ratios (e.g. 10ms)")
+    args = parser.parse_args()
+
+    interval = parse_seconds(args.interval) if args.interval else 0.0
+    for path in args.files:
+        m = stream_ratios(path, args.window, interval)
+        ooo, dup = m.ratios()
+        print(f"{path.name}: OoO {ooo:.2f}%  Dup {dup:.2f}%  ({m.total} samples, {m.stale} stale)")
+        if interval:
+            s = m.series()
+            for t_end, o, d in zip(s["t_end"], s["ooo"], s["dup"]):
+                print(f"  ≤{t_end * 1e3:8.1f} ms  OoO {o:6.2f}%  Dup {d:6.2f}%")
+
+
+if __name__ == "__main__":
+    main()
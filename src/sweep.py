@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Parallel parameter sweep over the StreamMergerSorter merger parameters.
+
+The FRER binary is built once, then every grid point runs in its own process
+with its own result directory. omnetpp.ini is never modified: each point gets a
+small generated overlay ini that includes it and overrides the swept
+parameters in a `[Config <name>]` section selected with `-c <name> -r 0`.
+
+EX: `python3 sweep.py --param jitter=0..10ms --param bufferSize=5,10 --name jitter`
+"""
+import argparse
+import csv
+import itertools
+import os
+import re
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import run_cache
+from run_monitor import FLUSH_ARGS, parse_threshold, run_monitored
+from run_sim import build_frer, export_all_vectors, run_simulation, simulation_args, simulation_command
+from stream_metrics import parse_seconds
+
+SCRIPT_DIR  = Path(__file__).resolve().parent                # …/FRER/src
+SIM_DIR     = SCRIPT_DIR.parent / "simulations"              # …/FRER/simulations
+INI_PATH    = SIM_DIR / "omnetpp.ini"
+SWEEPS_DIR  = SIM_DIR / "results" / "sweeps"
+
+MERGER = "*.s2.bridging.streamRelay.merger"
+# swept merger parameters and the short tag used for them in run names
+PARAM_TAGS = {
+    "jitter":            "J",
+    "bufferSize":        "B",
+    "timerInterval":     "T",
+    "enableReordering":  "R",
+    "periodicEmission":  "P",
+    "dynamicBuffersize": "D",
+}
+MERGER_PARAMS = tuple(PARAM_TAGS)
+# merger flags of the paper's variants, as in the checked-in <variant>_*.csv exports
+VARIANTS = {
+    "baseline":  {"dynamicBuffersize": "false", "enableReordering": "false", "periodicEmission": "false"},
+    "dynamicHL": {"dynamicBuffersize": "true",  "enableReordering": "false", "periodicEmission": "false"},
+    "sorting":   {"dynamicBuffersize": "true",  "enableReordering": "true",  "periodicEmission": "false"},
+    "shaping":   {"dynamicBuffersize": "true",  "enableReordering": "true",  "periodicEmission": "true"},
+}
+
+
+def ini_key(param: str) -> str:
+    """Map a merger parameter name to its ini key; other keys pass through verbatim."""
+    return f"{MERGER}.{param}" if param in PARAM_TAGS else param
+
+
+def parse_values(spec: str) -> list:
+    """
+    Parse the value list of one --param spec.
+    `0..10ms` expands to 0ms, 1ms, …, 10ms; `5,10,20` and `true,false` are taken as-is.
+    """
+    m = re.fullmatch(r"(-?\d+)\.\.(-?\d+)(:\d+)?([A-Za-z]*)", spec)
+    if m:
+        start, stop = int(m.group(1)), int(m.group(2))
+        step = int(m.group(3)[1:]) if m.group(3) else 1
+        return [f"{v}{m.group(4)}" for v in range(start, stop + 1, step)]
+    return [v.strip() for v in spec.split(",") if v.strip()]
+
+
+def parse_grid(specs: list) -> dict:
+    """Turn `name=values` specs into an ordered {param: [values]} grid."""
+    grid = {}
+    for spec in specs:
+        name, sep, values = spec.partition("=")
+        if not sep or not values:
+            raise ValueError(f"Invalid --param spec (expected name=values): {spec}")
+        grid[name.strip()] = parse_values(values)
+    return grid
+
+
+def expand_grid(grid: dict) -> list:
+    """Cartesian product of the grid as a list of {param: value} points."""
+    names = list(grid)
+    return [dict(zip(names, combo)) for combo in itertools.product(*grid.values())]
+
+
+def _tag_value(value: str) -> str:
+    value = {"true": "1", "false": "0"}.get(str(value).lower(), str(value))
+    return re.sub(r"[^A-Za-z0-9]", "", value.replace(".", "p"))
+
+
+def run_name(point: dict, prefix: str = "") -> str:
+    """
+    Deterministic, ini-safe name of a grid point, e.g. `J3ms_B5_R1`.
+    Merger parameters use their PARAM_TAGS tag, in MERGER_PARAMS order.
+    """
+    parts = [f"{PARAM_TAGS[p]}{_tag_value(point[p])}" for p in MERGER_PARAMS if p in point]
+    parts += [f"{re.sub(r'[^A-Za-z0-9]', '', k)}{_tag_value(v)}"
+              for k, v in point.items() if k not in PARAM_TAGS]
+    name = "_".join(parts) or "default"
+    return f"{prefix}_{name}" if prefix else name
+
+
+def write_overlay(run_dir: Path, config: str, point: dict, base_ini: Path = INI_PATH) -> Path:
+    """
+    Write `<run_dir>/<config>.ini` that includes base_ini and overrides point
+    inside `[Config <config>]` (config entries take precedence over [General]).
+    """
+    lines = [
+        "# generated by sweep.py, do not edit",
+        f"include {base_ini.resolve()}",
+        "",
+        f"[Config {config}]",
+    ]
+    lines += [f"{ini_key(k)} = {v}" for k, v in point.items()]
+    overlay = run_dir / f"{config}.ini"
+    overlay.write_text("\n".join(lines) + "\n")
+    return overlay
+
+
+def run_point(frer_exe: Path, sim_args: dict, run_dir: Path, config: str, point: dict,
+              export: bool = True, base_ini: Path = INI_PATH, thresholds: list = None,
+              min_time: float = 0.0) -> dict:
+    """
+    Run one grid point into run_dir and optionally export its vectors there.
+    With thresholds the run is watched live (run_monitor.py) and stopped early
+    once one is crossed; such rows get status `aborted (...)` and no export.
+    A run that lacks one of the exported vectors gets status `failed (export)`.
+    Executed in a worker process; returns one summary row.
+    """
+    run_dir.mkdir(parents=True, exist_ok=True)
+    overlay = write_overlay(run_dir, config, point, base_ini)
+    vec_file = run_dir / f"{config}.vec"
+    extra_args = [
+        "-c", config, "-r", "0",
+        f"--result-dir={run_dir}",
+        f"--output-vector-file={vec_file}",
+        f"--output-scalar-file={run_dir / f'{config}.sca'}",
+    ]
+    row = {"name": config, **point, "status": "ok", "vec": str(vec_file), "seconds": 0.0}
+    start = time.perf_counter()
+    try:
+        if thresholds:
+            cmd = simulation_command(frer_exe, ini_path=overlay, extra_args=extra_args + FLUSH_ARGS, **sim_args)
+            returncode, reason = run_monitored(cmd, SCRIPT_DIR, vec_file, run_dir / "cmdenv.log",
+                                               thresholds, min_time)
+            if reason:
+                row["status"] = f"aborted ({reason})"
+                row["seconds"] = round(time.perf_counter() - start, 3)
+                return row
+            if returncode:
+                raise subprocess.CalledProcessError(returncode, cmd, (run_dir / "cmdenv.log").read_text(), "")
+        else:
+            result = run_simulation(SCRIPT_DIR, frer_exe, ini_path=overlay,
+                                    extra_args=extra_args, **sim_args)
+            (run_dir / "cmdenv.log").write_text(result.stdout)
+        run_cache.wait_for_results(vec_file)
+        if export and export_all_vectors(config, vec_file):
+            row["status"] = "failed (export)"
+    except subprocess.CalledProcessError as e:
+        (run_dir / "cmdenv.log").write_text(f"{e.stdout}\n{e.stderr}")
+        row["status"] = f"failed ({e.returncode})"
+    except FileNotFoundError:
+        row["status"] = "failed (no results)"
+    row["seconds"] = round(time.perf_counter() - start, 3)
+    return row
+
+
+def write_summary(rows: list, path: Path):
+    """Write the sweep summary rows as CSV (one row per grid point)."""
+    fields = list(dict.fromkeys(k for row in rows for k in row))
+    with path.open("w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def run_sweep(points: list, sweep_dir: Path, workers: int = None, export: bool = True,
+              build: bool = True, base_ini: Path = INI_PATH, prefix: str = "",
+              thresholds: list = None, min_time: float = 0.0) -> list:
+    """
+    Build FRER once (if its sources changed) and run all points in a process pool.
+    Each point runs in `sweep_dir/<run_name>/`; the summary goes to `sweep_dir/sweep.csv`.
+    Rows are returned in the order of points.
+    """
+    frer_exe = run_cache.build_if_needed(build_frer, SCRIPT_DIR) if build else SCRIPT_DIR / "FRER"
+    sim_args = simulation_args(SCRIPT_DIR)
+    sweep_dir.mkdir(parents=True, exist_ok=True)
+    names = [run_name(p, prefix) for p in points]
+    if len(set(names)) != len(names):
+        raise ValueError("Grid points do not map to unique run names")
+
+    rows = {}
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        futures = {
+            pool.submit(run_point, frer_exe, sim_args, sweep_dir / name, name, point,
+                        export, base_ini, thresholds, min_time): name
+            for name, point in zip(names, points)
+        }
+        for fut in as_completed(futures):
+            row = fut.result()
+            rows[futures[fut]] = row
+            mark = {"ok": "✔", "aborted": "■"}.get(row["status"].split(" ")[0], "✖")
+            print(f"{mark} {row['name']}: {row['status']} in {row['seconds']}s")
+
+    ordered = [rows[n] for n in names]
+    write_summary(ordered, sweep_dir / "sweep.csv")
+    return ordered
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run a parallel FRER sweep over merger parameters"
+    )
+    parser.add_argument(
+        "--param", action="append", default=[], metavar="NAME=VALUES",
+        help=f"Swept parameter, e.g. jitter=0..10ms or bufferSize=5,10 "
+             f"(merger params: {', '.join(MERGER_PARAMS)}; other names are raw ini keys)"
+    )
+    parser.add_argument(
+        "--name", type=str, default="sweep",
+        help="Sweep name; results go to simulations/results/sweeps/<name>/"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=None,
+        help="Number of parallel runs (default: number of CPUs)"
+    )
+    parser.add_argument(
+        "--no-export", action="store_true",
+        help="Skip the per-run CSV export"
+    )
+    parser.add_argument(
+        "--no-build", action="store_true",
+        help="Use the existing FRER binary instead of running make"
+    )
+    parser.add_argument(
+        "--abort-if", action="append", default=[], metavar="METRIC>VALUE",
+        help="Stop a run early once a live metric crosses a threshold, e.g. dup>20 or buf>=50 "
+             "(metrics: ooo, dup in %%; buf, hl as max lengths; repeatable)"
+    )
+    parser.add_argument(
+        "--abort-after", type=str, default="0ms",
+        help="Sim time before thresholds are checked (ratios are noisy at the start)"
+    )
+    args = parser.parse_args()
+
+    try:
+        points = expand_grid(parse_grid(args.param))
+        thresholds = [parse_threshold(t) for t in args.abort_if]
+        rows = run_sweep(points, SWEEPS_DIR / args.name, args.workers,
+                         export=not args.no_export, build=not args.no_build,
+                         thresholds=thresholds, min_time=parse_seconds(args.abort_after))
+    except (ValueError, RuntimeError) as e:
+        print(f"✖ {e}", file=sys.stderr)
+        sys.exit(1)
+    aborted = [r for r in rows if r["status"].startswith("aborted")]
+    failed = [r for r in rows if r["status"] != "ok" and r not in aborted]
+    print(f"✔ Sweep `{args.name}`: {len(rows) - len(failed) - len(aborted)}/{len(rows)} runs ok, "
+          f"{len(aborted)} aborted → {SWEEPS_DIR / args.name / 'sweep.csv'}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
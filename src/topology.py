@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+Generator for many-path, many-stream FRER networks, plus per-stream and
+per-path analysis of their runs.
+
+The paper network (FRER_network_topology.ned / omnetpp.ini) has one stream
+s1 split over two paths s1a/s1b between s1 and s2. From a JSON spec this
+script writes the same structure with P disjoint s1 → s2 paths and N streams:
+
+    {
+      "name": "paths4",
+      "paths": [{"delay": "0ms"}, {"delay": "1ms"},
+                {"profile": [{"ramp": {"start": "10ms", "end": "20ms", "from": "1ms", "to": "10ms", "step": "1ms"}}]},
+                {"profile": [{"down": {"start": "50ms", "end": "60ms"}}]}],
+      "streams": {"count": 200, "interval": "1ms", "packetLength": "1200B", "stagger": true},
+      "merger": {"bufferSize": 5, "enableReordering": true},
+      "sim-time-limit": "100ms"
+    }
+
+`paths` may also be a number (all at 0 ms). Profiles use the segment syntax
+of scenario_compiler.py specs. Streams k = 1..N are UDP flows to ports
+1000+k-1; member stream `s<k><path letter>` is carried on VLAN (k-1)·P + p,
+so N·P must stay below 4095. With `stagger` the streams start spread over
+one interval instead of all at t=0.
+
+Output in `simulations/`: `<name>.ned` (network FRER_<name>), `<name>.ini`
+(`[Config <name>]` on top of omnetpp.ini with stream identification,
+splitter, VLAN encoder/decoder, macTable and vlanIdFilter entries) and
+`<name>.xml` (per-path delay scenario).
+
+Analysis (--analyze <vec>): the merger records seqNum/linkDelay for all
+streams in one vector, so per-stream metrics come from the per-stream sinks
+(received vs. expected packets → loss/excess duplicates, inter-arrival
+jitter; packets still in flight at sim-time-limit are not expected) and
+per-path metrics from linkDelay, whose copies are attributed to a path by
+matching their delay to the path profiles (copies share their send time,
+which identifies the packet; the earliest copy "wins").
+
+EX: `python3 topology.py paths4.json` then `./FRER -u Cmdenv -c paths4 paths4.ini`
+    `python3 topology.py paths4.json --analyze ../simulations/results/paths4-#0.vec`
+"""
+import argparse
+import json
+import os
+import string
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import scenario_compiler
+from merger_model import SINK_DELAY
+from replicate import interval_metrics
+from stream_metrics import parse_seconds
+from sweep import INI_PATH, MERGER, SIM_DIR
+from vec_reader import read_run
+
+MAX_VLAN  = 4094
+BASE_PORT = 1000
+MERGER_KEYS = ("jitter", "bufferSize", "timerInterval", "enableReordering", "periodicEmission",
+               "dynamicBuffersize", "senderTransmissionInterval", "startSequence")
+
+
+# ───── LAYOUT ───────────────────────────────────────────────────────────────
+def layout(spec: dict) -> dict:
+    """Streams, paths and VLAN ids of a spec (the single source for generator and analysis)."""
+    paths = spec["paths"]
+    if isinstance(paths, int):
+        paths = [{} for _ in range(paths)]
+    if not 1 <= len(paths) <= len(string.ascii_lowercase):
+        raise ValueError(f"need 1..{len(string.ascii_lowercase)} paths, got {len(paths)}")
+    streams = spec.get("streams", {})
+    count = int(streams.get("count", 1))
+    interval = parse_seconds(streams.get("interval", "1ms"))
+    if count * len(paths) > MAX_VLAN:
+        raise ValueError(f"{count} streams × {len(paths)} paths need more than {MAX_VLAN} VLAN ids")
+    stagger = streams.get("stagger", True)
+    return {
+        "name": spec["name"],
+        "network": f"FRER_{spec['name']}",
+        "sim_time_limit": parse_seconds(spec.get("sim-time-limit", "100ms")),
+        "interval": interval,
+        "packet_length": streams.get("packetLength", "1200B"),
+        "paths": [{"letter": string.ascii_lowercase[p], "gate": p + 1,
+                   "delay": parse_seconds(path.get("delay", "0ms")), "profile": path.get("profile", [])}
+                  for p, path in enumerate(paths)],
+        "streams": [{"name": f"s{k + 1}", "port": BASE_PORT + k, "vlan": k + 1,
+                     "offset": (k * interval / count) if stagger else 0.0}
+                    for k in range(count)],
+        "merger": spec.get("merger", {}),
+    }
+
+
+def member_vlan(lay: dict, k: int, p: int) -> int:
+    return k * len(lay["paths"]) + p + 1
+
+
+def path_profiles(lay: dict) -> dict:
+    """{s1.ethg[p]: (times_s, delays_s)} from the static delays and profile segments."""
+    spec = {"links": {f"s1.ethg[{path['gate']}]": [{"step": {"at": "0s", "delay": f"{path['delay']}s"}}]
+                      + path["profile"] for path in lay["paths"]}}
+    return scenario_compiler.profile_from_spec(spec)
+
+
+# ───── GENERATOR ────────────────────────────────────────────────────────────
+def write_ned(lay: dict, path: Path):
+    n_paths = len(lay["paths"])
+    links = "\n".join(
+        f"        s1.ethg[{p['gate']}] <--> EthernetLink {{ delay = {scenario_compiler._fmt(p['delay'])}; }} "
+        f"<--> s2.ethg[{p['gate']}];" for p in lay["paths"])
+    path.write_text(f"""// generated by topology.py, do not edit
+package frer.simulations;
+
+import inet.common.scenario.ScenarioManager;
+import inet.networks.base.TsnNetworkBase;
+import inet.node.ethernet.EthernetLink;
+import inet.node.tsn.TsnDevice;
+
+network {lay['network']} extends TsnNetworkBase
+{{
+    submodules:
+        scenarioManager: ScenarioManager {{
+            @display("p=100,800;is=s");
+        }}
+        source: TsnDevice {{
+            @display("p=300,200");
+            numEthInterfaces = 1;
+        }}
+        s1: LocalTsnSwitch {{
+            @display("p=431,199");
+            numEthInterfaces = {n_paths + 1};
+        }}
+        s2: LocalTsnSwitch {{
+            @display("p=678,199");
+            numEthInterfaces = {n_paths + 1};
+        }}
+        destination: TsnDevice {{
+            @display("p=880,200");
+            numEthInterfaces = 1;
+        }}
+    connections allowunconnected:
+        source.ethg[0] <--> EthernetLink <--> s1.ethg[0];
+        s2.ethg[0] <--> EthernetLink <--> destination.ethg[0];
+{links}
+}}
+""")
+
+
+def _ini_list(key: str, items: list, brackets: str = "[]") -> list:
+    """`key = [item, ...]` with one item per continuation line."""
+    open_, close = brackets
+    if not items:
+        return [f"{key} = {open_}{close}"]
+    body = [f"    {item}," for item in items]
+    body[-1] = body[-1][:-1] + close
+    return [f"{key} = {open_}"] + body
+
+
+def ini_lines(lay: dict, xml_name: str, base_ini: Path = INI_PATH, out_dir: Path = None) -> list:
+    """
+    Lines of `<name>.ini`. The base ini is included by a relative path when
+    the file is written next to it (out_dir), so the tree can move.
+    """
+    streams, paths = lay["streams"], lay["paths"]
+    fmt = scenario_compiler._fmt
+    include = base_ini.resolve()
+    if out_dir is not None and include.parent == out_dir.resolve():
+        include = os.path.relpath(include, out_dir.resolve())
+    lines = [
+        "# generated by topology.py, do not edit",
+        f"include {include}",
+        "",
+        f"[Config {lay['name']}]",
+        f"network = {lay['network']}",
+        f"sim-time-limit = {fmt(lay['sim_time_limit'])}",
+        f'*.scenarioManager.script = xmldoc("{xml_name}")',
+        "",
+        "# one UDP source/sink application per stream",
+        f"*.source.numApps = {len(streams)}",
+        '*.source.app[*].typename = "UdpSourceApp"',
+        '*.source.app[*].io.destAddress = "destination"',
+        f"*.source.app[*].source.packetLength = {lay['packet_length']}",
+        f"*.source.app[*].source.productionInterval = {fmt(lay['interval'])}",
+        f"*.destination.numApps = {len(streams)}",
+        '*.destination.app[*].typename = "UdpSinkApp"',
+    ]
+    for k, s in enumerate(streams):
+        lines += [f"*.source.app[{k}].io.destPort = {s['port']}",
+                  f"*.source.app[{k}].source.initialProductionOffset = {fmt(s['offset'])}",
+                  f"*.destination.app[{k}].io.localPort = {s['port']}"]
+    members = [(k, p) for k in range(len(streams)) for p in range(len(paths))]
+    name = lambda k, p: f"{streams[k]['name']}{paths[p]['letter']}"
+    lines += [""]
+    lines += _ini_list("*.source.bridging.streamIdentifier.identifier.mapping",
+                       [f'{{packetFilter: expr(udp.destPort == {s["port"]}), stream: "{s["name"]}", '
+                        f'sequenceNumbering: true}}' for s in streams])
+    lines += _ini_list("*.source.bridging.streamCoder.encoder.mapping",
+                       [f'{{stream: "{s["name"]}", vlan: {s["vlan"]}}}' for s in streams])
+    lines += ["", f"*.s1.ieee8021q.qTagHeaderChecker.vlanIdFilter = [{', '.join(str(s['vlan']) for s in streams)}]"]
+    lines += _ini_list("*.s1.bridging.streamCoder.decoder.mapping",
+                       [f'{{interface: "eth0", vlan: {s["vlan"]}, stream: "{s["name"]}"}}' for s in streams])
+    lines += _ini_list("*.s1.bridging.streamRelay.splitter.mapping",
+                       [f'{s["name"]}: [{", ".join(chr(34) + name(k, p) + chr(34) for p in range(len(paths)))}]'
+                        for k, s in enumerate(streams)], "{}")
+    lines += _ini_list("*.s1.bridging.streamCoder.encoder.mapping",
+                       [f'{{stream: "{name(k, p)}", vlan: {member_vlan(lay, k, p)}}}' for k, p in members])
+    lines += _ini_list("*.s1.macTable.forwardingTable",
+                       [f'{{address: "destination", vlan: {member_vlan(lay, k, p)}, '
+                        f'interface: "eth{paths[p]["gate"]}"}}' for k, p in members])
+    lines += ["", f"*.s2.ieee8021q.qTagHeaderChecker.vlanIdFilter = "
+                  f"[{', '.join(str(member_vlan(lay, k, p)) for k, p in members)}]"]
+    lines += _ini_list("*.s2.bridging.streamCoder.decoder.mapping",
+                       [f'{{interface: "eth{paths[p]["gate"]}", vlan: {member_vlan(lay, k, p)}, '
+                        f'stream: "{name(k, p)}"}}' for k, p in members])
+    lines += _ini_list("*.s2.macTable.forwardingTable",
+                       [f'{{address: "destination", vlan: {member_vlan(lay, k, p)}, interface: "eth0"}}'
+                        for k, p in members])
+    # every member of stream k is merged back into s<k> (sequence recovery per stream)
+    lines += _ini_list(f"{MERGER}.mapping",
+                       [f'{name(k, p)}: "{streams[k]["name"]}"' for k, p in members], "{}")
+    if lay["merger"]:
+        value = lambda v: str(v).lower() if isinstance(v, bool) else v
+        lines += [""] + [f"{MERGER}.{key} = {value(v)}" if key in MERGER_KEYS else f"{key} = {value(v)}"
+                         for key, v in lay["merger"].items()]
+    return lines
+
+
+def generate(spec: dict, out_dir: Path = SIM_DIR, base_ini: Path = INI_PATH) -> dict:
+    """Write <name>.ned, <name>.ini and <name>.xml; returns the layout."""
+    lay = layout(spec)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    write_ned(lay, out_dir / f"{lay['name']}.ned")
+    scenario_compiler.write_scenario(path_profiles(lay), out_dir / f"{lay['name']}.xml")
+    (out_dir / f"{lay['name']}.ini").write_text(
+        "\n".join(ini_lines(lay, f"{lay['name']}.xml", base_ini, out_dir)) + "\n")
+    return lay
+
+
+# ───── ANALYSIS ─────────────────────────────────────────────────────────────
+def expected_arrivals(lay: dict, offset: float, profiles: dict = None) -> int:
+    """
+    Packets of a stream starting at offset that reach its sink before
+    sim-time-limit over the fastest path alive at their send time; packets
+    still on the wire when the run stops are not counted.
+    """
+    send, delays = scenario_compiler.packet_delays(profiles or path_profiles(lay), lay["interval"],
+                                                   lay["sim_time_limit"], offset)
+    arrive = send + np.min(np.vstack(list(delays.values())), axis=0) + SINK_DELAY
+    return int((arrive <= lay["sim_time_limit"]).sum())
+
+
+def stream_stats(lay: dict, vectors: dict) -> pd.DataFrame:
+    """
+    Per stream: sent, expected (sent and due at the sink before the limit),
+    received, loss/excess (%) against expected, inter-arrival IQR/P95/P99/σ from its sink.
+    """
+    rows = []
+    limit, interval = lay["sim_time_limit"], lay["interval"]
+    profiles = path_profiles(lay)
+    for k, s in enumerate(lay["streams"]):
+        t_s = next((t for (module, name), (t, _) in vectors.items()
+                    if name == "packetJitter:vector" and module.endswith(f".destination.app[{k}].sink")), None)
+        sent = max(int(np.ceil((limit - s["offset"]) / interval - 1e-9)), 0)
+        expected = expected_arrivals(lay, s["offset"], profiles)
+        received = len(t_s) if t_s is not None else 0
+        diff = (received - expected) / expected * 100 if expected else np.nan
+        rows.append({"stream": s["name"], "port": s["port"], "sent": sent, "expected": expected,
+                     "received": received,
+                     "loss_pct": -diff if diff < 0 else 0.0, "excess_pct": diff if diff > 0 else 0.0,
+                     **interval_metrics(np.diff(t_s * 1e3) if t_s is not None else np.empty(0))})
+    return pd.DataFrame(rows)
+
+
+def path_stats(lay: dict, t_s: np.ndarray, delay_ms: np.ndarray) -> pd.DataFrame:
+    """Per path: copies, mean/max delay and how often its copy arrived first (from linkDelay)."""
+    profiles = path_profiles(lay)
+    delay_s = delay_ms * 1e-3
+    sent = t_s - delay_s
+    match = np.zeros((len(t_s), len(lay["paths"])), dtype=bool)
+    for slack in (-1e-9, 1e-9):       # a copy sent right at a delay change may round to either side
+        expected = np.column_stack([scenario_compiler.delay_at(profiles[f"s1.ethg[{p['gate']}]"], sent + slack)
+                                    for p in lay["paths"]])
+        match |= np.isclose(expected, delay_s[:, None], rtol=0, atol=1e-9)
+    # copies of one packet share its send time; the earliest one wins
+    key = np.rint(sent * 1e9).astype(np.int64)
+    order = np.lexsort((t_s, key))
+    first = np.zeros(len(t_s), dtype=bool)
+    first[order[np.r_[True, key[order][1:] != key[order][:-1]]]] = True
+    # copies of a packet with the same delay match the same paths: hand them out in path order
+    same = np.lexsort((t_s, np.rint(delay_s * 1e9).astype(np.int64), key))
+    group = np.r_[True, (key[same][1:] != key[same][:-1]) | ~np.isclose(delay_s[same][1:], delay_s[same][:-1])]
+    starts = np.flatnonzero(group)
+    rank = np.empty(len(t_s), dtype=np.int64)
+    rank[same] = np.arange(len(same)) - np.repeat(starts, np.diff(np.r_[starts, len(same)]))
+    nth = np.cumsum(match, axis=1) > rank[:, None]
+    path_of = np.where(nth.any(axis=1), nth.argmax(axis=1), -1)
+    ambiguous = match.sum(axis=1) > 1
+    rows = []
+    for p, path in enumerate(lay["paths"]):
+        mine = path_of == p
+        d = delay_ms[mine]
+        rows.append({"path": path["letter"], "gate": f"s1.ethg[{path['gate']}]", "copies": int(mine.sum()),
+                     "mean_delay_ms": d.mean() if len(d) else np.nan, "max_delay_ms": d.max() if len(d) else np.nan,
+                     "first_pct": first[mine].sum() / max(first.sum(), 1) * 100,
+                     "tied_copies": int((mine & ambiguous).sum())})
+    rows.append({"path": "?", "gate": "unmatched", "copies": int((path_of < 0).sum())})
+    return pd.DataFrame(rows)
+
+
+def analyze(lay: dict, vec_file: Path) -> tuple:
+    """(per-stream, per-path) DataFrames of one run of a generated network."""
+    _, vectors = read_run(vec_file, ["packetJitter:vector", "linkDelay:vector"])
+    delays = [v for (module, name), v in vectors.items() if name == "linkDelay:vector"]
+    t_s, delay_ms = delays[0] if delays else (np.empty(0), np.empty(0))
+    return stream_stats(lay, vectors), path_stats(lay, t_s, delay_ms)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate many-path/many-stream FRER networks and analyze their runs")
+    parser.add_argument("spec", type=Path, help="JSON network spec")
+    parser.add_argument("--out", type=Path, default=SIM_DIR, help="Folder for the .ned/.ini/.xml files")
+    parser.add_argument("--analyze", type=Path, default=None, metavar="VEC",
+                        help="Aggregate a .vec of this network per stream and per path instead of generating")
+    parser.add_argument("--csv", type=Path, default=None,
+                        help="With --analyze: write <name>_streams.csv and <name>_paths.csv to this folder")
+    args = parser.parse_args()
+
+    try:
+        spec = json.loads(args.spec.read_text())
+        if args.analyze is None:
+            lay = generate(spec, args.out)
+            print(f"✔ {lay['network']}: {len(lay['streams'])} streams × {len(lay['paths'])} paths "
+                  f"→ {args.out / (lay['name'] + '.ned')}, .ini, .xml")
+            print(f"  run: ./FRER -u Cmdenv -c {lay['name']} {lay['name']}.ini")
+            return
+        lay = layout(spec)
+        streams, paths = analyze(lay, args.analyze)
+    except (ValueError, KeyError, OSError) as e:
+        print(f"✖ {e}", file=sys.stderr)
+        sys.exit(1)
+    print(streams.describe().loc[["mean", "min", "max"]].round(3).to_string())
+    print()
+    print(paths.round(3).to_string(index=False))
+    if args.csv:
+        args.csv.mkdir(parents=True, exist_ok=True)
+        streams.to_csv(args.csv / f"{lay['name']}_streams.csv", index=False)
+        paths.to_csv(args.csv / f"{lay['name']}_paths.csv", index=False)
+        print(f"✔ Wrote {lay['name']}_streams.csv and {lay['name']}_paths.csv → {args.csv}")
+
+
+if __name__ == "__main__":
+    main()
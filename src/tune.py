@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Adaptive search over the merger parameters (successive halving).
+
+Instead of running the full grid at full length, a random sample of
+candidates from the --param grid is run with a short sim-time-limit; only
+the best 1/eta of them advance to the next (longer) budget, until the last
+budget equals the full run. Candidates are ranked by a user objective:
+
+    --minimize dup --constraint "ooo<=5"              fewest duplicates with OoO ≤ 5 %
+    --minimize residence_p99 --constraint "dup==0"    least added latency without duplicates
+
+Metrics: ooo, dup (%), residence_mean/p99/max (s, time a packet spends in
+the merger = latency added by sorting/shaping), hl_max, buf_max. Infeasible
+candidates rank after feasible ones, by total constraint violation.
+
+Backends: `sim` runs FRER through sweep.run_point (overlay ini + CSV export,
+linkDelay included); `model` runs merger_model.py on recorded or scenario
+arrivals, which is fast enough to tune before spending simulator time.
+
+EX: `python3 tune.py --param jitter=0..10ms --param bufferSize=2..20 --param timerInterval=1..20ms
+        --minimize dup --constraint "ooo<=5" --budgets 25ms,50ms,100ms --backend model`
+"""
+import argparse
+import csv
+import os
+import random
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+import run_cache
+import scenario_compiler
+from latency import first_delivery, residence_time
+from merger_model import MergerConfig, arrivals_from_linkdelay, simulate
+from result_cache import cached_vector
+from run_sim import build_frer, simulation_args
+from stream_metrics import StreamingRatios, parse_seconds
+from sweep import INI_PATH, SCRIPT_DIR, SWEEPS_DIR, expand_grid, parse_grid, run_name, run_point
+
+METRICS = ("ooo", "dup", "residence_mean", "residence_p99", "residence_max", "hl_max", "buf_max")
+_CONSTRAINT = re.compile(r"^\s*(\w+)\s*(<=|>=|==)\s*([-+\d.eE]+)\s*$")
+
+
+def parse_constraint(text: str) -> tuple:
+    """`ooo<=5` → ("ooo", "<=", 5.0)."""
+    m = _CONSTRAINT.match(text)
+    if not m or m.group(1) not in METRICS:
+        raise ValueError(f"Invalid constraint {text!r} (metric op value, metrics: {', '.join(METRICS)})")
+    return m.group(1), m.group(2), float(m.group(3))
+
+
+def violation(metrics: dict, constraints: list) -> float:
+    """Total amount by which metrics violate the constraints (0 = feasible)."""
+    total = 0.0
+    for name, op, bound in constraints:
+        v = metrics[name]
+        if np.isnan(v):
+            return np.inf
+        if op == "<=":
+            total += max(0.0, v - bound)
+        elif op == ">=":
+            total += max(0.0, bound - v)
+        else:
+            total += abs(v - bound)
+    return total
+
+
+def compute_metrics(seq_t: np.ndarray, seq: np.ndarray, arrivals: tuple,
+                    hl: np.ndarray = None, buf: np.ndarray = None) -> dict:
+    """Objective metrics of one run from its seqNum vector and merger arrivals."""
+    m = StreamingRatios()
+    m.update(seq)
+    ooo, dup = m.ratios()
+    seq_u, delivered = first_delivery(seq_t, seq)
+    res = residence_time({"seq": seq_u, "delivered": delivered}, arrivals)
+    res = res[~np.isnan(res)]
+    stats = (float(res.mean()), float(np.percentile(res, 99)), float(res.max())) if len(res) else (np.nan,) * 3
+    return {"ooo": ooo, "dup": dup,
+            "residence_mean": stats[0], "residence_p99": stats[1], "residence_max": stats[2],
+            "hl_max": float(hl.max()) if hl is not None and len(hl) else np.nan,
+            "buf_max": float(buf.max()) if buf is not None and len(buf) else 0.0}
+
+
+def evaluate_model(point: dict, budget: float, arrivals: tuple) -> dict:
+    """Metrics of one candidate on the merger model, cut at sim-time-limit = budget."""
+    vectors = simulate(arrivals, MergerConfig.from_ini(point), budget)
+    seq_t, seq = vectors["seqNum:vector"]
+    return compute_metrics(seq_t, seq.astype(np.int64), arrivals,
+                           vectors["historyLength:vector"][1], vectors["reorderBuffLength:vector"][1])
+
+
+def evaluate_sim(point: dict, budget: float, frer_exe: Path, sim_args: dict, run_dir: Path,
+                 base_ini: Path = INI_PATH) -> dict:
+    """Metrics of one candidate from a FRER run with sim-time-limit = budget."""
+    config = run_dir.name
+    row = run_point(frer_exe, sim_args, run_dir, config, {**point, "sim-time-limit": f"{budget}s"},
+                    export=True, base_ini=base_ini)
+    if row["status"] != "ok":
+        raise RuntimeError(f"{config}: {row['status']}")
+    interval = MergerConfig.from_ini(point).senderTransmissionInterval
+    arrivals = arrivals_from_linkdelay(run_dir / f"{config}_linkDelay.csv", interval=interval)
+    seq_t, seq = cached_vector(run_dir / f"{config}_seqNum.csv", "seqNum:vector")
+    _, hl = cached_vector(run_dir / f"{config}_historyLength.csv", "historyLength:vector")
+    _, buf = cached_vector(run_dir / f"{config}_reorderBuffLength.csv", "reorderBuffLength:vector")
+    return compute_metrics(seq_t, seq.astype(np.int64), arrivals, hl, buf)
+
+
+def successive_halving(points: list, budgets: list, evaluate, objective: str, constraints: list,
+                       eta: int = 3, workers: int = None) -> list:
+    """
+    Run successive halving over points. evaluate(point, budget, rung) returns
+    the (function, *args) tuple that computes the metrics in a worker process.
+    Returns every evaluation row; rows of each rung are sorted best first.
+    """
+    rows, alive = [], list(points)
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        for rung, budget in enumerate(budgets):
+            futures = [pool.submit(*evaluate(p, budget, rung)) for p in alive]
+            rung_rows = []
+            for point, fut in zip(alive, futures):
+                row = {"rung": rung, "budget_s": budget, "name": run_name(point), **point}
+                try:
+                    row.update(fut.result())
+                    row["violation"] = violation(row, constraints)
+                    row["objective"] = row[objective]
+                except (RuntimeError, FileNotFoundError, KeyError) as e:
+                    row.update({"violation": np.inf, "objective": np.nan, "error": str(e)})
+                rung_rows.append(row)
+            rung_rows.sort(key=lambda r: (r["violation"], np.inf if np.isnan(r["objective"]) else r["objective"]))
+            rows += rung_rows
+            best = rung_rows[0]
+            print(f"✔ rung {rung}: {len(alive)} candidates at {budget * 1e3:g} ms, best {best['name']} "
+                  f"({objective} = {best['objective']:.6g}, violation {best['violation']:.3g})")
+            if rung < len(budgets) - 1:
+                keep = max(1, len(rung_rows) // eta)
+                by_name = {run_name(p): p for p in alive}
+                alive = [by_name[r["name"]] for r in rung_rows[:keep]]
+    return rows
+
+
+def sample_points(grid: dict, n: int, seed: int = 0) -> list:
+    """n distinct random points of the grid (all of them if the grid is smaller)."""
+    points = expand_grid(grid)
+    if n >= len(points):
+        return points
+    return random.Random(seed).sample(points, n)
+
+
+def tune(points: list, budgets: list, objective: str, constraints: list, out_dir: Path,
+         backend: str = "model", arrivals: tuple = None, eta: int = 3, workers: int = None,
+         build: bool = True, base_ini: Path = INI_PATH) -> list:
+    """Successive halving on the chosen backend; writes all evaluations to out_dir/tune.csv."""
+    if backend == "sim":
+        frer_exe = run_cache.build_if_needed(build_frer, SCRIPT_DIR) if build else SCRIPT_DIR / "FRER"
+        sim_args = simulation_args(SCRIPT_DIR)
+        evaluate = lambda p, budget, rung: (evaluate_sim, p, budget, frer_exe, sim_args,
+                                            out_dir / f"rung{rung}" / run_name(p), base_ini)
+    else:
+        evaluate = lambda p, budget, rung: (evaluate_model, p, budget, arrivals)
+    rows = successive_halving(points, budgets, evaluate, objective, constraints, eta, workers)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    with (out_dir / "tune.csv").open("w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(dict.fromkeys(k for r in rows for k in r)))
+        writer.writeheader()
+        writer.writerows(rows)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Successive-halving search over merger parameters")
+    parser.add_argument("--param", action="append", default=[], metavar="NAME=VALUES",
+                        help="Search space, same syntax as sweep.py (e.g. bufferSize=2..20)")
+    parser.add_argument("--minimize", type=str, default="dup", choices=METRICS)
+    parser.add_argument("--constraint", action="append", default=[], metavar="METRIC<=VALUE",
+                        help="e.g. ooo<=5 or dup==0 (repeatable)")
+    parser.add_argument("--budgets", type=str, default="25ms,50ms,100ms",
+                        help="Increasing sim-time-limits per rung; the last one is the full run")
+    parser.add_argument("--candidates", type=int, default=27, help="Random candidates in the first rung")
+    parser.add_argument("--eta", type=int, default=3, help="Keep the best 1/eta per rung")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for sampling candidates")
+    parser.add_argument("--backend", choices=("model", "sim"), default="model")
+    parser.add_argument("--arrivals", type=Path,
+                        default=SCRIPT_DIR.parent / "simulations" / "results" / "baseline_linkDelay.csv",
+                        help="linkDelay recording with the merger arrivals (model backend)")
+    parser.add_argument("--scenario", type=Path, default=None,
+                        help="Scenario XML to derive the arrivals from instead (model backend)")
+    parser.add_argument("--name", type=str, default="tune", help="Results go to results/sweeps/<name>/")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--no-build", action="store_true", help="Use the existing FRER binary (sim backend)")
+    args = parser.parse_args()
+
+    try:
+        constraints = [parse_constraint(c) for c in args.constraint]
+        budgets = sorted(parse_seconds(b.strip()) for b in args.budgets.split(",") if b.strip())
+        points = sample_points(parse_grid(args.param), args.candidates, args.seed)
+        arrivals = None
+        if args.backend == "model":
+            if args.scenario:
+                profile = scenario_compiler.parse_scenario(args.scenario)
+                interval = MergerConfig().senderTransmissionInterval
+                arrivals = scenario_compiler.arrivals(profile, interval, budgets[-1])
+            else:
+                arrivals = arrivals_from_linkdelay(args.arrivals)
+        out_dir = SWEEPS_DIR / args.name
+        rows = tune(points, budgets, args.minimize, constraints, out_dir, args.backend, arrivals,
+                    args.eta, args.workers, build=not args.no_build)
+    except (ValueError, RuntimeError) as e:
+        print(f"✖ {e}", file=sys.stderr)
+        sys.exit(1)
+
+    final = [r for r in rows if r["rung"] == len(budgets) - 1]
+    best = final[0]
+    if best["violation"] > 0:
+        print(f"✖ No candidate satisfies the constraints; closest: {best['name']}")
+    params = ", ".join(f"{k}={best[k]}" for k in points[0])
+    print(f"✔ Best: {params}")
+    print("  " + "  ".join(f"{m}={best[m]:.4g}" for m in METRICS if m in best))
+    print(f"✔ {len(rows)} evaluations → {out_dir / 'tune.csv'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""
+Native reader for OMNeT++ result vectors (.vec, with optional .vci index).
+
+Reads the text vector format directly into NumPy arrays, so plotting and
+analysis do not need the `opp_scavetool export` → CSV → pandas round-trip.
+Data lines are parsed in large chunks with NumPy's C float parser; when a
+.vci index sits next to the .vec only the blocks of the requested vector are
+read (seek + read), otherwise the file is streamed once.
+
+EX: `t_s, values = read_vector(results / "General-#0.vec", "seqNum:vector")`
+"""
+import argparse
+import re
+import shlex
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+CHUNK_BYTES = 8 << 20          # bytes parsed per step when streaming a .vec
+
+# non-data lines (version/run/attr/param/config/itervar/vector/file …) start with a letter
+_DECL_LINE = re.compile(rb"^[A-Za-z][^\n]*\n?", re.M)
+
+
+@dataclass
+class VectorDecl:
+    """One `vector` declaration of a .vec/.vci file."""
+    id: int
+    module: str
+    name: str
+    columns: str = "ETV"
+    attrs: dict = field(default_factory=dict)
+    blocks: list = field(default_factory=list)   # (offset, length, first_t, last_t, count) from .vci
+
+    @property
+    def ncols(self) -> int:
+        return 1 + len(self.columns)   # vector id + declared columns
+
+
+@dataclass
+class VecHeader:
+    """Run attributes, config entries and vector declarations of a result file."""
+    run: str = ""
+    attrs: dict = field(default_factory=dict)
+    config: dict = field(default_factory=dict)
+    vectors: dict = field(default_factory=dict)   # id -> VectorDecl
+
+
+def _parse_decl_lines(lines, header: VecHeader, last: list):
+    """Fold declaration/attribute lines into header; last[0] is the vector attrs attach to."""
+    for raw in lines:
+        line = raw.decode("utf-8", errors="replace").strip()
+        if not line:
+            continue
+        kind, _, rest = line.partition(" ")
+        if kind == "vector":
+            parts = shlex.split(rest)
+            decl = VectorDecl(int(parts[0]), parts[1], parts[2],
+                              parts[3] if len(parts) > 3 else "TV")
+            header.vectors[decl.id] = decl
+            last[0] = decl
+        elif kind == "attr":
+            key, _, value = rest.partition(" ")
+            value = value.strip().strip('"')
+            if last[0] is not None:
+                last[0].attrs[key] = value
+            else:
+                header.attrs[key] = value
+        elif kind in ("config", "param", "itervar"):
+            parts = shlex.split(rest) if '"' in rest else rest.split(" ", 1)
+            if len(parts) == 2:
+                header.config[parts[0]] = parts[1]
+        elif kind == "run":
+            header.run = rest.strip()
+            last[0] = None
+
+
+def _iter_raw_chunks(f, chunk_bytes: int = CHUNK_BYTES):
+    """Yield chunks of f that always end on a line boundary."""
+    tail = b""
+    while True:
+        block = f.read(chunk_bytes)
+        if not block:
+            if tail:
+                yield tail
+            return
+        block = tail + block
+        cut = block.rfind(b"\n") + 1
+        if cut == 0:
+            tail = block
+            continue
+        tail = block[cut:]
+        yield block[:cut]
+
+
+def _parse_data(chunk: bytes, header: VecHeader) -> dict:
+    """
+    Parse the data lines of chunk into {vector id: (times, values)}.
+    Uses a single vectorized parse when all vectors share a column layout.
+    """
+    if not chunk.strip():
+        return {}
+    widths = {d.ncols for d in header.vectors.values()}
+    if len(widths) == 1:
+        ncols = widths.pop()
+        flat = np.fromstring(chunk.decode("ascii"), sep=" ")
+        if flat.size % ncols == 0:
+            rows = flat.reshape(-1, ncols)
+            ids = rows[:, 0].astype(np.int64)
+            out = {}
+            for vid in np.unique(ids):
+                sel = rows[ids == vid]
+                out[int(vid)] = (sel[:, -2], sel[:, -1])
+            return out
+    # mixed column layouts (e.g. some vectors without event numbers): per-line fallback
+    per_id = {}
+    for line in chunk.split(b"\n"):
+        parts = line.split()
+        if parts:
+            per_id.setdefault(int(parts[0]), []).append((float(parts[-2]), float(parts[-1])))
+    return {vid: (np.array([r[0] for r in rs]), np.array([r[1] for r in rs]))
+            for vid, rs in per_id.items()}
+
+
+def index_path(vec_path: Path) -> Path:
+    return Path(vec_path).with_suffix(".vci")
+
+
+def read_index(vci_path: Path) -> VecHeader:
+    """Parse a .vci index: run attributes, declarations and per-vector block offsets."""
+    header, last = VecHeader(), [None]
+    with open(vci_path, "rb") as f:
+        for raw in f:
+            if raw[:1].isdigit():
+                p = raw.split()
+                decl = header.vectors[int(p[0])]
+                # id offset length [firstEv lastEv] firstT lastT count min max sum sqrsum
+                decl.blocks.append((int(p[1]), int(p[2]), float(p[-7]), float(p[-6]), int(p[-5])))
+            else:
+                _parse_decl_lines([raw], header, last)
+    return header
+
+
+def read_header(vec_path: Path) -> VecHeader:
+    """
+    Header of a .vec file. Uses the .vci index when present, otherwise scans
+    the .vec for declaration lines (declarations may be interleaved with data).
+    """
+    vci = index_path(vec_path)
+    if vci.exists():
+        return read_index(vci)
+    header, last = VecHeader(), [None]
+    with open(vec_path, "rb") as f:
+        for chunk in _iter_raw_chunks(f):
+            _parse_decl_lines(_DECL_LINE.findall(chunk), header, last)
+    return header
+
+
+def select(header: VecHeader, name: str, module: str = None) -> VectorDecl:
+    """Find the vector called name (optionally restricted to module)."""
+    for decl in header.vectors.values():
+        if decl.name == name and (module is None or decl.module == module):
+            return decl
+    where = f" in module {module}" if module else ""
+    raise KeyError(f"Vector {name!r}{where} not found")
+
+
+def iter_vectors(vec_path: Path, chunk_bytes: int = CHUNK_BYTES):
+    """
+    Stream a whole .vec once, yielding (header, {vector id: (times, values)})
+    per chunk. The header grows as declarations are encountered.
+    """
+    header, last = VecHeader(), [None]
+    with open(vec_path, "rb") as f:
+        for chunk in _iter_raw_chunks(f, chunk_bytes):
+            decls = _DECL_LINE.findall(chunk)
+            if decls:
+                _parse_decl_lines(decls, header, last)
+                chunk = _DECL_LINE.sub(b"", chunk)
+            yield header, _parse_data(chunk, header)
+
+
+def iter_vector(vec_path: Path, name: str, module: str = None, chunk_bytes: int = CHUNK_BYTES,
+                t_range: tuple = None):
+    """
+    Yield (times_s, values) chunks of one vector in file order.
+    With a .vci index only that vector's blocks are read; t_range=(t0, t1)
+    additionally skips blocks entirely outside the time window.
+    """
+    vci = index_path(vec_path)
+    if vci.exists():
+        header = read_index(vci)
+        decl = select(header, name, module)
+        with open(vec_path, "rb") as f:
+            for offset, length, first_t, last_t, _ in decl.blocks:
+                if t_range and (last_t < t_range[0] or first_t > t_range[1]):
+                    continue
+                f.seek(offset)
+                data = _parse_data(f.read(length), header).get(decl.id)
+                if data is not None:
+                    yield _clip(data, t_range)
+        return
+    vid = None
+    for header, data in iter_vectors(vec_path, chunk_bytes):
+        if vid is None:
+            try:
+                vid = select(header, name, module).id
+            except KeyError:
+                continue
+        if vid in data:
+            yield _clip(data[vid], t_range)
+    if vid is None:
+        raise KeyError(f"Vector {name!r} not found in {vec_path}")
+
+
+class VecTail:
+    """
+    Incremental reader for a .vec that is still being written by a running
+    simulation: every poll() parses the complete lines appended since the
+    previous call. OMNeT++ writes vector data in buffered blocks, so samples
+    show up with some delay.
+    """
+
+    def __init__(self, vec_path: Path):
+        self.path = Path(vec_path)
+        self.offset = 0
+        self.header = VecHeader()
+        self._last = [None]
+
+    def poll(self) -> dict:
+        """New samples as {vector id: (times, values)} ({} if nothing complete was added)."""
+        try:
+            size = self.path.stat().st_size
+        except FileNotFoundError:
+            return {}
+        if size < self.offset:                  # file was recreated: start over
+            self.__init__(self.path)
+        if size == self.offset:
+            return {}
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            block = f.read(size - self.offset)
+        cut = block.rfind(b"\n") + 1
+        if cut == 0:
+            return {}
+        self.offset += cut
+        chunk = block[:cut]
+        decls = _DECL_LINE.findall(chunk)
+        if decls:
+            _parse_decl_lines(decls, self.header, self._last)
+            chunk = _DECL_LINE.sub(b"", chunk)
+        return _parse_data(chunk, self.header)
+
+
+def _clip(data: tuple, t_range: tuple = None) -> tuple:
+    if not t_range:
+        return data
+    t, v = data
+    keep = (t >= t_range[0]) & (t <= t_range[1])
+    return t[keep], v[keep]
+
+
+def _concat(chunks) -> tuple:
+    chunks = list(chunks)
+    if not chunks:
+        return np.empty(0), np.empty(0)
+    return (np.concatenate([c[0] for c in chunks]),
+            np.concatenate([c[1] for c in chunks]))
+
+
+def read_vector(vec_path: Path, name: str, module: str = None, t_range: tuple = None):
+    """Read one vector of a .vec file and return (times_s, values) as NumPy arrays."""
+    return _concat(iter_vector(vec_path, name, module, t_range=t_range))
+
+
+def read_run(vec_path: Path, names: list = None) -> tuple:
+    """
+    Read several vectors and the run header in a single pass over the .vec file.
+    Returns (header, {(module, name): (times_s, values)}); names=None reads every vector.
+    """
+    parts, header = {}, VecHeader()
+    for header, data in iter_vectors(vec_path):
+        for vid, chunk in data.items():
+            if names is None or header.vectors[vid].name in names:
+                parts.setdefault(vid, []).append(chunk)
+    out = {}
+    for vid, decl in header.vectors.items():
+        if names is None or decl.name in names:
+            out[(decl.module, decl.name)] = _concat(parts.get(vid, []))
+    return header, out
+
+
+def read_vectors(vec_path: Path, names: list = None) -> dict:
+    """
+    Read several vectors in a single pass over the .vec file.
+    Returns {(module, name): (times_s, values)}; names=None reads every vector.
+    """
+    return read_run(vec_path, names)[1]
+
+
+def _csv_array(cell) -> np.ndarray:
+    if not isinstance(cell, str):         # empty vector → NaN cell in the export
+        return np.empty(0)
+    return np.fromstring(cell, sep=" ")
+
+
+def read_csv_vector(csv_path: Path, name: str, module: str = None):
+    """Read one vector from an `opp_scavetool export` CSV as (times_s, values)."""
+    df = pd.read_csv(csv_path)
+    rows = df[(df["type"] == "vector") & (df["name"] == name)]
+    if module is not None:
+        rows = rows[rows["module"] == module]
+    if rows.empty:
+        raise KeyError(f"Vector {name!r} not found in {csv_path}")
+    row = rows.iloc[0]
+    return _csv_array(row["vectime"]), _csv_array(row["vecvalue"])
+
+
+def read_csv_header(csv_path: Path) -> VecHeader:
+    """Run attributes and config entries of an `opp_scavetool export` CSV."""
+    df = pd.read_csv(csv_path, usecols=["run", "type", "attrname", "attrvalue"])
+    header = VecHeader(run=str(df["run"].iloc[0]) if len(df) else "")
+    for kind, target in (("runattr", header.attrs), ("config", header.config)):
+        rows = df[df["type"] == kind]
+        target.update(zip(rows["attrname"], rows["attrvalue"].fillna("").astype(str)))
+    return header
+
+
+def load_vector(path: Path, name: str, module: str = None):
+    """
+    Load one vector as (times_s, values) from either a .vec file (native
+    reader) or a scavetool CSV export, chosen by file suffix.
+    """
+    path = Path(path)
+    if path.suffix == ".vec":
+        return read_vector(path, name, module)
+    return read_csv_vector(path, name, module)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="List or dump vectors of an OMNeT++ .vec file")
+    parser.add_argument("vec", type=Path, help=".vec file")
+    parser.add_argument("--name", type=str, default=None, help="Vector name to dump (e.g. seqNum:vector)")
+    parser.add_argument("--module", type=str, default=None, help="Restrict --name to this module")
+    args = parser.parse_args()
+
+    if args.name is None:
+        header = read_header(args.vec)
+        print(f"run {header.run}")
+        for decl in header.vectors.values():
+            count = sum(b[4] for b in decl.blocks) if decl.blocks else "?"
+            print(f"{decl.id:4d} {decl.module} {decl.name} ({count} samples)")
+        return
+    t_s, values = read_vector(args.vec, args.name, args.module)
+    for t, v in zip(t_s, values):
+        print(f"{t:.9f}\t{v:g}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Watch a running simulation: tail its .vec and show live merger metrics.
+
+Each poll decodes only the lines OMNeT++ appended since the previous one
+(vec_reader.VecTail) and folds them into running state, so an update costs
+O(new samples) no matter how long the run has been going:
+
+- OoO/Dup over the whole run (StreamingRatios) and over the last --window
+  of sim time, from cumulative counter snapshots taken once per poll;
+- current and maximum historyLength and reorderBuffLength;
+- P50/P95/P99/IQR of the inter-arrival intervals at the sink (packetJitter
+  reception times) in the last --window, kept in a jitter_windows.SortedWindow.
+
+The metrics are shown as a terminal dashboard (one line per poll when
+stdout is not a terminal) and, with --figure, as a headless figure of their
+history that is rewritten every --figure-every seconds.
+
+Given a folder, the newest .vec below it is watched, e.g. the store run that
+run_sim.py is writing. OMNeT++ buffers vector data; run the simulation with
+`--output-vectors-memory-limit=1MiB` (run_monitor.FLUSH_ARGS) for frequent
+updates.
+
+EX: `python3 watch.py ../simulations/results --window 50ms`
+    `python3 watch.py ../simulations/results/store/<run>/General-#0.vec --figure live.png --idle 10`
+"""
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from pathlib import Path
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import numpy as np
+
+from colors import COMNETS_BLUE, COMNETS_MAGENTA, TUD_BLUE
+from jitter_windows import SortedWindow
+from run_monitor import POLL_SECONDS, LiveMetrics
+from stream_metrics import parse_seconds
+
+HISTORY = ("t", "ooo", "dup", "ooo_win", "dup_win", "hl_now", "buf_now", "p50_ms", "p99_ms")
+CLEAR = "\x1b[H\x1b[2J"
+
+
+class WatchMetrics(LiveMetrics):
+    """LiveMetrics plus current HL/buffer, ratios over the last `window` of sim time and rolling jitter percentiles."""
+
+    def __init__(self, vec_file: Path, window: float):
+        super().__init__(vec_file)
+        self.window = window
+        self.hl_now = self.buf_now = np.nan
+        self.snapshots = deque([(0.0, 0, 0, 0, 0)])   # (t, pairs, ooo, total, dup) after each poll
+        self.intervals = SortedWindow()
+        self.pending = deque()          # (reception time, interval ms) inside the window
+        self.last_rx = None
+        self.samples = 0
+        self.history = {k: [] for k in HISTORY}
+
+    def update(self) -> int:
+        """Fold the newly appended samples in and take a snapshot; returns their count."""
+        new = super().update()
+        self.samples += new
+        self._evict()
+        r = self.ratios
+        self.snapshots.append((self.t, r.pairs, r.ooo, r.total, r.dup))
+        while len(self.snapshots) > 1 and self.snapshots[1][0] <= self.t - self.window:
+            self.snapshots.popleft()
+        if new:
+            values = self.values()
+            for k in HISTORY:
+                self.history[k].append(values[k])
+        return new
+
+    def on_samples(self, name: str, t: np.ndarray, v: np.ndarray):
+        if name == "reorderBuffLength:vector":
+            self.buf_now = float(v[-1])
+        elif name == "historyLength:vector":
+            self.hl_now = float(v[-1])
+        elif name == "packetJitter:vector":
+            self._add_receptions(t)
+
+    def _add_receptions(self, t: np.ndarray):
+        prev = np.r_[self.last_rx, t[:-1]] if self.last_rx is not None else t[:-1]
+        arrivals = t[len(t) - len(prev):]
+        for at, ms in zip(arrivals.tolist(), ((arrivals - prev) * 1e3).tolist()):
+            self.intervals.add(ms)
+            self.pending.append((at, ms))
+        self.last_rx = float(t[-1])
+
+    def _evict(self):
+        while self.pending and self.pending[0][0] <= self.t - self.window:
+            self.intervals.remove(self.pending.popleft()[1])
+
+    def values(self) -> dict:
+        values = super().values()
+        t0, pairs0, ooo0, total0, dup0 = self.snapshots[0] if self.snapshots else (0, 0, 0, 0, 0)
+        r = self.ratios
+        pairs, total = r.pairs - pairs0, r.total - total0
+        jitter = self.intervals.stats()
+        values.update({
+            "ooo_win": (r.ooo - ooo0) / pairs * 100 if pairs else np.nan,
+            "dup_win": (r.dup - dup0) / total * 100 if total else np.nan,
+            "hl_now": self.hl_now, "buf_now": self.buf_now,
+            "p50_ms": jitter["p50_ms"], "p95_ms": jitter["p95_ms"], "p99_ms": jitter["p99_ms"],
+            "iqr_ms": jitter["iqr_ms"], "intervals": jitter["count"],
+        })
+        return values
+
+
+def dashboard(m: WatchMetrics, path: Path, poll_ms: float, new: int) -> str:
+    v = m.values()
+    w = f"{m.window * 1e3:g} ms"
+    return "\n".join([
+        f"watching {path}",
+        f"sim time {v['t'] * 1e3:10.1f} ms   samples {m.samples:>10}   last poll {new:>7} new in {poll_ms:6.1f} ms",
+        "",
+        f"{'':<18}{'run':>10}{'last ' + w:>16}",
+        f"{'OoO (%)':<18}{v['ooo']:10.2f}{v['ooo_win']:16.2f}",
+        f"{'Dup (%)':<18}{v['dup']:10.2f}{v['dup_win']:16.2f}",
+        "",
+        f"{'':<18}{'now':>10}{'max':>16}",
+        f"{'historyLength':<18}{v['hl_now']:10.0f}{v['hl']:16.0f}",
+        f"{'reorderBuffLength':<18}{v['buf_now']:10.0f}{v['buf']:16.0f}",
+        "",
+        f"inter-arrival, last {w} ({v['intervals']} intervals):  "
+        f"P50 {v['p50_ms']:.3f}  P95 {v['p95_ms']:.3f}  P99 {v['p99_ms']:.3f}  IQR {v['iqr_ms']:.3f} ms",
+    ])
+
+
+def status_line(m: WatchMetrics) -> str:
+    v = m.values()
+    return (f"t={v['t'] * 1e3:.1f}ms OoO {v['ooo']:.2f}/{v['ooo_win']:.2f}% Dup {v['dup']:.2f}/{v['dup_win']:.2f}% "
+            f"HL {v['hl_now']:.0f} buf {v['buf_now']:.0f} P99 {v['p99_ms']:.3f}ms")
+
+
+def plot_history(history: dict, window: float, out: Path):
+    """Windowed OoO/Dup, HL/buffer and jitter percentiles over sim time; written atomically."""
+    t_ms = np.array(history["t"]) * 1e3
+    fig, axes = plt.subplots(3, 1, sharex=True, figsize=(7.16, 6))
+    axes[0].plot(t_ms, history["ooo_win"], color=TUD_BLUE, label="OoO")
+    axes[0].plot(t_ms, history["dup_win"], color=COMNETS_MAGENTA, linestyle="--", label="Dup")
+    axes[0].set_ylabel(f"% (last {window * 1e3:g} ms)")
+    axes[1].step(t_ms, history["hl_now"], where="post", color=COMNETS_BLUE, label="historyLength")
+    axes[1].step(t_ms, history["buf_now"], where="post", color=COMNETS_MAGENTA, linestyle="--",
+                 label="reorderBuffLength")
+    axes[1].set_ylabel("Packets")
+    axes[2].plot(t_ms, history["p50_ms"], color=TUD_BLUE, label="P50")
+    axes[2].plot(t_ms, history["p99_ms"], color=COMNETS_MAGENTA, linestyle="-.", label="P99")
+    axes[2].set_ylabel("Interval (ms)")
+    axes[2].set_xlabel("Time (ms)")
+    for ax in axes:
+        ax.legend(frameon=True, loc="upper left")
+    tmp = out.with_name(f".{out.name}.tmp{out.suffix}")
+    fig.savefig(tmp, dpi=150, bbox_inches="tight")
+    plt.close(fig)
+    os.replace(tmp, out)
+
+
+def newest_vec(folder: Path):
+    vecs = [p for p in folder.rglob("*.vec")]
+    return max(vecs, key=lambda p: p.stat().st_mtime) if vecs else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Live OoO/Dup, HL/buffer and jitter of a running simulation")
+    parser.add_argument("path", type=Path, help=".vec file, or folder whose newest .vec is watched")
+    parser.add_argument("--window", type=str, default="100ms", help="Sim-time window of the rolling metrics")
+    parser.add_argument("--poll", type=float, default=POLL_SECONDS, help="Seconds between polls")
+    parser.add_argument("--figure", type=Path, default=None, help="Rewrite this figure (.png/.pdf) periodically")
+    parser.add_argument("--figure-every", type=float, default=5.0, help="Seconds between figure updates")
+    parser.add_argument("--idle", type=float, default=None,
+                        help="Stop once the file has not grown for this many seconds after the first samples "
+                             "(default: until Ctrl-C)")
+    args = parser.parse_args()
+
+    window = parse_seconds(args.window)
+    if window <= 0 or args.poll <= 0:
+        parser.error("--window and --poll must be positive")
+    path = args.path
+    while path.is_dir():
+        vec = newest_vec(path)
+        if vec is not None:
+            path = vec
+            break
+        time.sleep(args.poll)
+
+    metrics = WatchMetrics(path, window)
+    tty = sys.stdout.isatty()
+    last_growth, last_fig = None, time.monotonic()
+    try:
+        while True:
+            start = time.perf_counter()
+            new = metrics.update()
+            poll_ms = (time.perf_counter() - start) * 1e3
+            now = time.monotonic()
+            if new:
+                last_growth = now
+            if tty:
+                print(CLEAR + dashboard(metrics, path, poll_ms, new), flush=True)
+            elif new:
+                print(status_line(metrics), flush=True)
+            if args.figure and metrics.history["t"] and now - last_fig >= args.figure_every:
+                plot_history(metrics.history, window, args.figure)
+                last_fig = now
+            if args.idle is not None and last_growth is not None and now - last_growth >= args.idle:
+                break
+            time.sleep(args.poll)
+    except KeyboardInterrupt:
+        pass
+    if args.figure and metrics.history["t"]:
+        plot_history(metrics.history, window, args.figure)
+        print(f"✔ Figure → {args.figure}")
+    print(f"✔ {status_line(metrics)} ({metrics.samples} samples)")
+
+
+if __name__ == "__main__":
+    main()